@@ -0,0 +1,113 @@
+"""
+Benchmark: barge-in detection latency and false triggers on recorded audio.
+Replays a microphone recording (Mira's echo + the user's voice) frame by frame
+through BargeInMonitor, with a fake output device that reports the level of
+the reference playback audio at the same position.
+
+Usage:
+    python benchmarks/bench_barge_in.py --mic mic.wav --reference playback.wav --speech-start 2.4
+    python benchmarks/bench_barge_in.py            # synthetic echo + speech
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+from scipy.io import wavfile
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from utils.barge_in import BargeInMonitor, FRAME_DURATION, SAMPLE_RATE
+
+
+class ReplayOutput:
+    """Fake AudioOutput: 'plays' a reference clip in step with the replayed mic frames."""
+
+    def __init__(self, reference):
+        frame = int(SAMPLE_RATE * FRAME_DURATION)
+        usable = len(reference) - len(reference) % frame
+        self.envelope = np.sqrt(np.mean(reference[:usable].reshape(-1, frame) ** 2, axis=1))
+        self.position = 0
+        self.stopped_at = None
+        self.device = self
+
+    def level(self):
+        if self.stopped_at is not None or self.position >= len(self.envelope):
+            return 0.0
+        return float(self.envelope[self.position])
+
+    def stop(self):
+        if self.stopped_at is None:
+            self.stopped_at = self.position
+
+    def is_playing(self):
+        return self.stopped_at is None and self.position < len(self.envelope)
+
+
+def load_wav(path):
+    fs, audio = wavfile.read(path)
+    if audio.ndim > 1:
+        audio = audio[:, 0]
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+    if fs != SAMPLE_RATE:
+        from scipy.signal import resample_poly
+        audio = resample_poly(audio, SAMPLE_RATE, fs)
+    return audio.astype(np.float32)
+
+
+def synthetic_fixture(seconds=6.0, speech_start=3.0, echo_gain=0.35, seed=0):
+    """Speech-like noise bursts for playback, echoed into the mic, plus a user burst."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    syllables = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    reference = (0.3 * syllables * rng.standard_normal(n)).astype(np.float32)
+    mic = echo_gain * reference + 0.003 * rng.standard_normal(n)
+    start = int(speech_start * SAMPLE_RATE)
+    mic[start:] += 0.3 * syllables[start:] * rng.standard_normal(n - start)
+    return mic.astype(np.float32), reference, speech_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mic", help="Microphone recording during playback (.wav)")
+    parser.add_argument("--reference", help="Audio that was being played (.wav)")
+    parser.add_argument("--speech-start", type=float, help="Second at which the user starts talking")
+    args = parser.parse_args()
+
+    if args.mic and args.reference:
+        mic, reference, speech_start = load_wav(args.mic), load_wav(args.reference), args.speech_start
+    else:
+        mic, reference, speech_start = synthetic_fixture()
+        print("ℹ️ No fixtures given, using synthetic echo + speech")
+
+    output = ReplayOutput(reference)
+    frame = int(SAMPLE_RATE * FRAME_DURATION)
+
+    def frames(stop_event):
+        for output.position, offset in enumerate(range(0, len(mic) - frame + 1, frame)):
+            if stop_event.is_set():
+                return
+            yield mic[offset:offset + frame]
+
+    monitor = BargeInMonitor(output, frame_source=frames)
+    monitor.start()
+    monitor.finish()
+    captured = monitor.join()
+
+    if output.stopped_at is None:
+        print("❌ No barge-in detected")
+        return
+    trigger_time = (output.stopped_at + 1) * FRAME_DURATION
+    print(f"✋ Barge-in at {trigger_time:.2f}s, captured {len(captured) / SAMPLE_RATE:.2f}s of speech")
+    if speech_start is not None:
+        if trigger_time < speech_start:
+            print(f"⚠️ False trigger: {speech_start - trigger_time:.2f}s before the user spoke")
+        else:
+            print(f"⏱️ Detection latency: {(trigger_time - speech_start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
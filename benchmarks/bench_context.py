@@ -0,0 +1,121 @@
+"""
+Benchmark: prompt size and reply latency over a long session, with and without
+the context token budget.
+Runs a scripted multi-turn conversation (with periodic tool calls) against a
+local fake Ollama server that charges prompt-evaluation time per prompt token,
+so growing history shows up as growing latency.
+
+Usage:
+    python benchmarks/bench_context.py --turns 100 --budget 3000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.fake_ollama import FakeOllama
+
+QUESTIONS = [
+    "What time is it right now?",
+    "Can you tell me a fun fact about the ocean?",
+    "My sister's name is Priya, please remember that.",
+    "How should I prepare for a job interview tomorrow?",
+    "What is a good recipe for dinner tonight?",
+    "Explain how rainbows form in simple words.",
+    "Suggest a short workout I can do at home.",
+    "What was my sister's name again?",
+]
+
+ANSWER = (
+    "Here is a short answer. I kept it brief so it is easy to listen to, "
+    "and I can go into more detail if you would like to hear more about it."
+)
+
+
+def make_script(tool_every):
+    """Reply with a get_time tool call on every `tool_every`-th user turn, else answer."""
+    state = {"turn": 0}
+
+    def script(request):
+        last = request.get("messages", [{}])[-1]
+        if last.get("role") == "user":
+            state["turn"] += 1
+            if tool_every and state["turn"] % tool_every == 0:
+                return {"tool_calls": [{"function": {"name": "get_time", "arguments": {}}}]}
+        return {"content": ANSWER}
+
+    return script
+
+
+def run_session(brain, fake, turns, session_id):
+    """Run one scripted session; returns per-turn (prompt tokens, latency) pairs."""
+    results = []
+    for turn in range(turns):
+        question = QUESTIONS[turn % len(QUESTIONS)]
+        first_request = len(fake.prompt_tokens)
+        start = time.perf_counter()
+        brain.ask_brain(question, session_id=session_id)
+        latency = time.perf_counter() - start
+        prompt_tokens = max(fake.prompt_tokens[first_request:], default=0)
+        results.append((prompt_tokens, latency))
+    return results
+
+
+def report(label, results):
+    tokens = [t for t, _ in results]
+    latencies = [l * 1000 for _, l in results]
+    print(f"\n{label}")
+    print(f"  {'turn':>5} {'prompt tokens':>14} {'latency ms':>11}")
+    checkpoints = sorted({0, 9, 24, 49, 74, len(results) - 1} & set(range(len(results))))
+    for i in checkpoints:
+        print(f"  {i + 1:>5} {tokens[i]:>14} {latencies[i]:>11.0f}")
+    print(f"  max prompt tokens: {max(tokens)}")
+    print(f"  mean latency: {statistics.mean(latencies):.0f} ms, "
+          f"last 10 turns: {statistics.mean(latencies[-10:]):.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--budget", type=int, default=3000, help="Token budget for the bounded run")
+    parser.add_argument("--keep-turns", type=int, default=4)
+    parser.add_argument("--tool-every", type=int, default=3, help="Every Nth turn triggers a tool call (0 = never)")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with FakeOllama(tokens_per_second=args.tokens_per_second, first_token_delay=0.05,
+                    script=make_script(args.tool_every),
+                    prompt_tokens_per_second=args.prompt_tokens_per_second) as fake:
+        # brain.py reads the Ollama URL at import time
+        os.environ["OLLAMA_BASE_URL"] = fake.base_url
+        from modules import brain
+        from modules.context_manager import estimate_tokens
+
+        brain.context_manager.keep_turns = args.keep_turns
+
+        brain.context_manager.budget = 0  # Unbounded: history grows every turn
+        unbounded = run_session(brain, fake, args.turns, "bench-unbounded")
+
+        brain.context_manager.budget = args.budget
+        bounded = run_session(brain, fake, args.turns, "bench-bounded")
+        stored = estimate_tokens(brain.store["bench-bounded"])
+
+        start = time.perf_counter()
+        brain.summarize_idle_sessions()
+        refine_time = time.perf_counter() - start
+
+    report("Unbounded history", unbounded)
+    report(f"Budget {args.budget} tokens (keep {args.keep_turns} turns)", bounded)
+    print(f"\nStored history after {args.turns} turns: {stored} tokens "
+          f"(unbounded: {estimate_tokens(brain.store['bench-unbounded'])})")
+    print(f"Idle summarization of {len(brain.store)} sessions: {refine_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+End-to-end benchmark: main.py's conversation flow, headless.
+Every external dependency is replaced by a local stand-in:
+  - microphone: fake sounddevice replaying WAV fixtures at capture speed
+  - Ollama: local fake server (token rate, first-token delay, tool-call script)
+  - weather API: local stub server
+  - edge-tts: fake synthesizer with a configurable delay
+  - speakers: null audio sink
+
+Each turn runs the same path as a spoken command in main.py:
+record_audio (VAD) -> transcript -> intent router -> respond stage
+(ask_brain_stream -> speak_stream). Memory writes and session persistence are
+turned off, so benchmark turns never reach your data.
+
+Metrics (p50/p95/p99, seconds):
+  speech_end_to_record_end     VAD hangover after the user stops talking
+  record_to_transcript         recording stopped -> final transcript
+  transcript_to_first_token    transcript -> first reply token (agent turns only)
+  first_token_to_first_audio   first token -> first audio played
+  transcript_to_first_audio    transcript -> first audio played (all turns)
+  full_turn                    end of speech -> reply finished playing
+
+Results are written as JSON so runs can be compared between commits:
+    python benchmarks/bench_e2e.py --output runtime/bench/e2e-new.json --compare runtime/bench/e2e-old.json
+
+Fixtures: a directory of WAV files; `name.txt` next to `name.wav` holds the
+expected transcript (used by --stt fixture). Without --fixtures, synthetic
+speech-like clips are generated for built-in prompts (requires --stt fixture).
+
+Usage:
+    python benchmarks/bench_e2e.py --turns 20 --stt fixture
+    python benchmarks/bench_e2e.py --fixtures benchmarks/fixtures --stt whisper
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import wait
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from scipy.io import wavfile
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.fake_sounddevice import FakeSoundDevice
+from benchmarks.stub_weather import StubWeather
+
+PROMPTS = [
+    "What's the weather in Delhi?",
+    "Can you tell me a fun fact about the ocean?",
+    "What time is it?",
+    "How should I prepare for a job interview tomorrow?",
+    "Suggest a short workout I can do at home.",
+    "What's the weather like in London and in Tokyo?",
+    "Explain how rainbows form in simple words.",
+    "What is a good recipe for dinner tonight?",
+]
+
+ANSWER = (
+    "Here is a short answer. I kept it brief so it is easy to listen to, "
+    "and I can go into more detail if you would like to hear more about it."
+)
+
+METRICS = [
+    "speech_end_to_record_end",
+    "record_to_transcript",
+    "transcript_to_first_token",
+    "first_token_to_first_audio",
+    "transcript_to_first_audio",
+    "full_turn",
+]
+
+
+# ============================================
+# Stand-ins
+# ============================================
+def synthetic_clip(text, fs=16000, seed=0):
+    """Speech-like noise bursts, ~0.3 s per word, plus leading/trailing quiet."""
+    rng = np.random.default_rng(seed)
+    speech = max(1.0, 0.3 * len(text.split()))
+    n_lead, n_speech = int(0.3 * fs), int(speech * fs)
+    t = np.arange(n_speech) / fs
+    syllables = 0.5 * (1 + np.sin(2 * np.pi * 4 * t))
+    clip = np.concatenate([
+        0.002 * rng.standard_normal(n_lead),
+        0.4 * syllables * rng.standard_normal(n_speech),
+        0.002 * rng.standard_normal(n_lead),
+    ])
+    return np.clip(clip, -1.0, 1.0).astype(np.float32), fs
+
+
+def load_fixtures(directory):
+    """Load WAV fixtures and their optional transcripts."""
+    fixtures = []
+    for path in sorted(Path(directory).glob("*.wav")):
+        fs, audio = wavfile.read(path)
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+        transcript = path.with_suffix(".txt")
+        text = transcript.read_text(encoding="utf-8").strip() if transcript.exists() else None
+        fixtures.append({"name": path.stem, "audio": audio, "fs": fs, "text": text})
+    return fixtures
+
+
+class FixtureTranscriber:
+    """Stand-in for StreamingTranscriber: returns the fixture transcript after a decode delay."""
+
+    def __init__(self, text, delay):
+        self.text = text
+        self.delay = delay
+
+    def feed(self, chunk, sample_rate=16000):
+        pass
+
+    def cancel(self):
+        pass
+
+    def finalize(self, save=True):
+        time.sleep(self.delay)
+        return self.text
+
+
+def fake_synthesizer(base_delay, per_char_delay, bytes_per_char=400):
+    """Stand-in for text_to_speech.synthesize with a length-dependent delay (and audio length)."""
+    async def synthesize(text, lang="en", emotion="neutral"):
+        await asyncio.sleep(base_delay + per_char_delay * len(text))
+        return b"\0" * (len(text) * bytes_per_char)
+    return synthesize
+
+
+# The agent's weather calls ask for cities no prompt mentions, so they are told apart from routed turns
+WEATHER_TOOL = "get_weather"  # Checked against the registered tool once modules.tools is imported
+AGENT_CITIES = ["Agra", "Jaipur", "Kochi", "Shimla"]
+
+
+def make_script(tool_every, state):
+    """Answer every user turn; every `tool_every`-th one first calls the weather tool."""
+    state.update(turn=0, tool_calls=0)
+
+    def script(request):
+        last = request.get("messages", [{}])[-1]
+        if last.get("role") == "user":
+            state["turn"] += 1
+            if tool_every and state["turn"] % tool_every == 0:
+                city = AGENT_CITIES[state["tool_calls"] % len(AGENT_CITIES)]
+                state["tool_calls"] += 1
+                return {"tool_calls": [{"function": {"name": WEATHER_TOOL, "arguments": {"city": city}}}]}
+        return {"content": ANSWER}
+
+    return script
+
+
+# ============================================
+# Reporting
+# ============================================
+def summarize(samples):
+    if not samples:
+        return {"n": 0}
+    values = np.array(samples)
+    return {
+        "n": len(samples),
+        "mean": round(float(values.mean()), 4),
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+        "samples": [round(float(v), 4) for v in samples],
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def print_report(results, previous=None):
+    header = f"{'metric':<28} {'n':>4} {'p50':>8} {'p95':>8} {'p99':>8}"
+    if previous:
+        header += f" {'Δp50':>8} {'Δp95':>8}"
+    print(header)
+    for name in METRICS:
+        stats = results["metrics"].get(name, {"n": 0})
+        if not stats["n"]:
+            print(f"{name:<28} {0:>4}        -")
+            continue
+        line = f"{name:<28} {stats['n']:>4} {stats['p50'] * 1000:>6.0f}ms {stats['p95'] * 1000:>6.0f}ms {stats['p99'] * 1000:>6.0f}ms"
+        old = (previous or {}).get("metrics", {}).get(name, {})
+        if previous and old.get("n"):
+            line += f" {(stats['p50'] - old['p50']) * 1000:>+6.0f}ms {(stats['p95'] - old['p95']) * 1000:>+6.0f}ms"
+        print(line)
+
+
+# ============================================
+# Benchmark
+# ============================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Directory of WAV fixtures (name.wav + optional name.txt)")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--stt", choices=["whisper", "fixture"], default=None,
+                        help="Real streaming Whisper, or the fixture transcript after --stt-delay "
+                             "(default: whisper with --fixtures, else fixture)")
+    parser.add_argument("--stt-delay", type=float, default=0.15, help="Decode delay for --stt fixture (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=20.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--tool-every", type=int, default=3, help="Every n-th agent turn calls a tool (0 = never)")
+    parser.add_argument("--tts-base-delay", type=float, default=0.25)
+    parser.add_argument("--tts-per-char-delay", type=float, default=0.002)
+    parser.add_argument("--speech-rate", type=float, default=15.0, help="Characters of reply spoken per second")
+    parser.add_argument("--fast", action="store_true", help="Replay audio faster than real time")
+    parser.add_argument("--output", default=str(BASE_DIR / "runtime" / "bench" / "e2e.json"))
+    parser.add_argument("--compare", help="Earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    stt = args.stt or ("whisper" if args.fixtures else "fixture")
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+        if not fixtures:
+            parser.error(f"No .wav fixtures in {args.fixtures}")
+    else:
+        if stt == "whisper":
+            parser.error("Synthetic clips contain no words - use --fixtures with --stt whisper")
+        fixtures = [{"name": f"synthetic-{i}", "text": text, **dict(zip(("audio", "fs"), synthetic_clip(text, seed=i)))}
+                    for i, text in enumerate(PROMPTS)]
+    if stt == "fixture" and any(f["text"] is None for f in fixtures):
+        parser.error("--stt fixture needs a .txt transcript next to every fixture")
+
+    # The fake microphone must be in place before utils.mic_record imports sounddevice
+    mic = FakeSoundDevice(realtime=not args.fast).install()
+    longest = max(len(f["audio"]) / f["fs"] for f in fixtures)
+    os.environ.setdefault("RECORDING_DURATION", str(int(longest + 3)))  # Upper bound per recording
+    if args.fast:
+        os.environ["SHARED_CAPTURE"] = "false"  # The always-on capture can only run at capture speed
+
+    script_state = {}
+    with FakeOllama(tokens_per_second=args.tokens_per_second, first_token_delay=args.first_token_delay,
+                    script=make_script(args.tool_every, script_state)) as ollama, StubWeather() as weather, \
+            tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time
+        os.environ["OLLAMA_BASE_URL"] = ollama.base_url
+        os.environ["WEATHER_BASE_URL"] = weather.base_url
+        os.environ["SESSION_PERSIST"] = "false"
+        os.environ.setdefault("MEMORY_RECALL", "false")
+        os.environ.setdefault("RESPONSE_CACHE", "false")
+
+        import main as app
+        from modules import brain, text_to_speech, tools
+        from modules.audio_output import AudioOutput, NullDevice
+        from modules.endpointing import SEMANTIC_ENDPOINTING, SemanticEndpointer
+        from modules.speech_to_text import StreamingTranscriber
+        from utils.audio_capture import close_capture
+        from utils.metrics import metrics as app_metrics
+        from utils.mic_record import record_audio
+        from utils.model_registry import warm_up
+        from utils.pipeline import Stage
+
+        if tools.get_weather.name != WEATHER_TOOL:
+            print(f"❌ The weather tool is registered as {tools.get_weather.name!r}, not {WEATHER_TOOL!r}")
+            sys.exit(1)
+        tools.CONFIG["openweather_api_key"] = "stub"
+        app.save_memory = lambda *a, **k: None  # Keep benchmark turns out of the user's memory
+        device = NullDevice()
+        text_to_speech._audio_output = AudioOutput(
+            fake_synthesizer(args.tts_base_delay, args.tts_per_char_delay,
+                             bytes_per_char=int(device.bytes_per_second / args.speech_rate)),
+            text_to_speech.detect_language, device=device)
+
+        # Time the first streamed token as it leaves the brain
+        first_token = {}
+        stream = brain.ask_brain_stream
+
+        def timed_stream(prompt, session_id="default"):
+            for chunk in stream(prompt, session_id=session_id):
+                first_token.setdefault("time", time.perf_counter())
+                yield chunk
+
+        app.ask_brain_stream = timed_stream
+
+        print("⏳ Loading models...")
+        loading = warm_up(["agent", "emotion_classifier"] + (["stt"] if stt == "whisper" else []))
+        wait(loading.values())
+        # Resources that failed to load: those turns take a fallback path, so the numbers are not comparable
+        degraded = {name: str(future.exception()) for name, future in loading.items() if future.exception()}
+        background = Stage("background", lambda job: job())
+        responder = Stage("respond", lambda turn: app.respond(turn, stream_responses=True, background=background))
+
+        samples = {name: [] for name in METRICS}
+        audio_path = str(Path(tmp) / "command.wav")
+        for i in range(args.turns):
+            fixture = fixtures[i % len(fixtures)]
+            mic.queue_clip(fixture["audio"], fixture["fs"])
+            transcriber = (StreamingTranscriber() if stt == "whisper"
+                           else FixtureTranscriber(fixture["text"], args.stt_delay))
+
+            # Like main.py: real transcripts also drive the semantic endpointer
+            endpointer = SemanticEndpointer(transcriber) if stt == "whisper" and SEMANTIC_ENDPOINTING else None
+            record_audio(audio_path, use_vad=True, on_audio=transcriber.feed, in_memory=True, endpointer=endpointer)
+            record_end = time.perf_counter()
+            speech_end = mic.speech_end_time or record_end
+            command = transcriber.finalize(save=False)
+            transcript = time.perf_counter()
+            if not command or not command.strip():
+                print(f"⚠️ {fixture['name']}: empty transcript, turn skipped")
+                continue
+
+            route = app.route_command(command)
+            first_token.clear()
+            played_before = len(device.play_times)
+            turn = app.Turn(command, route=route if app.INTENT_ROUTER else None)
+            responder.submit(turn)
+            turn.done.wait()
+            done = time.perf_counter()
+
+            first_audio = device.play_times[played_before] if len(device.play_times) > played_before else None
+            samples["speech_end_to_record_end"].append(record_end - speech_end)
+            samples["record_to_transcript"].append(transcript - record_end)
+            if "time" in first_token:
+                samples["transcript_to_first_token"].append(first_token["time"] - transcript)
+                if first_audio is not None:
+                    samples["first_token_to_first_audio"].append(first_audio - first_token["time"])
+            if first_audio is not None:
+                samples["transcript_to_first_audio"].append(first_audio - transcript)
+            samples["full_turn"].append(done - speech_end)
+            print(f"   turn {i + 1}/{args.turns}: {command[:40]!r} "
+                  f"{'(routed) ' if turn.route else ''}full turn {done - speech_end:.2f} s")
+
+        responder.close(drain=True, timeout=5)
+        close_capture()
+        background.close(drain=True, timeout=5)
+        agent_weather = sum(r["query"].get("q") in AGENT_CITIES for r in weather.requests)
+
+    # Tool turns that never reached the weather API measured an error round trip, not the tool path
+    if script_state["tool_calls"] and not agent_weather:
+        print(f"❌ {script_state['tool_calls']} agent weather calls, but none reached the stub weather API")
+        sys.exit(1)
+
+    results = {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {**vars(args), "stt": stt, "fixtures": args.fixtures or "synthetic"},
+        "degraded": degraded,
+        "tool_calls": {"agent": script_state["tool_calls"], "weather_api": agent_weather},
+        "metrics": {name: summarize(values) for name, values in samples.items()},
+        # Per-stage spans recorded by the app's own instrumentation (utils/metrics)
+        "spans": app_metrics.snapshot()["spans"],
+    }
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"\nComparing with {args.compare} (commit {previous.get('commit')})")
+        if previous.get("degraded", {}) != degraded:
+            print(f"⚠️ Warning: Degraded resources differ ({previous.get('degraded', {})} -> {degraded})")
+    print()
+    for name, error in degraded.items():
+        print(f"⚠️ Warning: Measured without {name} ({error})")
+    print_report(results, previous)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
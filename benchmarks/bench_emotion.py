@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: emotion classifier backends (per-call latency and RSS).
+Each backend is measured in a fresh subprocess so memory numbers don't mix.
+
+Usage:
+    python benchmarks/bench_emotion.py --backends hf quantized onnx --calls 200
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+SAMPLES = [
+    "What's the weather like in Delhi today?",
+    "I'm so happy, I finally got the job!",
+    "This is really frustrating, nothing works.",
+    "I'm a bit scared about my exam tomorrow.",
+    "Wow, I didn't expect that at all!",
+    "I miss my family a lot these days.",
+    "Tell me a story about a brave little mouse who wanted to see the ocean.",
+    "What time is it?",
+]
+
+
+def rss_mb():
+    """Current resident set size in MB (psutil if installed, else peak RSS)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(backend, calls):
+    """Measure one backend in this process and print the result as JSON."""
+    from modules import brain
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    classifier = brain._load_emotion_classifier(backend)
+    load_time = time.perf_counter() - start
+    classifier(SAMPLES[0])  # First call pays one-off allocation costs
+
+    latencies = []
+    for i in range(calls):
+        text = SAMPLES[i % len(SAMPLES)] + f" ({i})"  # Unique text - no memo hits
+        start = time.perf_counter()
+        classifier(text)
+        latencies.append(time.perf_counter() - start)
+
+    # Memoized path through detect_emotion for repeated short inputs
+    brain.get_resource = lambda name: classifier
+    brain.detect_emotion("What time is it?")
+    start = time.perf_counter()
+    for _ in range(calls):
+        brain.detect_emotion("What time is it?")
+    memo_latency = (time.perf_counter() - start) / calls
+
+    latencies.sort()
+    print(json.dumps({
+        "backend": backend,
+        "load_s": round(load_time, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "memo_us": round(memo_latency * 1e6, 2),
+        "rss_mb": round(rss_mb() - baseline, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["hf", "quantized", "onnx"])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.calls)
+        return
+
+    print(f"{'backend':<12}{'load':>8}{'p50':>10}{'p95':>10}{'memo':>10}{'RSS':>10}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--calls", str(args.calls)],
+            capture_output=True, text=True, env=dict(os.environ, EMOTION_BACKEND=backend),
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{backend:<12} ❌ failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'no output'}")
+            continue
+        r = json.loads(lines[-1])
+        print(f"{backend:<12}{r['load_s']:>7.1f}s{r['p50_ms']:>8.1f}ms{r['p95_ms']:>8.1f}ms"
+              f"{r['memo_us']:>8.1f}us{r['rss_mb']:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
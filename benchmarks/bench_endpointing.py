@@ -0,0 +1,132 @@
+"""
+Benchmark: semantic endpointing - latency saved against truncated utterances.
+Replays transcribed utterances through the stop rule of utils/mic_record and
+compares fixed silence timeouts with the SemanticEndpointer policy:
+- latency: silence from the end of the utterance to the stop decision
+- saved: mean latency saved against the fixed --silence timeout
+- truncated: utterances where the recording stopped during a pause inside them
+- rescued: utterances the fixed timeout truncates but this policy does not
+
+Cases are JSON lines with the final transcript; "|" marks a pause inside the
+utterance, and the text before it is the partial transcript at that pause
+({"text": "Set a timer for | ten minutes."}). Pause lengths are drawn from a
+log-normal distribution (--pause-median). The transcript for a pause is ready
+200 ms + --decode-delay after it starts; until then the fixed timeout applies,
+as in the recorder. Silence only counts once the VAD hangover has passed.
+
+Usage:
+    python benchmarks/bench_endpointing.py
+    python benchmarks/bench_endpointing.py --pause-median 0.8 --decode-delay 0.5
+    python benchmarks/bench_endpointing.py --cases my_transcripts.jsonl --min-silence 0.3 0.5
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.endpointing import (DECODE_AFTER_PAUSE, ENDPOINT_MAX_SILENCE, ENDPOINT_MIN_SILENCE,
+                                 ENDPOINT_SENTENCE_SILENCE, EndpointPolicy)
+from utils.vad import VAD_HANGOVER_MS
+
+
+def load_cases(path):
+    """(partial transcripts at each pause, final transcript) per case."""
+    cases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            parts = [part.strip() for part in json.loads(line)["text"].split("|")]
+            partials = [" ".join(parts[:i + 1]) for i in range(len(parts))]
+            cases.append((partials[:-1], partials[-1]))
+    return cases
+
+
+def stop_after(needed, default, ready_at, hangover):
+    """Pause length at which the recorder stops (see utils/mic_record._record_with_vad)."""
+    before_transcript = max(hangover, default)
+    if before_transcript < ready_at:
+        return before_transcript
+    return max(hangover, ready_at, needed)
+
+
+def fixed(silence):
+    return lambda text, default: (silence, None)
+
+
+def measure(name, decide, cases, pauses, args, baseline_cut=None):
+    hangover = VAD_HANGOVER_MS / 1000 + 0.02  # Plus the frame that ends the hangover
+    ready_at = DECODE_AFTER_PAUSE + args.decode_delay
+    latencies, cut, labels = [], [], {}
+    for (partials, final), case_pauses in zip(cases, pauses):
+        truncated = False
+        for text, pause in zip(partials, case_pauses):
+            needed, _ = decide(text, args.silence)
+            if stop_after(needed, args.silence, ready_at, hangover) < pause:
+                truncated = True
+                break
+        cut.append(truncated)
+        needed, label = decide(final, args.silence)
+        labels[label] = labels.get(label, 0) + 1
+        latencies.append(stop_after(needed, args.silence, ready_at, hangover))
+
+    latencies, cut = np.array(latencies), np.array(cut)
+    baseline = stop_after(args.silence, args.silence, ready_at, hangover)
+    rescued = int(np.sum(baseline_cut & ~cut)) if baseline_cut is not None else 0
+    print(f"{name:<22}{latencies.mean():>8.2f}s{np.percentile(latencies, 95):>7.2f}s"
+          f"{baseline - latencies.mean():>8.2f}s{cut.mean():>11.1%}{rescued:>9}")
+    if args.verbose:
+        if None not in labels:
+            print("    final utterances: " + ", ".join(f"{k} {v}" for k, v in sorted(labels.items())))
+        for (partials, final), truncated in zip(cases, cut):
+            if truncated:
+                print(f"    truncated: {final}")
+    return cut
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=str(BASE_DIR / "benchmarks" / "endpoint_cases.jsonl"),
+                        help="JSONL file of transcripts with | at pauses")
+    parser.add_argument("--silence", type=float, default=1.5, help="The recorder's fixed timeout (seconds)")
+    parser.add_argument("--fixed", type=float, nargs="*", default=[1.0, 0.7, 0.3],
+                        help="Other fixed timeouts to compare")
+    parser.add_argument("--min-silence", type=float, nargs="+", default=[ENDPOINT_MIN_SILENCE],
+                        help="ENDPOINT_MIN_SILENCE values for the semantic policy")
+    parser.add_argument("--sentence-silence", type=float, default=ENDPOINT_SENTENCE_SILENCE)
+    parser.add_argument("--max-silence", type=float, default=ENDPOINT_MAX_SILENCE)
+    parser.add_argument("--pause-median", type=float, default=0.6, help="Median pause inside an utterance (seconds)")
+    parser.add_argument("--decode-delay", type=float, default=0.25, help="Partial transcript decode time (seconds)")
+    parser.add_argument("--repeats", type=int, default=20, help="Pause draws per case")
+    parser.add_argument("--verbose", action="store_true", help="List truncated utterances")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases) * args.repeats
+    if not cases:
+        print(f"❌ No cases in {args.cases}")
+        return
+    rng = np.random.default_rng(args.seed)
+    pauses = [np.clip(rng.lognormal(np.log(args.pause_median), 0.6, len(partials)), 0.2, 4.0)
+              for partials, _ in cases]
+    with_pauses = sum(bool(partials) for partials, _ in cases) // args.repeats
+
+    print(f"{len(cases) // args.repeats} utterances ({with_pauses} with pauses) x {args.repeats} pause draws, "
+          f"median pause {args.pause_median}s, decode {args.decode_delay}s")
+    print(f"{'policy':<22}{'latency':>9}{'p95':>8}{'saved':>9}{'truncated':>11}{'rescued':>9}")
+    baseline_cut = measure(f"fixed {args.silence}s", fixed(args.silence), cases, pauses, args)
+    for silence in args.fixed:
+        measure(f"fixed {silence}s", fixed(silence), cases, pauses, args, baseline_cut)
+    for min_silence in args.min_silence:
+        policy = EndpointPolicy(min_silence, args.sentence_silence, args.max_silence)
+        measure(f"semantic {min_silence}/{args.sentence_silence}/{args.max_silence}s", policy.required_silence,
+                cases, pauses, args, baseline_cut)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: intent router precision and latency on a labelled set of commands.
+Each case in intent_cases.jsonl is labelled with the intent it should be routed
+to, or "other" if it belongs to the agent. Precision matters most - a wrongly
+routed command gets a wrong answer - while a missed one only costs an agent call.
+
+Usage:
+    python benchmarks/bench_intent_router.py --cases benchmarks/intent_cases.jsonl --repeat 200
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.intent_router import FALLBACK, route_command
+
+
+def load_cases(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default=str(BASE_DIR / "benchmarks" / "intent_cases.jsonl"))
+    parser.add_argument("--repeat", type=int, default=200, help="Routing passes over the set for latency")
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    predicted = []
+    for case in cases:
+        route = route_command(case["text"])
+        predicted.append(route.intent if route else FALLBACK)
+
+    print(f"{len(cases)} labelled commands")
+    print(f"{'intent':<10} {'cases':>6} {'routed':>7} {'precision':>10} {'recall':>7}")
+    correct = Counter()
+    routed = Counter(predicted)
+    for case, intent in zip(cases, predicted):
+        if case["intent"] == intent:
+            correct[intent] += 1
+    labels = Counter(case["intent"] for case in cases)
+    for intent in sorted(labels):
+        if intent == FALLBACK:
+            continue
+        precision = correct[intent] / routed[intent] if routed[intent] else 1.0
+        recall = correct[intent] / labels[intent]
+        print(f"{intent:<10} {labels[intent]:>6} {routed[intent]:>7} {precision:>10.2f} {recall:>7.2f}")
+
+    fast = [(c, p) for c, p in zip(cases, predicted) if p != FALLBACK]
+    overall = sum(c["intent"] == p for c, p in fast) / len(fast) if fast else 1.0
+    false_routes = sum(1 for c, p in zip(cases, predicted) if c["intent"] == FALLBACK and p != FALLBACK)
+    print(f"Overall precision {overall:.2f}; {false_routes}/{labels[FALLBACK]} agent requests wrongly routed")
+
+    if args.show_errors:
+        for case, intent in zip(cases, predicted):
+            if case["intent"] != intent:
+                print(f"  {case['intent']:>8} -> {intent:<8} {case['text']}")
+
+    latencies = []
+    for _ in range(args.repeat):
+        for case in cases:
+            start = time.perf_counter()
+            route_command(case["text"])
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(f"Routing latency: p50 {statistics.median(latencies):.3f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.3f} ms, max {latencies[-1]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Benchmark: offline keyword spotter - false accepts, false rejects and idle CPU.
+Enrolls a few wake word samples, then streams test clips through the spotter
+in 20 ms frames, as the wake word listener does:
+- positives: the wake word alone, and followed directly by a command
+- negatives: other words and phrases, including similar-sounding ones
+- idle: minutes of background noise, for CPU use while Mira sits asleep
+
+With --fixtures DIR, real recordings are used: DIR/enroll/*.wav (the samples
+to enroll), DIR/positive/*.wav and DIR/negative/*.wav. Without it, clips come
+from a small formant synthesizer: vowel and consonant targets for a few
+speakers with different pitch, vocal tract length, tempo and noise. The
+synthetic numbers only show the mechanics; tune thresholds with real recordings.
+
+--whisper also times the old fallback (Whisper `base` on a 4 s clip) for comparison.
+
+Usage:
+    python benchmarks/bench_kws.py --positives 100 --negatives 200 --idle 120
+    python benchmarks/bench_kws.py --fixtures fixtures/wake --whisper
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.signal import lfilter
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.keyword_spotter import KeywordSpotter, load_templates
+
+FS = 16000
+FRAME = 320  # 20 ms, like the wake word listener
+
+# ============================================
+# 🗣 Formant synthesizer
+# ============================================
+# (F1, F2, F3) in Hz for an adult male vocal tract; kind: v = voiced, n = noise, b = burst
+PHONES = {
+    "a": ("v", (730, 1090, 2440), 1.0), "e": ("v", (530, 1840, 2480), 1.0), "i": ("v", (280, 2250, 2900), 0.9),
+    "o": ("v", (570, 840, 2410), 1.0), "u": ("v", (300, 870, 2240), 0.9), "ey": ("v", (450, 2050, 2700), 1.0),
+    "m": ("v", (250, 1100, 2300), 0.35), "n": ("v", (250, 1400, 2500), 0.35), "l": ("v", (360, 1300, 2700), 0.6),
+    "r": ("v", (420, 1250, 1650), 0.7), "w": ("v", (300, 700, 2200), 0.6), "h": ("n", (500, 1800, 2500), 0.25),
+    "s": ("n", (2600, 4500, 6000), 0.3), "f": ("n", (1500, 3500, 5500), 0.15), "k": ("b", (1800, 2500, 3500), 0.4),
+    "t": ("b", (2500, 4000, 5500), 0.4), "p": ("b", (800, 1500, 2500), 0.4),
+}
+DURATIONS = {"v": 0.13, "n": 0.08, "b": 0.04}
+
+KEYWORD = "h ey m i r a"
+COMMANDS = ["w a t i s t a i m", "t e l m i a w e", "p l e i m u s i k"]
+NEGATIVES = [
+    "h ey s i r i", "m i r o r", "m a r i a", "h e l o", "o k ey", "k a m e r a", "h ey m a n", "a m e r i k a",
+    "s i u l ey t e r", "w e r i s m ai", "t u m a r o", "f i l m", "h a m e r", "p a n a m a", "n a i s",
+    "s t o r i", "l e t s k o", "m a r k", "r i m i n t m i", "h a i",
+]
+
+
+def synthesize(text, f0, vtl, tempo, rng):
+    """
+    Source-filter synthesis of a phone string.
+
+    Args:
+        text: Space-separated phones from PHONES ("ai" is read as a + i)
+        f0: Pitch in Hz
+        vtl: Formant scale (shorter vocal tract = higher formants)
+        tempo: Speaking rate factor (>1 = faster)
+        rng: numpy Generator for jitter and noise sources
+    """
+    phones = []
+    for token in text.split():
+        phones.extend([token] if token in PHONES else list(token))
+    block = int(0.005 * FS)
+    out, states, previous = [], [np.zeros(2) for _ in range(3)], None
+    phase = 0.0
+    for phone in phones:
+        kind, formants, amp = PHONES[phone]
+        duration = DURATIONS[kind] * rng.uniform(0.85, 1.15) / tempo
+        target = np.array(formants, dtype=float) * vtl
+        start = target if previous is None else previous
+        n_blocks = max(1, int(duration * FS / block))
+        for b in range(n_blocks):
+            # Formants glide from the previous phone over the first 40% (coarticulation)
+            mix = min(1.0, (b + 1) / max(1, 0.4 * n_blocks))
+            current = start + (target - start) * mix
+            if kind == "v":
+                pitch = f0 * (1 + 0.02 * np.sin(phase * 0.01)) * rng.uniform(0.99, 1.01)
+                t = phase + np.arange(block) * pitch / FS
+                source = (np.mod(t, 1.0) < 0.5).astype(float) - 0.5  # Crude glottal pulse train
+                phase = t[-1] + pitch / FS
+                source += 0.05 * rng.standard_normal(block)
+            else:
+                source = rng.standard_normal(block) * (1.0 if kind == "n" or b < 2 else 0.0)
+            signal = source
+            for k, (freq, bandwidth) in enumerate(zip(current, (80, 100, 140))):
+                r = np.exp(-np.pi * bandwidth / FS)
+                a = [1.0, -2 * r * np.cos(2 * np.pi * min(freq, 7500) / FS), r * r]
+                signal, states[k] = lfilter([1 - r], a, signal, zi=states[k])
+            out.append(signal * amp)
+        previous = target
+    audio = np.concatenate(out)
+    ramp = min(len(audio) // 2, int(0.01 * FS))
+    audio[:ramp] *= np.linspace(0, 1, ramp)
+    audio[-ramp:] *= np.linspace(1, 0, ramp)
+    return audio / (np.max(np.abs(audio)) + 1e-9) * rng.uniform(0.25, 0.6)
+
+
+def background(seconds, level, rng):
+    """Pink (1/f) room noise at RMS `level`."""
+    noise = lfilter([0.049922035, -0.095993537, 0.050612699, -0.004408786],
+                    [1, -2.494956002, 2.017265875, -0.522189400], rng.standard_normal(int(round(seconds * FS))))
+    return noise / (np.std(noise) + 1e-9) * level
+
+
+class Speaker:
+    def __init__(self, rng, f0=None, vtl=None):
+        self.f0 = f0 or rng.uniform(90, 240)
+        self.vtl = vtl or rng.uniform(0.9, 1.18)
+
+    def say(self, text, rng):
+        return synthesize(text, self.f0 * rng.uniform(0.92, 1.08), self.vtl * rng.uniform(0.98, 1.02),
+                          rng.uniform(0.85, 1.2), rng)
+
+
+def in_noise(audio, rng, snr_db=None):
+    """Clip with 0.5 s of noise before and after, at a random SNR."""
+    snr_db = rng.uniform(12, 30) if snr_db is None else snr_db
+    level = np.sqrt(np.mean(audio ** 2)) / (10 ** (snr_db / 20))
+    lead = background(0.5, level, rng)
+    clip = np.concatenate([lead, audio + background(len(audio) / FS, level, rng), background(0.5, level, rng)])
+    return clip.astype(np.float32)
+
+
+def synthetic_sets(args, rng):
+    user = Speaker(rng)
+    enroll = [in_noise(user.say(KEYWORD, rng), rng) for _ in range(args.enroll)]
+    others = [Speaker(rng) for _ in range(5)]
+    positives = []
+    for i in range(args.positives):
+        speech = user.say(KEYWORD, rng)
+        if i % 2:
+            # Command right after the wake word, no pause
+            speech = np.concatenate([speech, user.say(COMMANDS[i % len(COMMANDS)], rng)])
+        positives.append(("user", in_noise(speech, rng)))
+    for speaker in others:
+        for _ in range(max(1, args.positives // 10)):
+            positives.append(("other voice", in_noise(speaker.say(KEYWORD, rng), rng)))
+    negatives = []
+    for i in range(args.negatives):
+        speaker = user if i % 2 else others[i % len(others)]
+        negatives.append((NEGATIVES[i % len(NEGATIVES)], in_noise(speaker.say(NEGATIVES[i % len(NEGATIVES)], rng), rng)))
+    return enroll, positives, negatives
+
+
+def fixture_sets(directory):
+    directory = Path(directory)
+    load = lambda name: [(p.stem, a) for p, a in zip(sorted((directory / name).glob("*.wav")),
+                                                     load_templates(directory / name))]
+    return [a for _, a in load("enroll")], load("positive"), load("negative")
+
+# ============================================
+# 📏 Measurement
+# ============================================
+def detects(spotter, audio):
+    spotter.reset()
+    return any(spotter.process(audio[i:i + FRAME]) for i in range(0, len(audio) - FRAME + 1, FRAME))
+
+
+def idle_cpu(spotter, seconds, rng):
+    """CPU seconds per second of audio for noise with an occasional door or cough."""
+    audio = background(seconds, 0.003, rng)
+    for start in rng.uniform(0, seconds - 1, size=max(1, int(seconds / 20))):
+        i = int(start * FS)
+        audio[i:i + 2000] += 0.2 * rng.standard_normal(2000) * np.hanning(2000)
+    audio = audio.astype(np.float32)
+    spotter.reset()
+    checks, fired = spotter.checks, 0
+    started = time.process_time()
+    for i in range(0, len(audio) - FRAME + 1, FRAME):
+        fired += spotter.process(audio[i:i + FRAME])
+    return (time.process_time() - started) / seconds, spotter.checks - checks, fired
+
+
+def whisper_cpu(rng):
+    """CPU seconds per second of audio for the old fallback (Whisper base on 4 s clips, back to back)."""
+    import whisper
+    model = whisper.load_model("base", device="cpu")
+    clip = background(4.0, 0.003, rng).astype(np.float32)
+    model.transcribe(clip, fp16=False)  # Warm-up
+    started = time.process_time()
+    model.transcribe(clip, fp16=False)
+    return (time.process_time() - started) / 4.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Directory with enroll/, positive/ and negative/ WAV files")
+    parser.add_argument("--enroll", type=int, default=3, help="Synthetic samples to enroll")
+    parser.add_argument("--positives", type=int, default=100)
+    parser.add_argument("--negatives", type=int, default=200)
+    parser.add_argument("--idle", type=float, default=120.0, help="Seconds of background noise for the CPU test")
+    parser.add_argument("--threshold", type=float, default=None, help="Fixed threshold (default: from enrollment)")
+    parser.add_argument("--whisper", action="store_true", help="Also measure the Whisper fallback")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    enroll, positives, negatives = fixture_sets(args.fixtures) if args.fixtures else synthetic_sets(args, rng)
+    if not enroll:
+        parser.error("No enrollment samples")
+    spotter = KeywordSpotter(enroll, threshold=args.threshold)
+    source = args.fixtures or "synthetic speech"
+    print(f"{len(enroll)} enrolled samples ({source}), threshold {spotter.threshold:.2f}")
+
+    groups = {}
+    for group, audio in positives:
+        groups.setdefault(group, []).append(detects(spotter, audio))
+    rejected = sum(not hit for hits in groups.values() for hit in hits)
+    print(f"  false rejects: {rejected}/{len(positives)} ({rejected / max(1, len(positives)):.1%})")
+    if not args.fixtures:
+        for group, hits in groups.items():
+            print(f"    {group:<12} detected {sum(hits)}/{len(hits)}")
+
+    accepted = [name for name, audio in negatives if detects(spotter, audio)]
+    seconds = sum(len(audio) for _, audio in negatives) / FS
+    print(f"  false accepts: {len(accepted)}/{len(negatives)} ({len(accepted) / max(1, len(negatives)):.1%}), "
+          f"{len(accepted) / seconds * 3600:.1f} per hour of speech")
+    if accepted:
+        print(f"    accepted: {', '.join(sorted(set(accepted)))}")
+
+    cpu, checks, fired = idle_cpu(spotter, args.idle, rng)
+    print(f"  idle: {cpu:.2%} of one core, {checks} DTW checks and {fired} detections in {args.idle:.0f} s of noise")
+    if args.whisper:
+        try:
+            print(f"  Whisper fallback: {whisper_cpu(rng):.0%} of one core")
+        except ImportError:
+            print("  Whisper fallback: openai-whisper not installed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: conversation memory append and tail-read cost with a large history.
+Appends N entries to the segmented memory log and reports per-append latency,
+rotation cost and load_memory(limit) latency. For comparison, the previous
+single-file implementation (size check on every save, full parse + rewrite on
+cleanup, full parse for tail reads) is replayed on a smaller history.
+
+Usage:
+    python benchmarks/bench_memory.py --entries 1000000 --retain 1000000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.memory_log import SegmentedLog
+
+
+def make_entry(i, rng):
+    return {"user": f"question {i} " + "word " * rng.randint(3, 20),
+            "ai": f"answer {i} " + "word " * rng.randint(10, 120)}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def describe(label, seconds):
+    us = [s * 1e6 for s in seconds]
+    print(f"  {label:<22} p50={percentile(us, 50):8.1f} us  p99={percentile(us, 99):8.1f} us  "
+          f"max={max(us) / 1000:7.2f} ms")
+
+
+# --- previous implementation, kept here only for comparison ---
+
+def legacy_load(path, limit=None):
+    memories = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                memories.append(json.loads(line))
+    return memories[-limit:] if limit else memories
+
+
+def legacy_save(path, entry, max_entries):
+    with open(path, "a", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+        f.write("\n")
+    if os.path.getsize(path) > max_entries * 200:
+        memories = legacy_load(path)
+        if len(memories) > 500:
+            shutil.copy2(path, str(path) + ".bak")
+            with open(path, "w", encoding="utf-8") as f:
+                for memory in memories[-500:]:
+                    json.dump(memory, f, ensure_ascii=False)
+                    f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--retain", type=int, default=1_000_000, help="MAX_MEMORY_ENTRIES for the run")
+    parser.add_argument("--segment-entries", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=20, help="load_memory(limit) size")
+    parser.add_argument("--legacy-entries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        max_segments = -(-args.retain // args.segment_entries) + 1
+        log = SegmentedLog(Path(tmp) / "memory", segment_entries=args.segment_entries, max_segments=max_segments)
+
+        appends, rotations = [], []
+        start_all = time.perf_counter()
+        for i in range(args.entries):
+            entry = make_entry(i, rng)
+            start = time.perf_counter()
+            log.append(entry)
+            elapsed = time.perf_counter() - start
+            (rotations if i and i % args.segment_entries == 0 else appends).append(elapsed)
+        total = time.perf_counter() - start_all
+        log.close()
+
+        disk = sum(p.stat().st_size for p in (Path(tmp) / "memory").iterdir())
+        print(f"Segmented log: {args.entries} entries in {total:.1f} s, {len(log)} retained, "
+              f"{disk / 1024 / 1024:.0f} MB on disk")
+        describe("append", appends)
+        if rotations:
+            describe("append + rotation", rotations)
+
+        reopen_start = time.perf_counter()
+        log = SegmentedLog(Path(tmp) / "memory", segment_entries=args.segment_entries, max_segments=max_segments)
+        print(f"  reopen                 {(time.perf_counter() - reopen_start) * 1000:.2f} ms")
+        tails = []
+        for _ in range(200):
+            start = time.perf_counter()
+            recent = log.tail(args.limit)
+            tails.append(time.perf_counter() - start)
+        assert len(recent) == min(args.limit, len(log))
+        describe(f"load_memory({args.limit})", tails)
+        log.close()
+
+        legacy_path = Path(tmp) / "memory.json"
+        saves = []
+        for i in range(args.legacy_entries):
+            entry = make_entry(i, rng)
+            start = time.perf_counter()
+            legacy_save(legacy_path, entry, max_entries=1000)
+            saves.append(time.perf_counter() - start)
+        tails = []
+        for _ in range(20):
+            start = time.perf_counter()
+            legacy_load(legacy_path, args.limit)
+            tails.append(time.perf_counter() - start)
+        print(f"\nPrevious single-file memory ({args.legacy_entries} saves, MAX_MEMORY_ENTRIES=1000):")
+        print(f"  mean save {statistics.mean(saves) * 1e6:.1f} us")
+        describe("save", saves)
+        describe(f"load_memory({args.limit})", tails)
+
+
+if __name__ == "__main__":
+    main()
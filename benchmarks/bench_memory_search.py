@@ -0,0 +1,96 @@
+"""
+Benchmark: SQLite memory backend - batched write throughput and FTS5 search
+latency on a multi-million-row history.
+
+Usage:
+    python benchmarks/bench_memory_search.py --rows 2000000 --queries 200
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.memory_sqlite import SQLiteMemory
+
+TOPICS = ["weather", "music", "cricket", "recipe", "python", "travel", "birthday", "movie", "exam",
+          "doctor", "train", "coffee", "rain", "delhi", "mumbai", "guitar", "football", "sister", "meeting"]
+FILLER = ("the a to and is it you me for what how can please tell about my your this today "
+          "tomorrow maybe really good nice time day going want need like know think").split()
+
+
+def synthetic_entries(count, rng):
+    # Zipf-like topic popularity, so some queries match far more rows than others
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+    for i in range(count):
+        topics = rng.choices(TOPICS, weights=weights, k=2)
+        user = " ".join(rng.choices(FILLER, k=rng.randint(4, 12)) + topics + [f"item{rng.randrange(100000)}"])
+        ai = " ".join(rng.choices(FILLER, k=rng.randint(10, 40)) + topics)
+        yield {"user": user, "ai": ai}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--appends", type=int, default=20_000, help="Entries written through the batched writer")
+    parser.add_argument("--db", default=None, help="Reuse/keep a database file instead of a temporary one")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = SQLiteMemory(args.db or Path(tmp) / "memory.db")
+
+        existing = len(memory)
+        if existing < args.rows:
+            start = time.perf_counter()
+            memory.import_entries(synthetic_entries(args.rows - existing, rng))
+            elapsed = time.perf_counter() - start
+            print(f"Bulk import: {args.rows - existing} rows in {elapsed:.1f} s "
+                  f"({(args.rows - existing) / elapsed:,.0f} rows/s)")
+
+        # Appends as save_memory does them: queued, written in batches
+        start = time.perf_counter()
+        enqueue = []
+        for entry in synthetic_entries(args.appends, rng):
+            t = time.perf_counter()
+            memory.append(entry)
+            enqueue.append(time.perf_counter() - t)
+        memory.flush()
+        elapsed = time.perf_counter() - start
+        print(f"Batched appends: {args.appends} in {elapsed:.2f} s ({args.appends / elapsed:,.0f} rows/s), "
+              f"save_memory call p99 {percentile(enqueue, 99) * 1e6:.1f} us")
+
+        total = len(memory)
+        latencies = []
+        hits = 0
+        for _ in range(args.queries):
+            words = rng.sample(TOPICS, k=rng.randint(1, 2))
+            if rng.random() < 0.3:
+                words.append(f"item{rng.randrange(100000)}")  # Selective query
+            start = time.perf_counter()
+            results = memory.search(" ".join(words), limit=5)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += bool(results)
+
+        print(f"search_memory over {total:,} rows ({args.queries} queries, {hits} with hits): "
+              f"p50={percentile(latencies, 50):.2f} ms  p95={percentile(latencies, 95):.2f} ms  "
+              f"max={max(latencies):.2f} ms")
+
+        start = time.perf_counter()
+        memory.tail(20)
+        print(f"load_memory(20): {(time.perf_counter() - start) * 1000:.2f} ms")
+        memory.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: memory recall index - search latency, budget adherence and recall
+quality at 100k entries.
+Uses clustered synthetic embeddings (no model download) so the numbers isolate
+the index; pass --embed to also time the real embedding model on sample prompts.
+
+Usage:
+    python benchmarks/bench_recall.py --entries 100000 --budget-ms 10
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.memory_index import VectorIndex
+
+DIM = 384
+
+
+def clustered_vectors(count, rng, clusters=500):
+    centers = rng.standard_normal((clusters, DIM)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    return centers[labels] + 0.6 * rng.standard_normal((count, DIM)).astype(np.float32), centers
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(dtype, sketch_dim, vectors, queries, args):
+    base, extra = vectors[:-200], vectors[-200:]
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(tmp, dim=DIM, dtype=dtype, model="synthetic", sketch_dim=sketch_dim)
+        start = time.perf_counter()
+        for begin in range(0, len(base), 1000):
+            batch = base[begin:begin + 1000]
+            index.add(batch, [{"row": begin + i} for i in range(len(batch))])
+        build = time.perf_counter() - start
+
+        # Incremental adds, as save_memory does them
+        single = []
+        for i, vector in enumerate(extra):
+            start = time.perf_counter()
+            index.add(vector, [{"row": len(base) + i}])
+            single.append((time.perf_counter() - start) * 1000)
+
+        # Ground truth: exact brute-force top-k over every vector
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        exact = [set(np.argsort(-(normalized @ (q / np.linalg.norm(q))))[:args.k].tolist()) for q in queries]
+
+        size_mb = sum(path.stat().st_size for path in Path(tmp).glob("*.bin")) / 1024 / 1024
+        print(f"\n{dtype}, sketch {sketch_dim or 'off'}: {len(index)} entries, {size_mb:.0f} MB on disk, "
+              f"built in {build:.1f} s, incremental add p50 {percentile(single, 50):.2f} ms")
+        for label, budget in (("no budget", None), (f"budget {args.budget_ms:g} ms", args.budget_ms)):
+            latencies, overlap = [], []
+            for query, truth in zip(queries, exact):
+                start = time.perf_counter()
+                hits = index.search(query, k=args.k, budget_ms=budget)
+                latencies.append((time.perf_counter() - start) * 1000)
+                overlap.append(len({entry["row"] for _, entry in hits} & truth) / args.k)
+            print(f"  {label:<16} p50={percentile(latencies, 50):6.2f} ms  p95={percentile(latencies, 95):6.2f} ms  "
+                  f"max={max(latencies):6.2f} ms  recall@{args.k}={np.mean(overlap):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=10.0)
+    parser.add_argument("--configs", nargs="+", default=["float32:64", "float32:0", "int8:64"],
+                        help="dtype:sketch_dim pairs (sketch_dim 0 = scan full vectors)")
+    parser.add_argument("--embed", action="store_true", help="Also time the embedding model")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors, centers = clustered_vectors(args.entries + 200, rng)
+    queries = centers[rng.integers(0, len(centers), args.queries)] + 0.6 * rng.standard_normal(
+        (args.queries, DIM)).astype(np.float32)
+
+    for config in args.configs:
+        dtype, sketch_dim = config.split(":")
+        run(dtype, int(sketch_dim), vectors, queries, args)
+
+    if args.embed:
+        from modules.memory_recall import get_resource
+        embed = get_resource("embedder")
+        prompts = ["What did I tell you about my sister?", "Remind me what we said about the trip to Goa",
+                   "What's the weather like?", "Do you remember my favourite song?"]
+        embed(prompts[:1])
+        latencies = []
+        for prompt in prompts * 10:
+            start = time.perf_counter()
+            embed([prompt])
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"\nQuery embedding: p50={percentile(latencies, 50):.1f} ms  p95={percentile(latencies, 95):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
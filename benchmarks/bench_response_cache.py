@@ -0,0 +1,142 @@
+"""
+Benchmark: semantic response cache on a stream of near-duplicate questions.
+Replays a synthetic day of questions - paraphrases of weather, time and general
+questions, several cities, conversions and routes in both directions - against
+the cache with a simulated clock. It reports hit rate, the agent latency saved
+and wrong hits, meaning a cached answer given to a different question. Each
+direction-swapped pair ("100 dollars to rupees" / "100 rupees to dollars") is
+also checked on its own: neither may be answered from the other.
+
+By default only exact (normalized) keys are used, so no model download is needed;
+pass --embed to add paraphrase matching with the real embedding model.
+
+Usage:
+    python benchmarks/bench_response_cache.py --questions 2000 --agent-latency 2.5 --embed
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.response_cache import TOOL_TTLS, ResponseCache
+from modules.tools import get_time, get_weather, web_search
+
+CITIES = ["Delhi", "Mumbai", "Pune", "London", "Tokyo", "Chennai"]
+CURRENCIES = ["dollars", "rupees", "euros", "yen"]
+
+# (topic, tools the answer uses, phrasings) - tool names as the agent reports them
+TOPICS = [
+    ("weather:{city}", [get_weather.name], [
+        "What's the weather in {city}?", "weather in {city}", "How's the weather in {city} today?",
+        "Tell me the weather in {city}.", "What is the weather like in {city}?",
+    ]),
+    ("time", [get_time.name], ["What time is it?", "Tell me the time.", "What's the time now?"]),
+    ("rainbow", [], [
+        "How do rainbows form?", "Explain how rainbows form.", "How does a rainbow form?",
+        "Can you explain how rainbows are formed?",
+    ]),
+    ("sky", [], ["Why is the sky blue?", "why is the sky blue", "What makes the sky blue?"]),
+    ("capital:{city}", [web_search.name], ["Tell me about {city}.", "What is {city} famous for?"]),
+    ("convert:{a}:{b}", [], ["Convert 100 {a} to {b}.", "What is 100 {a} in {b}?", "100 {a} to {b}"]),
+    ("route:{city}:{other}", [web_search.name], [
+        "How far is it from {city} to {other}?", "Distance from {city} to {other}", "Flights from {city} to {other}",
+    ]),
+]
+
+# Direction-swapped pairs: the same words, opposite meaning
+SWAPPED_PAIRS = [
+    ("Convert 100 dollars to rupees.", "Convert 100 rupees to dollars."),
+    ("What is 50 euros in yen?", "What is 50 yen in euros?"),
+    ("How far is it from Delhi to Pune?", "How far is it from Pune to Delhi?"),
+    ("Flights from London to Tokyo", "Flights from Tokyo to London"),
+    ("Translate hello from English to Hindi.", "Translate hello from Hindi to English."),
+    ("Is Mumbai bigger than Chennai?", "Is Chennai bigger than Mumbai?"),
+]
+
+
+def make_questions(count, rng):
+    questions = []
+    for _ in range(count):
+        topic, tools, phrasings = rng.choice(TOPICS)
+        city, other = rng.sample(CITIES, 2)
+        a, b = rng.sample(CURRENCIES, 2)
+        slots = {"city": city, "other": other, "a": a, "b": b}
+        questions.append((topic.format(**slots), tools, rng.choice(phrasings).format(**slots)))
+    return questions
+
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def swapped_hits(make_cache):
+    """Direction-swapped pairs where one question is answered from the other."""
+    hits = 0
+    for first, second in SWAPPED_PAIRS:
+        for question, swapped in ((first, second), (second, first)):
+            cache = make_cache()
+            cache.put(question, "answer")
+            hits += cache.get(swapped) is not None
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--agent-latency", type=float, default=2.5, help="Seconds an agent answer takes")
+    parser.add_argument("--interval", type=float, default=30.0, help="Simulated seconds between questions")
+    parser.add_argument("--entries", type=int, default=256)
+    parser.add_argument("--threshold", type=float, default=0.92)
+    parser.add_argument("--embed", action="store_true", help="Use the embedding model for paraphrases")
+    args = parser.parse_args()
+
+    # A tool without a TTL entry is never cached - the run would measure nothing for it
+    unknown = {name for _, tools, _ in TOPICS for name in tools} - set(TOOL_TTLS)
+    if unknown:
+        print(f"❌ No response cache TTL for tools {sorted(unknown)}")
+        sys.exit(1)
+
+    embed = None
+    if args.embed:
+        from utils.model_registry import get_resource
+        embed = get_resource("embedder")
+
+    clock = SimulatedClock()
+    cache = ResponseCache(max_entries=args.entries, threshold=args.threshold, embed=embed, clock=clock)
+    questions = make_questions(args.questions, random.Random(0))
+
+    wrong = 0
+    lookup_ms = []
+    for topic, tools, question in questions:
+        clock.now += args.interval
+        start = time.perf_counter()
+        answer = cache.get(question)
+        lookup_ms.append((time.perf_counter() - start) * 1000)
+        if answer is None:
+            cache.put(question, f"[{topic}]", tools=tools, latency=args.agent_latency)
+        elif answer != f"[{topic}]":
+            wrong += 1
+
+    stats = cache.stats()
+    lookup_ms.sort()
+    mode = f"semantic (threshold {args.threshold})" if embed else "exact keys only"
+    print(f"{len(questions)} questions, {mode}:")
+    print(f"  hit rate {stats['hit_rate']:.0%} (exact {stats['exact_hits']}, semantic {stats['semantic_hits']}), "
+          f"wrong hits {wrong}, not cacheable {stats['not_cacheable']}")
+    print(f"  agent time saved {stats['saved_seconds'] / 60:.1f} min of "
+          f"{len(questions) * args.agent_latency / 60:.1f} min")
+    swapped = swapped_hits(lambda: ResponseCache(threshold=args.threshold, embed=embed, clock=SimulatedClock()))
+    print(f"  direction-swapped pairs answered from each other: {swapped} of {len(SWAPPED_PAIRS) * 2}")
+    print(f"  lookup p50 {lookup_ms[len(lookup_ms) // 2]:.3f} ms, p99 {lookup_ms[int(len(lookup_ms) * 0.99)]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Load test: thousands of synthetic conversation sessions in the session store.
+Creates sessions, then touches them in a skewed (mostly recent, some cold)
+access pattern and reports memory residency, disk usage, and get/set latency
+for in-memory hits vs. sessions loaded back from disk.
+
+Usage:
+    python benchmarks/bench_sessions.py --sessions 5000 --turns 10 --max-sessions 256
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from modules.session_store import SessionStore
+
+SYSTEM = SystemMessage(content="You are Mira-AI, a helpful and empathetic voice assistant.")
+
+
+def synthetic_session(turns, rng):
+    messages = [SYSTEM]
+    for turn in range(turns):
+        words = rng.randint(8, 40)
+        messages.append(HumanMessage(content=f"Question {turn}: " + "lorem " * words))
+        messages.append(AIMessage(content=f"Answer {turn}: " + "ipsum " * (words * 2)))
+    return messages
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def describe(label, seconds):
+    if not seconds:
+        print(f"  {label:<16} n=0")
+        return
+    ms = [s * 1000 for s in seconds]
+    print(f"  {label:<16} n={len(ms):<6} p50={percentile(ms, 50):.3f} ms  "
+          f"p95={percentile(ms, 95):.3f} ms  mean={statistics.mean(ms):.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=10, help="Turns per synthetic session")
+    parser.add_argument("--max-sessions", type=int, default=256)
+    parser.add_argument("--max-mb", type=float, default=16)
+    parser.add_argument("--accesses", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as session_dir:
+        tracemalloc.start()
+        store = SessionStore(session_dir, max_sessions=args.max_sessions,
+                             max_bytes=int(args.max_mb * 1024 * 1024))
+
+        set_times = []
+        for i in range(args.sessions):
+            messages = synthetic_session(args.turns, rng)
+            start = time.perf_counter()
+            store[f"user-{i}"] = messages
+            set_times.append(time.perf_counter() - start)
+
+        # 80% of accesses go to the most recent 5% of sessions, the rest anywhere
+        hot = max(1, args.sessions // 20)
+        hit_times, load_times = [], []
+        for _ in range(args.accesses):
+            if rng.random() < 0.8:
+                session_id = f"user-{args.sessions - 1 - rng.randrange(hot)}"
+            else:
+                session_id = f"user-{rng.randrange(args.sessions)}"
+            resident = store.peek(session_id) is not None
+            start = time.perf_counter()
+            messages = store[session_id]
+            elapsed = time.perf_counter() - start
+            (hit_times if resident else load_times).append(elapsed)
+            # Append a turn, as ask_brain would
+            store[session_id] = messages + [HumanMessage(content="follow-up"), AIMessage(content="reply")]
+
+        store.flush()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        disk_bytes = sum(path.stat().st_size for path in Path(session_dir).glob("*.json.gz"))
+
+        print(f"Sessions: {args.sessions} x {args.turns} turns, memory limit "
+              f"{args.max_sessions} sessions / {args.max_mb:.0f} MB")
+        print(f"Store stats: {store.stats()}")
+        print(f"Peak traced memory: {peak / 1024 / 1024:.1f} MB, disk: {disk_bytes / 1024 / 1024:.1f} MB "
+              f"({disk_bytes / args.sessions / 1024:.1f} KB/session)")
+        describe("set (+spill)", set_times)
+        describe("get (memory)", hit_times)
+        describe("get (disk)", load_times)
+
+
+if __name__ == "__main__":
+    main()
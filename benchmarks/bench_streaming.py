@@ -0,0 +1,76 @@
+"""
+Benchmark: time-to-first-audio for ask_brain + speak vs. ask_brain_stream + speak_stream.
+Runs against a local fake Ollama server; TTS is replaced by a fake with a
+configurable synthesis delay and audio plays to a null device, so no network
+or speakers are needed.
+
+Usage:
+    python benchmarks/bench_streaming.py --runs 5 --tokens-per-second 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.fake_ollama import FakeOllama
+from modules.audio_output import AudioOutput, NullDevice
+
+
+def fake_synthesizer(base_delay, per_char_delay, bytes_per_char=800):
+    """Build a stand-in for text_to_speech.synthesize with length-dependent delay."""
+    async def synthesize(text, lang="en", emotion="neutral"):
+        await asyncio.sleep(base_delay + per_char_delay * len(text))
+        return b"\0" * (len(text) * bytes_per_char)
+    return synthesize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tokens-per-second", type=float, default=20.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--tts-base-delay", type=float, default=0.25)
+    parser.add_argument("--tts-per-char-delay", type=float, default=0.002)
+    args = parser.parse_args()
+
+    with FakeOllama(tokens_per_second=args.tokens_per_second, first_token_delay=args.first_token_delay) as fake:
+        # brain.py reads the Ollama URL at import time
+        os.environ["OLLAMA_BASE_URL"] = fake.base_url
+        from modules import brain, text_to_speech
+
+        device = NullDevice()
+        text_to_speech._audio_output = AudioOutput(
+            fake_synthesizer(args.tts_base_delay, args.tts_per_char_delay), device=device)
+
+        results = {"blocking": [], "streaming": []}
+        for run in range(args.runs):
+            session = f"bench-{run}"
+
+            device.play_times.clear()
+            start = time.perf_counter()
+            reply = brain.ask_brain("What's the weather in Delhi?", session_id=session + "-blocking")
+            text_to_speech.speak(reply)
+            results["blocking"].append(device.play_times[0] - start)
+
+            device.play_times.clear()
+            start = time.perf_counter()
+            text_to_speech.speak_stream(brain.ask_brain_stream("What's the weather in Delhi?", session_id=session + "-streaming"))
+            results["streaming"].append(device.play_times[0] - start)
+
+    print(f"\n⏱️ Time to first audio over {args.runs} runs "
+          f"({args.tokens_per_second:.0f} tok/s, {len(fake.tokens())} tokens)")
+    for name, samples in results.items():
+        print(f"   {name:<10} median {statistics.median(samples) * 1000:7.0f} ms   "
+              f"min {min(samples) * 1000:7.0f} ms   max {max(samples) * 1000:7.0f} ms")
+    speedup = statistics.median(results["blocking"]) / statistics.median(results["streaming"])
+    print(f"   speedup    {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
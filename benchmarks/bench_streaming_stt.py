@@ -0,0 +1,91 @@
+"""
+Benchmark: end-of-speech to transcript latency, batch vs. streaming Whisper.
+Replays WAV fixtures in real time (100 ms frames, like the recorder) and
+measures how long after the last frame the final transcript is ready.
+
+Usage:
+    python benchmarks/bench_streaming_stt.py --fixtures benchmarks/fixtures
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.io import wavfile
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from modules.speech_to_text import StreamingTranscriber, get_stt_backend, to_whisper_audio
+
+FRAME_DURATION = 0.1  # Same frame size as utils/mic_record
+
+
+def load_fixture(path):
+    """Read a WAV fixture as mono int16."""
+    fs, audio = wavfile.read(path)
+    if audio.ndim > 1:
+        audio = audio[:, 0]
+    if audio.dtype != np.int16:
+        audio = (np.clip(audio.astype(np.float32), -1.0, 1.0) * 32767).astype(np.int16)
+    return fs, audio
+
+
+def replay(fs, audio, on_frame, realtime=True):
+    """Feed a clip frame by frame, sleeping so frames arrive at capture speed."""
+    frame_size = int(fs * FRAME_DURATION)
+    start = time.perf_counter()
+    for i, offset in enumerate(range(0, len(audio), frame_size)):
+        if realtime:
+            delay = start + (i + 1) * FRAME_DURATION - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        on_frame(audio[offset:offset + frame_size], fs)
+
+
+def run_batch(fs, audio, realtime):
+    frames = []
+    replay(fs, audio, lambda chunk, rate: frames.append(chunk), realtime)
+    end_of_speech = time.perf_counter()
+    result = get_stt_backend().transcribe(to_whisper_audio(np.concatenate(frames), fs))
+    return result["text"].strip(), time.perf_counter() - end_of_speech
+
+
+def run_streaming(fs, audio, realtime):
+    transcriber = StreamingTranscriber()
+    replay(fs, audio, transcriber.feed, realtime)
+    end_of_speech = time.perf_counter()
+    text = transcriber.finalize(save=False)
+    return text, time.perf_counter() - end_of_speech
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=str(BASE_DIR / "benchmarks" / "fixtures"),
+                        help="Directory of .wav files (optional .txt reference next to each)")
+    parser.add_argument("--no-realtime", action="store_true", help="Feed frames as fast as possible")
+    args = parser.parse_args()
+
+    fixtures = sorted(Path(args.fixtures).glob("*.wav"))
+    if not fixtures:
+        print(f"❌ No .wav fixtures found in {args.fixtures}")
+        return
+
+    get_stt_backend()
+
+    print(f"{'fixture':<28}{'length':>8}{'batch':>10}{'stream':>10}")
+    for path in fixtures:
+        fs, audio = load_fixture(path)
+        _, batch_latency = run_batch(fs, audio, not args.no_realtime)
+        text, stream_latency = run_streaming(fs, audio, not args.no_realtime)
+        print(f"{path.name:<28}{len(audio) / fs:>7.1f}s{batch_latency * 1000:>8.0f}ms{stream_latency * 1000:>8.0f}ms")
+
+        reference = path.with_suffix(".txt")
+        if reference.exists():
+            print(f"   ref: {reference.read_text(encoding='utf-8').strip()}")
+        print(f"   got: {text}")
+
+
+if __name__ == "__main__":
+    main()
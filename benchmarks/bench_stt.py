@@ -0,0 +1,138 @@
+"""
+Benchmark: speech-to-text engines - real-time factor, RSS and word error rate.
+Each engine transcribes every fixture clip in a fresh subprocess, so memory
+numbers don't mix. A clip's reference transcript is the .txt file next to it
+(clips without one count for speed only).
+
+RTF is decode time divided by audio length. Below 1 means faster than real time.
+The first clip is decoded once more before timing, so one-off costs don't count.
+RSS is the increase over the process before the model was loaded.
+
+Usage:
+    python benchmarks/bench_stt.py --fixtures benchmarks/fixtures
+    python benchmarks/bench_stt.py --backends quantized faster-whisper --model small --threads 4
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.bench_emotion import rss_mb
+from benchmarks.bench_streaming_stt import load_fixture
+
+
+def normalize(text):
+    """Lowercase words without punctuation, for WER."""
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance (substitutions + deletions + insertions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+
+def run_child(backend, fixtures):
+    """Measure one engine in this process and print the result as JSON."""
+    from modules.speech_to_text import to_whisper_audio
+    from modules.stt_backends import load_stt_backend
+
+    clips = []
+    for path in fixtures:
+        fs, audio = load_fixture(path)
+        reference = path.with_suffix(".txt")
+        clips.append((path, to_whisper_audio(audio, fs),
+                      reference.read_text(encoding="utf-8") if reference.exists() else None))
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    engine = load_stt_backend(backend)
+    load_time = time.perf_counter() - start
+    engine.transcribe(clips[0][1])  # Warm-up
+
+    audio_s = decode_s = 0.0
+    errors = words = 0
+    for path, audio, reference in clips:
+        start = time.perf_counter()
+        text = engine.transcribe(audio)["text"]
+        decode_s += time.perf_counter() - start
+        audio_s += len(audio) / 16000
+        if reference is not None:
+            errors += word_errors(normalize(reference), normalize(text))
+            words += len(normalize(reference))
+        print(f"  {path.name}: {text.strip()}", file=sys.stderr)
+
+    print(json.dumps({
+        "backend": engine.name,
+        "device": engine.device,
+        "load_s": round(load_time, 2),
+        "audio_s": round(audio_s, 1),
+        "rtf": round(decode_s / audio_s, 3),
+        "wer": round(errors / words, 4) if words else None,
+        "rss_mb": round(rss_mb() - baseline, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=str(BASE_DIR / "benchmarks" / "fixtures"),
+                        help="Directory of .wav files (with a .txt reference next to each)")
+    parser.add_argument("--backends", nargs="+", default=["whisper", "quantized", "faster-whisper"])
+    parser.add_argument("--model", help="Model size for every engine (default: STT_MODEL)")
+    parser.add_argument("--threads", type=int, help="CPU threads (default: STT_THREADS)")
+    parser.add_argument("--compute-type", help="faster-whisper compute type (default: STT_COMPUTE_TYPE)")
+    parser.add_argument("--verbose", action="store_true", help="Show each transcript")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    fixtures = sorted(Path(args.fixtures).glob("*.wav"))
+    if not fixtures:
+        print(f"❌ No .wav fixtures found in {args.fixtures}")
+        return
+
+    if args.child:
+        run_child(args.child, fixtures)
+        return
+
+    env = dict(os.environ)
+    if args.model:
+        env["STT_MODEL"] = args.model
+    if args.threads is not None:
+        env["STT_THREADS"] = str(args.threads)
+    if args.compute_type:
+        env["STT_COMPUTE_TYPE"] = args.compute_type
+    references = sum(path.with_suffix(".txt").exists() for path in fixtures)
+    print(f"{len(fixtures)} clips ({references} with reference text), model {env.get('STT_MODEL', 'base')}")
+    print(f"{'backend':<16}{'device':>8}{'load':>8}{'RTF':>8}{'WER':>8}{'RSS':>10}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--fixtures", args.fixtures],
+            capture_output=True, text=True, env=dict(env, STT_BACKEND=backend),
+        )
+        lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+        if args.verbose:
+            print("\n".join(line for line in proc.stderr.splitlines() if line.startswith("  ")))
+        if proc.returncode != 0 or not lines:
+            print(f"{backend:<16} ❌ failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'no output'}")
+            continue
+        r = json.loads(lines[-1])
+        if r["backend"] != backend:
+            print(f"{backend:<16} ⚠️ not available, measured {r['backend']} instead")
+        wer = f"{r['wer']:.1%}" if r["wer"] is not None else "-"
+        print(f"{backend:<16}{r['device']:>8}{r['load_s']:>7.1f}s{r['rtf']:>8.3f}{wer:>8}{r['rss_mb']:>8.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
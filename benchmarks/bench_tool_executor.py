@@ -0,0 +1,91 @@
+"""
+Benchmark: tool calls on the agent's real path - a `create_agent` graph whose
+model asks for several independent tools in one step, with and without the
+ToolExecutor middleware that brain.py installs.
+
+The graph's tool node already runs the calls of one step in parallel, so the
+step takes about as long as its slowest call either way. What the executor
+adds is the deadline: a straggler that sleeps past it no longer holds up the
+step, and the model gets an error ToolMessage for it instead. The pool bound is
+shown with a single worker. The stub model answers instantly.
+
+Usage:
+    python benchmarks/bench_tool_executor.py --sleeps 0.3,0.5,0.2,0.4 --deadline 1.0
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+
+from modules.tool_executor import ToolExecutor
+
+
+@tool
+def stub_sleep(seconds: float) -> str:
+    """Sleep for a fixed time, standing in for a slow tool."""
+    time.sleep(seconds)
+    return f"slept {seconds:.2f} s"
+
+
+class ParallelToolModel(GenericFakeChatModel):
+    """Asks for every call in one step, then answers once the tool results are in."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def step_model(sleeps):
+    calls = [{"name": "stub_sleep", "args": {"seconds": s}, "id": f"call_{i}", "type": "tool_call"}
+             for i, s in enumerate(sleeps)]
+    return ParallelToolModel(messages=iter([AIMessage(content="", tool_calls=calls), AIMessage(content="Done.")]))
+
+
+def timed_step(sleeps, middleware):
+    agent = create_agent(step_model(sleeps), [stub_sleep], middleware=middleware)
+    start = time.perf_counter()
+    messages = agent.invoke({"messages": [HumanMessage(content="go")]})["messages"]
+    results = [m for m in messages if isinstance(m, ToolMessage)]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sleeps", default="0.3,0.5,0.2,0.4", help="Comma-separated tool sleep times (s)")
+    parser.add_argument("--deadline", type=float, default=1.0, help="Per-call deadline (s)")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    sleeps = [float(s) for s in args.sleeps.split(",")]
+    straggler = sleeps + [args.deadline * 3]
+    print(f"{len(sleeps)} tool calls in one step, sleeps {sleeps} (sum {sum(sleeps):.2f} s, max {max(sleeps):.2f} s)")
+
+    executor = ToolExecutor(max_workers=args.workers, timeout=args.deadline)
+    single = ToolExecutor(max_workers=1, timeout=sum(straggler))
+    runs = [
+        ("agent, no executor", sleeps, []),
+        ("agent + executor", sleeps, [executor.as_middleware()]),
+        ("agent + executor, 1 worker", sleeps, [single.as_middleware()]),
+        (f"no executor + {args.deadline * 3:.1f} s straggler", straggler, []),
+        (f"executor + {args.deadline * 3:.1f} s straggler", straggler, [executor.as_middleware()]),
+    ]
+    for name, step, middleware in runs:
+        elapsed, results = timed_step(step, middleware)
+        in_order = [m.tool_call_id for m in results] == [f"call_{i}" for i in range(len(step))]
+        errors = sum(m.status == "error" for m in results)
+        print(f"  {name:<34}{elapsed:>6.2f} s  ({len(results)} results, {errors} errors, in call order: {in_order})")
+    print(f"Executor stats: {executor.stats()}")
+
+    executor.shutdown()
+    single.shutdown()
+
+
+if __name__ == "__main__":
+    main()
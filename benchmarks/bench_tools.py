@@ -0,0 +1,83 @@
+"""
+Benchmark: tool call latency with the shared HTTP session, TTL result cache and
+deadlines, against a local stub weather server (no API key or network needed).
+
+Scenarios:
+  1. Repeated questions about a few cities - cache hit rate and hit latency
+  2. Uncached calls - connection reuse (TCP connections opened vs. requests)
+  3. Slow upstream - calls return at the deadline instead of hanging
+
+Usage:
+    python benchmarks/bench_tools.py --calls 50 --upstream-delay 0.15
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.stub_weather import StubWeather
+
+CITIES = ["Delhi", "Mumbai", "Pune", "London", "Tokyo"]
+
+
+def timed_calls(get_weather, cities):
+    latencies = []
+    for city in cities:
+        start = time.perf_counter()
+        get_weather.invoke({"city": city})
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--upstream-delay", type=float, default=0.15)
+    parser.add_argument("--deadline", type=float, default=1.0, help="WEATHER_TIMEOUT for the slow-upstream run")
+    args = parser.parse_args()
+
+    with StubWeather(delay=args.upstream_delay) as stub:
+        # tools.py reads its settings at import time
+        os.environ["WEATHER_BASE_URL"] = stub.base_url
+        os.environ["OPENWEATHER_API_KEY"] = "stub"
+        os.environ["WEATHER_TIMEOUT"] = str(args.deadline)
+        from modules import tools
+        tools.CONFIG["openweather_api_key"] = "stub"
+
+        # 1. Repeated questions
+        questions = [CITIES[i % len(CITIES)] for i in range(args.calls)]
+        latencies = timed_calls(tools.get_weather, questions)
+        misses = latencies[:len(CITIES)]
+        hits = latencies[len(CITIES):]
+        stats = tools.tool_stats()["get_weather"]
+        print(f"Repeated questions ({args.calls} calls, {len(CITIES)} cities, upstream {args.upstream_delay * 1000:.0f} ms):")
+        print(f"  miss mean {statistics.mean(misses):.1f} ms, hit mean {statistics.mean(hits):.3f} ms, "
+              f"hit rate {stats['cache_hit_rate']:.0%}, upstream requests {len(stub.requests)}")
+
+        # 2. Uncached calls reuse pooled connections
+        requests_before = len(stub.requests)
+        stub.connections.clear()
+        for i in range(args.calls):
+            tools.tool_cache.clear("get_weather")
+            tools.get_weather.invoke({"city": CITIES[i % len(CITIES)]})
+        print(f"Uncached calls: {len(stub.requests) - requests_before} requests over "
+              f"{len(stub.connections)} TCP connection(s)")
+
+        # 3. Slow upstream
+        stub.delay = args.deadline * 5
+        tools.tool_cache.clear("get_weather")
+        start = time.perf_counter()
+        reply = tools.get_weather.invoke({"city": "Chennai"})
+        elapsed = time.perf_counter() - start
+        print(f"Slow upstream ({stub.delay:.1f} s): returned after {elapsed:.2f} s "
+              f"(deadline {args.deadline:.1f} s): {reply}")
+        print(f"Tool stats: {tools.tool_stats()}")
+
+
+if __name__ == "__main__":
+    main()
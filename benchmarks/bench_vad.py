@@ -0,0 +1,183 @@
+"""
+Benchmark: voice activity detection - accuracy, endpointing and trimming.
+Replays clips through the recording logic of utils/mic_record in 100 ms chunks
+and compares the old amplitude rule (peak > 2000 per 100 ms) with the
+energy and webrtc engines of utils/vad:
+- frames: precision/recall of 20 ms speech frames against the labels
+- endpoint: delay from the true end of speech to the stop decision (the
+  target is --silence); "late" counts stops more than 0.5 s late
+- cut: clips where the stop or the trimmed range cut into the speech
+- to STT: seconds of audio handed to Whisper per clip, against the speech length
+- cost: CPU time per second of audio
+
+Without --fixtures, clips are synthesized: phrases of the formant synthesizer
+from bench_kws in pink noise (SNR 10-30 dB), with short pauses between words.
+Half of them also get clicks and knocks in the silence before and after.
+With --fixtures DIR, every DIR/*.wav needs a DIR/<name>.vad file with the
+start and end of the speech in seconds ("0.82 2.95").
+
+Usage:
+    python benchmarks/bench_vad.py --clips 100
+    python benchmarks/bench_vad.py --fixtures path/to/clips
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmarks.bench_kws import COMMANDS, KEYWORD, NEGATIVES, Speaker, background
+from benchmarks.bench_streaming_stt import load_fixture
+from utils.vad import WEBRTC_AVAILABLE, VoiceActivityDetector
+
+FS = 16000
+CHUNK_SECONDS = 0.1  # Same read size as utils/mic_record
+AMPLITUDE_THRESHOLD = 2000  # The old rule's default
+PHRASES = [KEYWORD] + COMMANDS + NEGATIVES
+
+
+def synthetic_clips(count, rng):
+    """(name, int16 audio, (speech start, speech end) in samples) tuples."""
+    clips = []
+    for i in range(count):
+        speaker = Speaker(rng)
+        words = [speaker.say(PHRASES[rng.integers(len(PHRASES))], rng) for _ in range(rng.integers(1, 4))]
+        gaps = [np.zeros(int(rng.uniform(0.1, 0.4) * FS)) for _ in words]
+        speech = np.concatenate([part for pair in zip(words, gaps) for part in pair][:-1])
+        lead, tail = int(rng.uniform(0.3, 1.5) * FS), int(3.0 * FS)
+        level = np.sqrt(np.mean(speech ** 2)) / 10 ** (rng.uniform(10, 30) / 20)
+        audio = background((lead + len(speech) + tail) / FS, level, rng)[:lead + len(speech) + tail]
+        audio[lead:lead + len(speech)] += speech
+        if i % 2:
+            # Clicks (5-20 ms broadband) and knocks (low thump) in the silence around the speech
+            for _ in range(4):
+                start = int(rng.choice([rng.uniform(0, max(1, lead - 800)), rng.uniform(lead + len(speech) + 800,
+                                                                                       len(audio) - 1600)]))
+                if rng.random() < 0.5:
+                    n = int(rng.uniform(0.005, 0.02) * FS)
+                    audio[start:start + n] += rng.uniform(0.2, 0.6) * rng.standard_normal(n)
+                else:
+                    n = int(0.08 * FS)
+                    t = np.arange(n) / FS
+                    audio[start:start + n] += rng.uniform(0.2, 0.5) * np.sin(2 * np.pi * 90 * t) * np.exp(-t * 40)
+        audio = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+        clips.append((f"synthetic-{i}", audio, (lead, lead + len(speech))))
+    return clips
+
+
+def fixture_clips(directory):
+    clips = []
+    for path in sorted(Path(directory).glob("*.wav")):
+        labels = path.with_suffix(".vad")
+        if not labels.exists():
+            print(f"⚠️ Skipping {path.name}: no {labels.name}")
+            continue
+        fs, audio = load_fixture(path)
+        if fs != FS:
+            from math import gcd
+            from scipy.signal import resample_poly
+            g = gcd(fs, FS)
+            audio = resample_poly(audio.astype(np.float32), FS // g, fs // g).astype(np.int16)
+        start, end = (float(x) for x in labels.read_text().split()[:2])
+        clips.append((path.stem, audio, (int(start * FS), int(end * FS))))
+    return clips
+
+
+def run_amplitude(audio, silence):
+    """The old recording loop: speech = any sample above the threshold in a 100 ms chunk."""
+    chunk = int(CHUNK_SECONDS * FS)
+    needed = int(silence / CHUNK_SECONDS)
+    labels, last_speech, stop = [], None, len(audio)
+    for i in range(0, len(audio) - chunk + 1, chunk):
+        speech = np.max(np.abs(audio[i:i + chunk].astype(np.int32))) > AMPLITUDE_THRESHOLD
+        labels.extend([speech] * 5)  # As 20 ms frames
+        if speech:
+            last_speech = i + chunk
+        elif last_speech is not None and i + chunk - last_speech >= needed * chunk:
+            stop = i + chunk
+            break
+    return stop, (0, stop), np.array(labels)  # Everything recorded went to Whisper
+
+
+def run_vad(audio, silence, engine):
+    """utils/mic_record's loop with VoiceActivityDetector; frame labels come from a second, unsmoothed pass."""
+    detector = VoiceActivityDetector(FS, engine=engine)
+    chunk = int(CHUNK_SECONDS * FS)
+    stop = len(audio)
+    for i in range(0, len(audio) - chunk + 1, chunk):
+        detector.process(audio[i:i + chunk])
+        if detector.silence_after_speech() >= silence:
+            stop = detector.position
+            break
+    kept = detector.speech_range() or (0, stop)
+
+    raw = VoiceActivityDetector(FS, engine=engine)
+    usable = len(audio) // raw.frame_length * raw.frame_length
+    frames = audio[:usable].reshape(-1, raw.frame_length)
+    if raw.engine_name == "energy":
+        labels = raw.engine.classify(frames.astype(np.float32) / 32768.0)
+    else:
+        labels = raw.engine.classify(frames)
+    return stop, kept, labels
+
+
+def measure(name, runner, clips, silence):
+    tp = fp = fn = 0
+    delays, cut, late, sent, speech_s, cpu, audio_s = [], 0, 0, 0.0, 0.0, 0.0, 0.0
+    for _, audio, (start, end) in clips:
+        began = time.process_time()
+        stop, (keep_start, keep_end), labels = runner(audio, silence)
+        cpu += time.process_time() - began
+        audio_s += len(audio) / FS
+
+        truth = np.zeros(len(labels), dtype=bool)
+        truth[start // 320:end // 320 + 1] = True  # 20 ms frames
+        tp += int(np.sum(labels & truth))
+        fp += int(np.sum(labels & ~truth))
+        fn += int(np.sum(~labels & truth))
+
+        delay = (stop - end) / FS
+        delays.append(delay)
+        late += delay > silence + 0.5
+        cut += stop < end or keep_start > start or min(keep_end, stop) < end
+        sent += (min(keep_end, stop) - keep_start) / FS
+        speech_s += (end - start) / FS
+
+    delays = np.array(delays)
+    print(f"{name:<10}{tp / max(1, tp + fp):>9.1%}{tp / max(1, tp + fn):>8.1%}"
+          f"{np.median(delays):>9.2f}s{np.percentile(delays, 95):>7.2f}s{late:>6}{cut:>6}"
+          f"{sent / len(clips):>9.2f}s{speech_s / len(clips):>7.2f}s{cpu / audio_s * 1e3:>9.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="Directory of .wav files with .vad labels")
+    parser.add_argument("--clips", type=int, default=100, help="Synthetic clips")
+    parser.add_argument("--silence", type=float, default=1.5, help="Silence that ends a recording (seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    clips = fixture_clips(args.fixtures) if args.fixtures else synthetic_clips(args.clips, np.random.default_rng(args.seed))
+    if not clips:
+        print("❌ No clips")
+        return
+
+    engines = [("amplitude", run_amplitude), ("energy", lambda a, s: run_vad(a, s, "energy"))]
+    if WEBRTC_AVAILABLE:
+        engines.append(("webrtc", lambda a, s: run_vad(a, s, "webrtc")))
+    else:
+        print("webrtcvad not installed - webrtc engine skipped")
+
+    print(f"{len(clips)} clips ({args.fixtures or 'synthetic'}), stop after {args.silence}s of silence")
+    print(f"{'engine':<10}{'frames P':>9}{'R':>8}{'endpoint':>10}{'p95':>8}{'late':>6}{'cut':>6}"
+          f"{'to STT':>10}{'speech':>8}{'cost/s':>11}")
+    for name, runner in engines:
+        measure(name, runner, clips, args.silence)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the Ollama HTTP API used by benchmarks.
+Streams a scripted reply token by token at a configurable rate, optionally
+answering with tool calls and charging prompt-evaluation time per prompt token.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = (
+    "Sure, here is what I found. The weather in Delhi is warm and sunny today. "
+    "You may want to carry some water if you are going out. "
+    "Let me know if you need anything else!"
+)
+
+
+class FakeOllama:
+    """
+    Minimal fake of Ollama's /api/chat and /api/generate endpoints.
+    
+    Args:
+        reply: Text streamed back for every chat request
+        tokens_per_second: Generation speed of the fake model
+        first_token_delay: Seconds before the first token (prompt evaluation)
+        port: Port to bind on localhost (0 = pick a free port)
+        script: Optional callable `script(request) -> dict` returning either
+            {"content": text} or {"tool_calls": [{"function": {"name": ..., "arguments": {...}}}]}
+        prompt_tokens_per_second: Prompt evaluation speed; adds prompt_tokens / rate
+            to the first-token delay (None = prompt size doesn't matter)
+    """
+
+    def __init__(self, reply=DEFAULT_REPLY, tokens_per_second=20.0, first_token_delay=0.3, port=0,
+                 script=None, prompt_tokens_per_second=None):
+        self.reply = reply
+        self.tokens_per_second = tokens_per_second
+        self.first_token_delay = first_token_delay
+        self.script = script
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.requests = []
+        self.prompt_tokens = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def tokens(self, text=None):
+        """Split a reply into word-sized tokens (keeping spaces)."""
+        words = (self.reply if text is None else text).split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    @staticmethod
+    def count_prompt_tokens(request):
+        """Estimate prompt tokens of a chat request (~4 UTF-8 bytes per token)."""
+        size = 0
+        for message in request.get("messages", []):
+            size += len(str(message.get("content", "")).encode("utf-8"))
+            if message.get("tool_calls"):
+                size += len(json.dumps(message["tool_calls"]).encode("utf-8"))
+        return size // 4
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith("/api/tags"):
+                    self._send_json({"models": [{"name": "fake", "model": "fake"}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests.append({"path": self.path, "body": request, "time": time.perf_counter()})
+
+                if self.path.startswith("/api/chat"):
+                    self._chat(request)
+                elif self.path.startswith("/api/generate"):
+                    self._send_json(_message(request, None, done=True))
+                else:
+                    self.send_error(404)
+
+            def _chat(self, request):
+                prompt_tokens = fake.count_prompt_tokens(request)
+                fake.prompt_tokens.append(prompt_tokens)
+                delay = fake.first_token_delay
+                if fake.prompt_tokens_per_second:
+                    delay += prompt_tokens / fake.prompt_tokens_per_second
+                time.sleep(delay)
+
+                response = fake.script(request) if fake.script else {"content": fake.reply}
+                if response.get("tool_calls"):
+                    streaming = request.get("stream", True)
+                    message = _message(request, "", done=not streaming)
+                    message["message"]["tool_calls"] = response["tool_calls"]
+                    if not streaming:
+                        self._send_json(message)
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.end_headers()
+                    self._write_line(message)
+                    self._write_line(_message(request, "", done=True))
+                    return
+
+                text = response.get("content", "")
+                tokens = fake.tokens(text)
+                if not request.get("stream", True):
+                    time.sleep(len(tokens) / fake.tokens_per_second)
+                    self._send_json(_message(request, text, done=True))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.end_headers()
+                for token in tokens:
+                    self._write_line(_message(request, token, done=False))
+                    time.sleep(1.0 / fake.tokens_per_second)
+                self._write_line(_message(request, "", done=True))
+
+            def _write_line(self, payload):
+                self.wfile.write(json.dumps(payload).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def _message(request, content, done):
+    """Build one Ollama-style response object."""
+    payload = {
+        "model": request.get("model", "fake"),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "done": done,
+    }
+    if content is not None:
+        payload["message"] = {"role": "assistant", "content": content}
+    else:
+        payload["response"] = ""
+    if done:
+        payload.update({
+            "done_reason": "stop",
+            "total_duration": 0,
+            "load_duration": 0,
+            "prompt_eval_count": 0,
+            "prompt_eval_duration": 0,
+            "eval_count": 0,
+            "eval_duration": 0,
+        })
+    return payload
@@ -0,0 +1,145 @@
+"""
+Stand-in for the `sounddevice` module used by benchmarks.
+Replays queued clips as microphone input - through InputStream.read() for VAD
+recording, rec()/wait() for fixed-duration recording, and a callback
+InputStream for the shared capture (utils/audio_capture) - at capture speed,
+then delivers silence. A callback stream starts the next queued clip as soon
+as the current one has been delivered. It records when the last speech sample
+of each clip was delivered, so latency can be measured from the true end of speech.
+
+Install it before anything imports sounddevice:
+    mic = FakeSoundDevice().install()
+"""
+import sys
+import threading
+import time
+
+import numpy as np
+
+SPEECH_LEVEL = 2000  # int16 amplitude counted as speech when marking where a clip's speech ends
+
+
+class FakeSoundDevice:
+    """
+    Fake microphone input replaying int16 clips.
+
+    Args:
+        realtime: Sleep so frames arrive at capture speed (False = as fast as possible)
+    """
+
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self.speech_end_time = None  # perf_counter() when the current clip's speech ended
+        self._clips = []
+        self._audio = np.zeros(0, dtype=np.int16)
+        self._position = 0
+        self._speech_end = 0
+        self._stream_start = None
+        self._lock = threading.Lock()
+
+    def install(self):
+        sys.modules["sounddevice"] = self
+        return self
+
+    def queue_clip(self, audio, sample_rate):
+        """
+        Queue a clip as the next utterance.
+
+        Args:
+            audio: Mono samples (int16, or float in [-1, 1])
+            sample_rate: Sample rate of `audio`
+        """
+        if audio.dtype != np.int16:
+            audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+        self._clips.append((audio, sample_rate))
+
+    def _next_clip(self, samplerate):
+        """Start replaying the next queued clip, resampled to the capture rate."""
+        audio, rate = self._clips.pop(0) if self._clips else (np.zeros(0, dtype=np.int16), samplerate)
+        if rate != samplerate and len(audio):
+            from scipy.signal import resample_poly
+            audio = resample_poly(audio.astype(np.float32), samplerate, rate).astype(np.int16)
+        loud = np.flatnonzero(np.abs(audio.astype(np.int32)) > SPEECH_LEVEL)
+        self._audio = audio
+        self._position = 0
+        self._speech_end = int(loud[-1]) + 1 if len(loud) else 0
+        self.speech_end_time = None
+        self._stream_start = time.perf_counter()
+
+    def _read(self, frames, samplerate):
+        """Next `frames` samples of the clip (silence once it is used up)."""
+        with self._lock:
+            chunk = self._audio[self._position:self._position + frames]
+            start, self._position = self._position, self._position + frames
+        if len(chunk) < frames:
+            chunk = np.concatenate([chunk, np.zeros(frames - len(chunk), dtype=np.int16)])
+        if self.realtime:
+            delay = self._stream_start + self._position / samplerate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if self.speech_end_time is None and start < self._speech_end <= self._position:
+            # On the capture timeline, even if the block containing it was read later
+            self.speech_end_time = (self._stream_start + self._speech_end / samplerate if self.realtime
+                                    else time.perf_counter())
+        return chunk.reshape(-1, 1)
+
+    # --- sounddevice API used by utils/mic_record and utils/audio_capture ---
+    class _InputStream:
+        def __init__(self, device, samplerate, blocksize=None, callback=None, **kwargs):
+            self._device = device
+            self._samplerate = samplerate
+            self._blocksize = blocksize or samplerate // 50
+            self._callback = callback
+            self._running = threading.Event()
+            self._thread = None
+
+        def __enter__(self):
+            self._device._next_clip(self._samplerate)
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def read(self, frames):
+            return self._device._read(frames, self._samplerate), False
+
+        def start(self):
+            self._device._next_clip(self._samplerate)
+            self._running.set()
+            self._thread = threading.Thread(target=self._run, name="fake-mic", daemon=True)
+            self._thread.start()
+
+        def _run(self):
+            device = self._device
+            while self._running.is_set():
+                if device._clips and device._position >= len(device._audio):
+                    device._next_clip(self._samplerate)
+                block = device._read(self._blocksize, self._samplerate)
+                self._callback(block, self._blocksize, None, None)
+
+        def stop(self):
+            self._running.clear()
+            if self._thread is not None:
+                self._thread.join()
+
+        def close(self):
+            pass
+
+    def InputStream(self, samplerate=16000, **kwargs):
+        return self._InputStream(self, samplerate, **kwargs)
+
+    def rec(self, frames, samplerate=16000, **kwargs):
+        self._next_clip(samplerate)
+        return self._read(frames, samplerate)
+
+    def wait(self):
+        pass  # rec() already returned at capture speed
+
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def query_devices(self, *args, **kwargs):
+        return [{"name": "fake microphone", "max_input_channels": 1, "max_output_channels": 0}]
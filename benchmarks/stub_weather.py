@@ -0,0 +1,91 @@
+"""
+Local stand-in for the OpenWeatherMap current-weather endpoint.
+Answers /weather?q=<city> with a canned reply after a configurable delay and
+counts requests and TCP connections, so connection reuse is observable.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+UNKNOWN_CITIES = {"atlantis", "nowhere"}
+
+
+class StubWeather:
+    """
+    Minimal fake of `GET {base}/weather?q=...&appid=...&units=metric`.
+
+    Args:
+        delay: Seconds to wait before answering (simulates upstream latency)
+        port: Port to bind on localhost (0 = pick a free port)
+    """
+
+    def __init__(self, delay=0.05, port=0):
+        self.delay = delay
+        self.requests = []
+        self.connections = set()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/data/2.5"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-weather", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                stub.requests.append({"path": url.path, "query": query, "time": time.perf_counter()})
+                stub.connections.add(self.client_address)
+                time.sleep(stub.delay)
+
+                if not url.path.endswith("/weather"):
+                    return self._send({"cod": 404, "message": "not found"}, status=404)
+                city = query.get("q", "")
+                if city.lower() in UNKNOWN_CITIES:
+                    return self._send({"cod": "404", "message": "city not found"}, status=404)
+                self._send({
+                    "cod": 200,
+                    "name": city.title(),
+                    "main": {"temp": 20.0 + len(city) % 10},
+                    "weather": [{"description": "clear sky"}],
+                })
+
+            def _send(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client gave up (deadline exceeded)
+
+        return Handler
@@ -9,17 +9,37 @@ import signal
 import sys
 import logging
 import os
-from pathlib import Path
+import argparse
+import itertools
+import threading
+import queue
+import logging.handlers
+from concurrent.futures import wait
+from functools import partial
+
+_import_start = time.perf_counter()
 
 # --- Module Imports ---
-from modules.speech_to_text import transcribe_audio
-from modules.text_to_speech import speak
-from modules.brain import ask_brain
+from modules.speech_to_text import transcribe_audio, save_transcript, StreamingTranscriber
+from modules.text_to_speech import speak, speak_stream, prerender, get_tts_cache, get_audio_output, close_audio_output
+from modules.brain import ask_brain, ask_brain_stream, record_exchange, summarize_idle_sessions, save_sessions, tool_executor, store
+from modules.intent_router import INTENT_ROUTER, route_command, answer_route
+from modules.endpointing import SEMANTIC_ENDPOINTING, SemanticEndpointer
+from modules.response_cache import RESPONSE_CACHE, get_response_cache
 from utils.mic_record import record_audio
 from modules.memory_manager import save_memory
-from utils.runtime_paths import ensure_runtime_dirs, get_audio_path, get_log_path, cleanup_old_files
+from modules.memory_recall import MEMORY_RECALL
+from utils.audio_capture import get_capture, capture_stats, close_capture
+from utils.http_client import close_http_session
+from utils.metrics import current_turn, inc, observe, register_collector, start_metrics_export, stop_metrics_export
+from utils.runtime_paths import ensure_runtime_dirs, get_audio_path, get_log_path, get_wake_word_dir, cleanup_old_files
 from modules.wake_word import WakeWordDetector
 from utils.wake_listener import listen_for_wake_word
+from utils.barge_in import BargeInMonitor
+from utils.model_registry import register, warm_up, record_timing, startup_report, is_loaded
+from utils.pipeline import Stage
+
+record_timing("imports", time.perf_counter() - _import_start)
 # --- Fix console encoding on Windows ---
 if os.name == "nt":
     try:
@@ -40,15 +60,32 @@ log_file = get_log_path("mira_ai.log")
 def remove_emojis(msg):
     return ''.join(ch for ch in msg if ord(ch) < 10000)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(log_file, encoding='utf-8'),
-              logging.StreamHandler(sys.stdout)]
-)
+# Log records are handed to a background listener thread, so file writes
+# never block the conversation loop
+log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+log_handlers = [logging.FileHandler(log_file, encoding='utf-8'), logging.StreamHandler(sys.stdout)]
+for log_handler in log_handlers:
+    log_handler.setFormatter(log_formatter)
+log_queue = queue.Queue()
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers)
+log_listener.start()
+
+# The queue handler must only pass the message on - the listener's handlers format it
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
 logger = logging.getLogger(__name__)
 logger.info(f"Logging to: {log_file}")
 
+# --- Fixed phrases (pre-rendered into the TTS cache at startup) ---
+GREETING_PHRASE = "Hello, I'm listening."
+SLEEP_PHRASE = "Okay, going to sleep."
+IDLE_PHRASE = "I've been idle for too long, going back to sleep."
+ERROR_PHRASE = "Sorry, I encountered an error processing your request."
+FIXED_PHRASES = [GREETING_PHRASE, SLEEP_PHRASE, IDLE_PHRASE, ERROR_PHRASE]
+
+register("tts_phrases", lambda: prerender(FIXED_PHRASES))
+
 # --- Global flag for graceful shutdown ---
 running = True
 
@@ -64,15 +101,211 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 
 
+def echo_stream(chunks):
+    """Print streamed reply text to the console as it passes through."""
+    print("🤖 Mira-AI: ", end="", flush=True)
+    try:
+        for chunk in chunks:
+            print(chunk, end="", flush=True)
+            yield chunk
+    finally:
+        print()
+        if hasattr(chunks, "close"):
+            chunks.close()  # Cancelled replies: let the source record what it got to
+
+
+class Turn:
+    """One user command travelling through the respond stage."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, command, route=None):
+        self.id = next(Turn._ids)  # Tags the turn's spans in the metrics trace
+        self.command = command
+        self.route = route  # Intent answered without the agent, if any
+        self.reply = None
+        self.cancel = threading.Event()  # Set on barge-in to stop feeding TTS
+        self.done = threading.Event()
+
+
+def respond(turn, stream_responses, background):
+    """
+    Respond stage: generate the reply, speak it and hand persistence to the background stage.
+    
+    Args:
+        turn: Turn to answer
+        stream_responses: Stream LLM tokens into sentence-chunked TTS
+        background: Stage for off-critical-path work (memory writes)
+    """
+    emotion = "neutral"
+    current_turn.set(turn.id)
+    inc("turns")
+    started = time.perf_counter()
+    try:
+        if turn.route is not None:
+            # Deterministic command - templated answer, no LLM call
+            inc("turns_routed")
+            ai_reply = answer_route(turn.route)
+            print(f"🤖 Mira-AI: {ai_reply}")
+            speak(ai_reply, emotion=emotion)
+            record_exchange(turn.command, ai_reply)
+        elif stream_responses:
+            # Speak each sentence while the rest is still being generated
+            ai_reply = speak_stream(echo_stream(ask_brain_stream(turn.command)), emotion=emotion,
+                                    cancel=turn.cancel)
+        else:
+            ai_reply = ask_brain(turn.command)
+            print(f"🤖 Mira-AI: {ai_reply}")
+            speak(ai_reply, emotion=emotion)
+        logger.info(f"AI response: {ai_reply[:100]}...")
+
+        turn.reply = ai_reply
+        background.submit(partial(save_memory, turn.command, ai_reply))
+
+    except Exception as e:
+        inc("turn_errors")
+        logger.error(f"❌ AI Brain error: {e}", exc_info=True)
+        speak(ERROR_PHRASE)
+    finally:
+        observe("turn", time.perf_counter() - started)
+        current_turn.set(None)
+        turn.done.set()
+
+
+def listen_during_reply(turn, output, since, interrupt):
+    """
+    Start capturing the next command as soon as the reply begins playing.
+    
+    Args:
+        turn: Turn currently being answered
+        output: Shared AudioOutput
+        since: output.segments_played before the turn was submitted
+        interrupt: Stop the reply when the user speaks (barge-in)
+        
+    Returns:
+        np.ndarray | None: Speech captured during the reply, if any
+    """
+    while not turn.done.is_set():
+        if output.wait_for_playback(since, timeout=0.05):
+            break
+    else:
+        return None  # Reply ended before any audio played
+
+    monitor = BargeInMonitor(output, interrupt=interrupt, triggered=turn.cancel).start()
+    turn.done.wait()
+    monitor.finish()
+    return monitor.join()
+
+
+def tool_stats():
+    """Tool call and cache counters (empty until the agent is loaded)."""
+    if not is_loaded("agent"):
+        return {}
+    from modules.tools import tool_stats  # Imports langchain - only once the agent exists
+    return tool_stats()
+
+
+def log_stage_stats(stages, level=logging.DEBUG):
+    """Log queue depth and wait times for each pipeline stage."""
+    for stage in stages:
+        logger.log(level, f"📊 Stage {stage.stats()}")
+
+
+def start_warm_up(profile=False):
+    """
+    Load models in the background so the first command doesn't pay for it.
+    
+    Args:
+        profile: Log the per-component startup timing report once warm-up finishes
+    """
+    started = time.perf_counter()
+    names = ["stt", "emotion_classifier", "agent", "ollama_model", "tts_phrases"]
+    if MEMORY_RECALL:
+        names.append("memory_index")  # Embedding model + index (backfilled on first run)
+    futures = warm_up(names)
+
+    if profile:
+        def _report():
+            wait(futures.values())
+            record_timing("warm-up (wall)", time.perf_counter() - started)
+            logger.info("\n" + startup_report())
+
+        threading.Thread(target=_report, name="startup-profile", daemon=True).start()
+
+
+def enroll_wake_word(count: int):
+    """
+    Record samples of the wake word for the offline keyword spotter.
+    
+    Args:
+        count: Number of samples to record (3-5 is enough)
+    """
+    import numpy as np
+    from scipy.io.wavfile import write
+
+    directory = get_wake_word_dir()
+    first = len(list(directory.glob("*.wav")))
+    print(f"🎙️ Recording {count} samples of 'Hey Mira' into {directory}")
+    saved = 0
+    while saved < count:
+        input(f"\nPress Enter, then say 'Hey Mira' ({saved + 1}/{count})...")
+        audio = record_audio(str(get_audio_path("wake_enroll.wav")), duration=3, use_vad=True, in_memory=True)
+        if audio is None or len(audio) < 8000:
+            print("⚠️ Warning: Nothing recorded, please try again")
+            continue
+        path = directory / f"sample_{first + saved + 1:02d}.wav"
+        write(path, 16000, (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16))
+        saved += 1
+        print(f"✅ Saved {path.name}")
+    print(f"\n✅ Enrolled {saved} samples. Delete {directory} to start over.")
+
+
 def main():
     """Main application loop."""
+    parser = argparse.ArgumentParser(description="Mira-AI voice assistant")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print per-component startup timings once models are loaded")
+    parser.add_argument("--enroll-wake-word", type=int, metavar="N",
+                        help="Record N samples of 'Hey Mira' for the offline keyword spotter, then exit")
+    args = parser.parse_args()
+
+    if args.enroll_wake_word:
+        enroll_wake_word(args.enroll_wake_word)
+        return
+
     logger.info("🚀 Mira-AI starting up...")
     logger.info("💡 Press Ctrl+C to exit gracefully")
 
+    # --- Warm up models concurrently while we start listening ---
+    start_warm_up(profile=args.profile_startup)
+
+    # --- Pipeline stages ---
+    # background: persistence and housekeeping, off the critical path
+    # respond: LLM reply + speech, while the main thread captures the next command
+    stream_responses = os.getenv("STREAM_RESPONSES", "true").lower() in ("true", "1", "yes")
+    background = Stage("background", lambda job: job())
+    responder = Stage("respond", partial(respond, stream_responses=stream_responses, background=background))
+    stages = [responder, background]
+
+    # --- Metrics: component stats join the span histograms in every snapshot ---
+    for stage in stages:
+        register_collector(f"stage_{stage.name}", stage.stats)
+    register_collector("tts_cache", lambda: get_tts_cache().stats())
+    register_collector("sessions", store.stats)
+    register_collector("tools", tool_stats)
+    register_collector("tool_executor", tool_executor.stats)
+    register_collector("capture", capture_stats)
+    if RESPONSE_CACHE:
+        register_collector("response_cache", lambda: get_response_cache().stats())
+    start_metrics_export()
+
+    # --- Always-on microphone capture (wake word, recording and barge-in read from it) ---
+    get_capture()
+
     # --- Cleanup old runtime files once at startup ---
     try:
         max_age = int(os.getenv("CLEANUP_MAX_AGE_DAYS", "7"))
-        cleanup_old_files(max_age_days=max_age)
+        background.submit(partial(cleanup_old_files, max_age_days=max_age))
     except Exception:
         pass  # Ignore cleanup errors silently
 
@@ -93,23 +326,32 @@ def main():
         except Exception as e:
             logger.warning(f"⚠️ Could not initialize wake word detector: {e}")
             detector = None
+    if detector is not None:
+        register_collector("kws", detector.stats)
 
     # --- Runtime state ---
     mira_awake = False
     last_active_time = 0
     inactivity_timeout = int(os.getenv("INACTIVITY_TIMEOUT", "60"))  # seconds
+    streaming_stt = os.getenv("STREAMING_STT", "true").lower() in ("true", "1", "yes")
+    barge_in = os.getenv("BARGE_IN_ENABLED", "false").lower() in ("true", "1", "yes")
+    capture_during_reply = barge_in or os.getenv("CAPTURE_DURING_REPLY", "true").lower() in ("true", "1", "yes")
+    pending_audio = None  # Speech captured during the last reply, used as the next command
+    turn = None
 
     try:
         while running:
             # --- 💤 Auto Sleep Check (before recording) ---
             if mira_awake and (time.time() - last_active_time > inactivity_timeout):
-                speak("I've been idle for too long, going back to sleep.")
+                speak(IDLE_PHRASE)
                 mira_awake = False
+                background.submit(summarize_idle_sessions)  # Fold old turns while asleep
+                background.submit(save_sessions)
                 continue
 
             # --- 💤 Wake Mode ---
             if not mira_awake:
-                if wake_word_enabled and detector:
+                if wake_word_enabled and detector and detector.listens_to_audio:
                     print("\n👂 Waiting for wake word... (say 'Hey Mira' or press Ctrl+C)")
                     wake_detected = listen_for_wake_word(detector, timeout=60)
                     if not wake_detected:
@@ -118,35 +360,52 @@ def main():
                     # Fallback: short listening window for text-based wake detection
                     print("\n👂 Say 'Hey Mira' to activate...")
                     audio_path = get_audio_path("wake_listen.wav")
-                    audio_file = record_audio(str(audio_path), duration=4, use_vad=True)
-                    if not audio_file:
+                    audio = record_audio(str(audio_path), duration=4, use_vad=True, in_memory=True)
+                    if audio is None or len(audio) == 0:
                         continue
 
-                    command = transcribe_audio(audio_file)
+                    command = transcribe_audio(audio, save=False)
                     if not command or not detector or not detector.detect_from_text(command):
                         continue
 
                 # --- Wake detected ---
                 print("✅ Wake word detected! Mira is awake.\n")
-                speak("Hello, I'm listening.")
+                speak(GREETING_PHRASE)
                 mira_awake = True
                 last_active_time = time.time()
                 continue  # go to conversation mode
 
             # --- 🎙️ Active Conversation Mode ---
-            logger.info("🎙️ Recording command...")
-            audio_path = get_audio_path("command.wav")
-            audio_file = record_audio(str(audio_path),
-                                      duration=int(os.getenv("RECORDING_DURATION", "60")),
-                                      use_vad=True)
-
-            if not audio_file or not Path(audio_file).exists():
-                logger.warning("⚠️ No audio file created, skipping...")
+            if pending_audio is not None:
+                # The user spoke during the last reply - their speech is already captured
+                audio, pending_audio = pending_audio, None
+                transcriber = None
+            else:
+                logger.info("🎙️ Recording command...")
+                audio_path = get_audio_path("command.wav")
+                # Decode in the background while the user is still speaking
+                transcriber = StreamingTranscriber() if streaming_stt else None
+                # The partial transcript decides how long to wait at a pause
+                endpointer = SemanticEndpointer(transcriber) if transcriber and SEMANTIC_ENDPOINTING else None
+                audio = record_audio(str(audio_path),
+                                     duration=int(os.getenv("RECORDING_DURATION", "60")),
+                                     use_vad=True,
+                                     on_audio=transcriber.feed if transcriber else None,
+                                     in_memory=True,
+                                     endpointer=endpointer)
+
+            if audio is None or len(audio) == 0:
+                logger.warning("⚠️ No audio recorded, skipping...")
+                if transcriber:
+                    transcriber.cancel()
                 continue
 
             # --- 🧠 Transcription ---
             try:
-                command = transcribe_audio(audio_file)
+                if transcriber:
+                    command = transcriber.finalize(save=False)
+                else:
+                    command = transcribe_audio(audio, save=False)
             except Exception as e:
                 logger.error(f"❌ Transcription error: {e}")
                 print(f"❌ Could not transcribe audio: {e}")
@@ -156,33 +415,37 @@ def main():
                 logger.info("🔇 No valid speech detected, continuing...")
                 continue
 
-            command_lower = command.lower()
+            background.submit(partial(save_transcript, command))
             print(f"\n🗣️ You said: {command}")
             logger.info(f"User input: {command}")
 
+            route = route_command(command)
+            if route is not None:
+                logger.info(f"🧭 Intent: {route}")
+
             # --- 💤 Sleep Commands ---
-            if any(phrase in command_lower for phrase in ["sleep", "stop listening", "goodbye", "go to sleep", "bye", "good bye"]):
-                speak("Okay, going to sleep.")
+            if route is not None and route.intent == "sleep":
+                speak(SLEEP_PHRASE)
                 mira_awake = False
+                background.submit(summarize_idle_sessions)  # Fold old turns while asleep
+                background.submit(save_sessions)
                 continue
 
             # --- 💭 AI Response ---
-            try:
-                ai_reply = ask_brain(command)
-                print(f"🤖 Mira-AI: {ai_reply}")
-                logger.info(f"AI response: {ai_reply[:100]}...")
-
-                emotion = "neutral"
-                speak(ai_reply, emotion=emotion)
-                save_memory(command, ai_reply)
+            output = get_audio_output()
+            turn = Turn(command, route=route if INTENT_ROUTER else None)
+            played_before = output.segments_played
+            responder.submit(turn)
 
-                last_active_time = time.time()
-                print("🎧 Listening for your next command...\n")
+            if capture_during_reply:
+                # Listen for the next command while the reply plays
+                pending_audio = listen_during_reply(turn, output, played_before, interrupt=barge_in)
+            else:
+                turn.done.wait()
 
-            except Exception as e:
-                logger.error(f"❌ AI Brain error: {e}", exc_info=True)
-                speak("Sorry, I encountered an error processing your request.")
-                continue
+            last_active_time = time.time()
+            log_stage_stats(stages)
+            print("🎧 Listening for your next command...\n")
 
     except KeyboardInterrupt:
         logger.info("🛑 Interrupted by user")
@@ -193,13 +456,34 @@ def main():
 
     finally:
         # --- Cleanup ---
+        if turn is not None:
+            turn.cancel.set()
+            get_audio_output().stop()  # Unblocks a reply waiting for its playback
+        # Drop unstarted replies first, so a late speak() can't reopen the audio output,
+        # but finish pending memory/transcript writes
+        responder.close(drain=False, timeout=5)
+        close_audio_output()
+        close_capture()
+        background.close(drain=True)
+        save_sessions()
+        log_stage_stats(stages, level=logging.INFO)
         if detector:
             try:
                 detector.cleanup()
             except Exception:
                 pass
 
+        logger.info(f"🔊 TTS cache: {get_tts_cache().stats()}")
+        if is_loaded("agent"):
+            logger.info(f"🛠 Tools: {tool_stats()}")
+            logger.info(f"🛠 Tool executor: {tool_executor.stats()}")
+            tool_executor.shutdown()
+        if RESPONSE_CACHE:
+            logger.info(f"🗃 Response cache: {get_response_cache().stats()}")
+        close_http_session()
+        stop_metrics_export()
         logger.info("👋 Mira-AI shutting down. Goodbye!")
+        log_listener.stop()
         print("\n👋 Goodbye!")
 
 
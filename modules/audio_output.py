@@ -0,0 +1,305 @@
+"""
+Persistent audio output engine.
+One long-lived worker owns the output device and an asyncio event loop for
+synthesis, and plays queued segments back-to-back without reopening the device.
+"""
+import asyncio
+import io
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from utils.metrics import observe, span
+
+# Resolution of the playback level envelope used for echo suppression
+LEVEL_FRAME = 0.02
+
+
+class PygameDevice:
+    """Output device backed by a single reserved pygame mixer channel."""
+
+    def __init__(self, buffer_size: int = 512):
+        self.buffer_size = buffer_size
+        self._channel = None
+        self._timeline = deque(maxlen=4)
+        self._ends_at = 0.0
+
+    def open(self):
+        pygame.mixer.init(buffer=self.buffer_size)
+        pygame.mixer.set_reserved(1)
+        self._channel = pygame.mixer.Channel(0)
+
+    def decode(self, audio: bytes):
+        """Decode MP3/WAV bytes from memory into a sound plus its level envelope."""
+        sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+        samples = pygame.sndarray.array(sound).astype(np.float32) / 32768.0
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        frequency = pygame.mixer.get_init()[0]
+        frame = max(1, int(frequency * LEVEL_FRAME))
+        usable = len(samples) - len(samples) % frame
+        envelope = np.sqrt(np.mean(samples[:usable].reshape(-1, frame) ** 2, axis=1)) if usable else np.zeros(0)
+        return sound, envelope
+
+    def length(self, sound) -> float:
+        return sound[0].get_length()
+
+    def can_queue(self) -> bool:
+        """True if another sound can be handed over without a gap."""
+        return self._channel.get_queue() is None
+
+    def play(self, sound):
+        now = time.monotonic()
+        # Queue behind the current sound for gapless hand-over, or start right away
+        if self._channel.get_busy():
+            self._channel.queue(sound[0])
+            start = max(now, self._ends_at)
+        else:
+            self._channel.play(sound[0])
+            start = now
+        self._ends_at = start + sound[0].get_length()
+        self._timeline.append((start, sound[1]))
+
+    def busy(self) -> bool:
+        return self._channel.get_busy()
+
+    def level(self) -> float:
+        """RMS level (0-1) of the audio currently being played."""
+        if not self.busy():
+            return 0.0
+        now = time.monotonic()
+        for start, envelope in reversed(self._timeline):
+            if start <= now:
+                index = int((now - start) / LEVEL_FRAME)
+                return float(envelope[index]) if index < len(envelope) else 0.0
+        return 0.0
+
+    def stop(self):
+        self._channel.stop()
+        self._timeline.clear()
+        self._ends_at = 0.0
+
+    def close(self):
+        pygame.mixer.quit()
+
+
+class NullDevice:
+    """
+    Output device that plays nothing but keeps real-time playback timing.
+    Used for headless runs and benchmarks.
+    
+    Args:
+        bytes_per_second: Audio byte rate used to derive segment durations
+        playback_level: Level reported by level() while "playing"
+    """
+
+    def __init__(self, bytes_per_second: int = 6000, playback_level: float = 0.0):
+        self.bytes_per_second = bytes_per_second
+        self.playback_level = playback_level
+        self.play_times = []
+        self._ends_at = 0.0
+        self._queued = None
+
+    def open(self):
+        pass
+
+    def decode(self, audio: bytes):
+        return len(audio) / self.bytes_per_second
+
+    def length(self, sound) -> float:
+        return sound
+
+    def _tick(self):
+        now = time.monotonic()
+        if self._queued is not None and now >= self._ends_at:
+            self._ends_at += self._queued
+            self._queued = None
+        return now
+
+    def can_queue(self) -> bool:
+        self._tick()
+        return self._queued is None
+
+    def play(self, sound):
+        now = self._tick()
+        self.play_times.append(time.perf_counter())
+        if now < self._ends_at:
+            self._queued = sound
+        else:
+            self._ends_at = now + sound
+
+    def busy(self) -> bool:
+        return self._tick() < self._ends_at
+
+    def level(self) -> float:
+        return self.playback_level if self.busy() else 0.0
+
+    def stop(self):
+        self._queued = None
+        self._ends_at = 0.0
+
+    def close(self):
+        pass
+
+
+class AudioOutput:
+    """
+    Long-lived playback worker.
+    
+    Segments are synthesized on the worker's event loop as soon as they are
+    enqueued (so synthesis overlaps playback of earlier segments) and played in
+    order on one open output device.
+    
+    Args:
+        synthesize: Coroutine function `synthesize(text, lang, emotion) -> bytes`
+        detect_language: Function mapping text to a language code
+        device: Output device (defaults to PygameDevice)
+    """
+
+    def __init__(self, synthesize, detect_language=None, device=None):
+        self._synthesize = synthesize
+        self._detect_language = detect_language or (lambda text: "en")
+        self.device = device or PygameDevice()
+
+        self._queue = queue.Queue()
+        self._generation = 0
+        self.segments_played = 0
+        self._played = threading.Condition()
+        self._interrupt = threading.Event()
+        self._closed = False
+
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="tts-loop", daemon=True)
+        self._loop_thread.start()
+
+        self.device.open()
+        self._worker = threading.Thread(target=self._run, name="audio-playback", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, text: str, emotion: str = "neutral"):
+        """
+        Queue text for playback (non-blocking). Synthesis starts immediately.
+        
+        Args:
+            text: Text to speak
+            emotion: Emotional tone for voice modulation
+        """
+        if not text or not text.strip():
+            return
+        lang = self._detect_language(text)
+        future = asyncio.run_coroutine_threadsafe(self._synthesize(text, lang, emotion), self._loop)
+        self._queue.put((self._generation, future))
+
+    def enqueue_audio(self, audio: bytes):
+        """Queue already-synthesized audio bytes for playback (non-blocking)."""
+        self._queue.put((self._generation, audio))
+
+    def wait_for_playback(self, since: int, timeout: float = None) -> bool:
+        """
+        Wait until a new segment starts playing.
+        
+        Args:
+            since: Value of `segments_played` before the segments of interest were queued
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            bool: True if playback of a newer segment started
+        """
+        with self._played:
+            return self._played.wait_for(lambda: self.segments_played > since, timeout)
+
+    def is_playing(self) -> bool:
+        """True while audio is playing or segments are waiting to be played."""
+        return self._queue.unfinished_tasks > 0 or self.device.busy()
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Block until everything queued so far has finished playing.
+        
+        Args:
+            timeout: Maximum seconds to wait (None = no limit)
+            
+        Returns:
+            bool: True if playback finished, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks > 0 or self.device.busy():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stop(self):
+        """Stop playback immediately and drop all queued segments."""
+        self._generation += 1
+        self._interrupt.set()
+        while True:
+            try:
+                _, item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if hasattr(item, "cancel"):
+                item.cancel()
+            self._queue.task_done()
+        self.device.stop()
+
+    def close(self):
+        """Stop playback and release the device and event loop."""
+        if self._closed:
+            return
+        self._closed = True
+        self.stop()
+        self._queue.put((None, None))
+        self._worker.join(timeout=2)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join(timeout=2)
+        try:
+            self.device.close()
+        except Exception:
+            pass
+
+    def _run(self):
+        while True:
+            generation, item = self._queue.get()
+            try:
+                if generation is None:
+                    return
+                self._play_item(generation, item)
+            except Exception as e:
+                print(f"⚠️ Error in audio playback: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _play_item(self, generation, item):
+        """Wait for a segment's audio and hand it to the device."""
+        if hasattr(item, "result"):
+            try:
+                audio = item.result()
+            except Exception as e:
+                print(f"⚠️ Error in text-to-speech: {e}")
+                return
+        else:
+            audio = item
+        if not audio or generation != self._generation:
+            return
+
+        with span("audio_decode"):
+            sound = self.device.decode(audio)
+
+        # Wait (interruptibly) for the device's queue slot, then hand the sound over
+        self._interrupt.clear()
+        waiting_since = time.perf_counter()
+        while not self.device.can_queue():
+            if self._interrupt.wait(0.005) or generation != self._generation:
+                return
+        if generation == self._generation:
+            observe("playback_wait", time.perf_counter() - waiting_since)
+            observe("playback", self.device.length(sound))  # Seconds of audio handed to the device
+            self.device.play(sound)
+            with self._played:
+                self.segments_played += 1
+                self._played.notify_all()
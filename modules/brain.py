@@ -2,22 +2,72 @@
 Brain module - Core AI logic with emotion detection and tool integration.
 Uses Ollama LLM with LangChain agents for intelligent responses.
 """
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from transformers import pipeline
-from langchain.agents import create_agent
-from langchain_ollama import ChatOllama
-from modules.tools import get_weather, get_time
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, SystemMessage
+from modules.context_manager import ContextManager
+from modules.memory_recall import MEMORY_RECALL, recall, format_recall
+from modules.response_cache import RESPONSE_CACHE, get_response_cache, cache_scope
+from modules.session_store import SessionStore
+from modules.tool_executor import ToolExecutor
+from utils.metrics import inc, observe, span, traced
+from utils.model_registry import register, get_resource
+from utils.runtime_paths import get_models_dir, get_sessions_dir
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
 import os
+import time
+
+# Heavy dependencies (transformers, langchain agents, Ollama client) are imported
+# inside the loaders below, so importing this module is cheap. Resources are built
+# on first use or warmed up in the background via utils.model_registry.warm_up().
 
 # ============================================
 # 🔥 Emotion Detection (Hugging Face)
 # ============================================
-emotion_classifier = pipeline(
-    "text-classification",
-    model="j-hartmann/emotion-english-distilroberta-base",
-    return_all_scores=False
-)
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+# Backend: "hf" (PyTorch pipeline), "quantized" (int8 dynamic quantization) or "onnx" (ONNX Runtime)
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "hf").lower()
+# Hard deadline for emotion detection; the reply falls back to "neutral" when it is missed
+EMOTION_DEADLINE_MS = int(os.getenv("EMOTION_DEADLINE_MS", "150"))
+
+def _load_emotion_classifier(backend=None):
+    from transformers import pipeline
+    backend = backend or EMOTION_BACKEND
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from transformers import AutoTokenizer
+
+            # Export once, then reuse the exported model from runtime/models/
+            onnx_dir = get_models_dir() / "emotion-onnx"
+            if (onnx_dir / "model.onnx").exists():
+                model = ORTModelForSequenceClassification.from_pretrained(onnx_dir)
+                tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+            else:
+                model = ORTModelForSequenceClassification.from_pretrained(EMOTION_MODEL, export=True)
+                tokenizer = AutoTokenizer.from_pretrained(EMOTION_MODEL)
+                model.save_pretrained(onnx_dir)
+                tokenizer.save_pretrained(onnx_dir)
+            return pipeline("text-classification", model=model, tokenizer=tokenizer)
+        except ImportError:
+            print("⚠️ Warning: optimum[onnxruntime] not available, using PyTorch emotion model. "
+                  "Install with: pip install optimum[onnxruntime]")
+
+    classifier = pipeline(
+        "text-classification",
+        model=EMOTION_MODEL,
+        return_all_scores=False
+    )
+    if backend == "quantized":
+        import torch
+        # int8 weights for Linear layers - smaller and faster on CPU
+        classifier.model = torch.quantization.quantize_dynamic(
+            classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return classifier
+
+register("emotion_classifier", _load_emotion_classifier)
 
 # ============================================
 # 🧠 Initialize LLM (Bilingual - Hindi + English)
@@ -28,38 +78,99 @@ OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 
 # Using smaller model for better memory efficiency
 # Options: qwen2.5:1.5b (smallest), qwen2.5:3b, qwen2.5:7b (if you have enough RAM)
-llm = ChatOllama(
-    model=OLLAMA_MODEL,
-    base_url=OLLAMA_BASE_URL,
-    temperature=0.7,
-    num_predict=512
-)
+def _load_llm():
+    from langchain_ollama import ChatOllama
+    return ChatOllama(
+        model=OLLAMA_MODEL,
+        base_url=OLLAMA_BASE_URL,
+        temperature=0.7,
+        num_predict=512
+    )
 
-# ============================================
-# 🛠 Define Tools (LangGraph compatible)
-# ============================================
-search_tool = DuckDuckGoSearchRun()
-custom_tools = [get_weather, get_time]
+def _preload_ollama_model():
+    """Ask Ollama to load the model into memory (a generate request without a prompt)."""
+    import requests
+    response = requests.post(f"{OLLAMA_BASE_URL}/api/generate", json={"model": OLLAMA_MODEL}, timeout=300)
+    response.raise_for_status()
+    return OLLAMA_MODEL
 
-# Combine both built-in + custom tools
-tools_list = [search_tool] + custom_tools
+register("llm", _load_llm)
+register("ollama_model", _preload_ollama_model)
 
 # ============================================
-# 🤖 Create ReAct Agent (New LangGraph)
+# 🛠 Define Tools + 🤖 Create ReAct Agent (New LangGraph)
 # ============================================
-agent = create_agent(llm, tools_list)
+def _load_agent():
+    from langchain.agents import create_agent
+    from modules.tools import get_weather, get_time, web_search
+
+    # Web search wraps DuckDuckGoSearchRun with a deadline and a result cache
+    get_resource("search")
+    tools_list = [web_search, get_weather, get_time]
+    # Independent tool calls of one step run concurrently, each under a deadline
+    return create_agent(get_resource("llm"), tools_list, middleware=[tool_executor.as_middleware()])
+
+tool_executor = ToolExecutor()
+
+register("agent", _load_agent)
+
+class LLMTimer(BaseCallbackHandler):
+    """Callback handler that times every LLM call of an agent run (and its first token)."""
+
+    def __init__(self):
+        self._started = {}  # run_id -> [start time, first token seen]
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = [time.perf_counter(), False]
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = [time.perf_counter(), False]
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        run = self._started.get(run_id)
+        if run is not None and not run[1]:
+            run[1] = True
+            observe("llm_first_token", time.perf_counter() - run[0])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._started.pop(run_id, None)
+        if run is not None:
+            observe("llm_call", time.perf_counter() - run[0])
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+        inc("llm_errors")
+
+llm_timer = LLMTimer()
+
+def _agent_config() -> dict:
+    """Run config for agent calls (per-LLM-call timing)."""
+    return {"callbacks": [llm_timer]}
 
 # ============================================
 # 💾 Memory Management
 # ============================================
-store = {}
+# Sessions kept in memory (LRU); the rest are spilled to runtime/sessions/ and
+# loaded back on use, so conversations also survive a restart
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "256"))
+SESSION_MAX_MB = float(os.getenv("SESSION_MAX_MB", "64"))
+SESSION_PERSIST = os.getenv("SESSION_PERSIST", "true").lower() in ("true", "1", "yes")
+# Sessions unused for this long are moved out of memory by save_sessions()
+SESSION_IDLE_MINUTES = float(os.getenv("SESSION_IDLE_MINUTES", "30"))
+
+store = SessionStore(get_sessions_dir() if SESSION_PERSIST else None,
+                     max_sessions=SESSION_MAX_COUNT,
+                     max_bytes=int(SESSION_MAX_MB * 1024 * 1024))
+
+# Keeps each session's history within CONTEXT_TOKEN_BUDGET
+context_manager = ContextManager()
 
 # System message for agent guidance
 SYSTEM_MESSAGE = SystemMessage(content="""You are Mira-AI, a helpful and empathetic voice assistant. 
 You have access to the following tools:
 - get_weather: Get current weather for any city (requires city name as parameter)
 - get_time: Get the current time
-- DuckDuckGoSearchRun: Search the web for information
+- web_search: Search the web for information
 
 Use these tools automatically when the user asks for weather, time, or needs web search information.
 Always use tools when appropriate - don't ask the user for information you can get from tools.
@@ -75,13 +186,26 @@ def get_session_messages(session_id: str):
     Returns:
         list: List of message objects for the session (includes system message)
     """
-    if session_id not in store:
-        store[session_id] = [SYSTEM_MESSAGE]
-    return store[session_id]
+    messages = store.get(session_id)  # Loads a spilled session back from disk
+    if messages is None:
+        messages = [SYSTEM_MESSAGE]
+        store[session_id] = messages
+    return messages
 
 # ============================================
 # 🎭 Emotion Detection + Tone Adaptation
 # ============================================
+# Single worker: classification runs next to context assembly, not in parallel with itself
+_emotion_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="emotion")
+
+# Short utterances ("thanks", "what time is it") repeat a lot - memoize them
+MEMO_MAX_CHARS = 200
+
+@lru_cache(maxsize=1024)
+def _classify_emotion_cached(text: str) -> str:
+    return _classify_emotion(text)
+
+@traced("detect_emotion")
 def detect_emotion(text: str) -> str:
     """
     Detect user's emotional tone from text.
@@ -95,28 +219,47 @@ def detect_emotion(text: str) -> str:
     try:
         if not text or not text.strip():
             return "neutral"
-        result = emotion_classifier(text)
-        if result and len(result) > 0:
-            emotion = result[0]["label"].lower()
-            # Map emotion labels to our supported emotions
-            emotion_map = {
-                "joy": "joy",
-                "happiness": "joy",
-                "sadness": "sadness",
-                "sad": "sadness",
-                "anger": "anger",
-                "angry": "anger",
-                "fear": "fear",
-                "afraid": "fear",
-                "surprise": "surprise",
-                "surprised": "surprise",
-                "neutral": "neutral"
-            }
-            return emotion_map.get(emotion, "neutral")
-        return "neutral"
+        normalized = " ".join(text.split())
+        if len(normalized) <= MEMO_MAX_CHARS:
+            return _classify_emotion_cached(normalized)
+        return _classify_emotion(text)
     except Exception:
         return "neutral"
 
+def detect_emotion_async(text: str):
+    """
+    Start emotion detection in the background.
+    
+    Args:
+        text: User's input text to analyze
+        
+    Returns:
+        Future: Resolves to the detected emotion string
+    """
+    return _emotion_executor.submit(detect_emotion, text)
+
+def _classify_emotion(text: str) -> str:
+    """Run the emotion classifier and map its label to a supported emotion."""
+    result = get_resource("emotion_classifier")(text)
+    if result and len(result) > 0:
+        emotion = result[0]["label"].lower()
+        # Map emotion labels to our supported emotions
+        emotion_map = {
+            "joy": "joy",
+            "happiness": "joy",
+            "sadness": "sadness",
+            "sad": "sadness",
+            "anger": "anger",
+            "angry": "anger",
+            "fear": "fear",
+            "afraid": "fear",
+            "surprise": "surprise",
+            "surprised": "surprise",
+            "neutral": "neutral"
+        }
+        return emotion_map.get(emotion, "neutral")
+    return "neutral"
+
 def tone_instruction(emotion: str) -> str:
     """
     Generate tone instruction based on detected emotion.
@@ -137,36 +280,160 @@ def tone_instruction(emotion: str) -> str:
     }
     return tones.get(emotion, "Respond naturally and kindly 🙂")
 
+# ============================================
+# 🔎 Memory Recall
+# ============================================
+# Deadline for embedding the prompt and searching the memory index
+RECALL_DEADLINE_MS = int(os.getenv("MEMORY_RECALL_DEADLINE_MS", "150"))
+
+_recall_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recall")
+
+def recall_memories(prompt: str) -> str:
+    """
+    Look up past conversations related to the prompt.
+    
+    Args:
+        prompt: User's input text
+        
+    Returns:
+        str: Formatted recall block for the user message ("" if nothing relevant)
+    """
+    try:
+        # The newest turns are already in the session history
+        return format_recall(recall(prompt, skip_recent=context_manager.keep_turns))
+    except Exception as e:
+        print(f"⚠️ Warning: Memory recall failed: {e}")
+        return ""
+
 # ============================================
 # 🗨 Ask Brain
 # ============================================
-def ask_brain(prompt: str, session_id: str = "default") -> str:
+def _build_messages(prompt: str, session_id: str) -> list:
     """
-    Generate emotional and tool-aware responses using LLM agent.
-    The agent will automatically decide when to use available tools (weather, time, search).
+    Build the message list for one agent call (history + emotion-tagged prompt).
     
     Args:
         prompt: User's input prompt/question
         session_id: Session identifier for conversation continuity
         
     Returns:
-        str: AI-generated response text
+        list: Messages to send to the agent
     """
-    emotion = detect_emotion(prompt)
+    # Classify emotion and recall past conversations while the rest of the context is assembled
+    emotion_future = detect_emotion_async(prompt)
+    recall_future = _recall_executor.submit(recall_memories, prompt) if MEMORY_RECALL else None
+
+    # Get conversation history (includes system message)
+    history = get_session_messages(session_id)
+
+    try:
+        emotion = emotion_future.result(timeout=EMOTION_DEADLINE_MS / 1000)
+    except FutureTimeoutError:
+        emotion = "neutral"  # Missed the deadline - don't hold up the reply
     emotional_context = tone_instruction(emotion)
 
-    # Combine emotional tone and user input
-    full_prompt = f"Emotion: {emotion}\n{emotional_context}\nUser: {prompt}"
+    memories = ""
+    if recall_future is not None:
+        try:
+            memories = recall_future.result(timeout=RECALL_DEADLINE_MS / 1000)
+        except FutureTimeoutError:
+            pass  # Answer without recalled memories rather than wait
+
+    # Combine emotional tone, recalled memories and user input (kept out of the
+    # system prompt so its prefix stays cacheable)
+    full_prompt = f"Emotion: {emotion}\n{emotional_context}\n{memories}User: {prompt}"
+
+    # Build messages list with history
+    return history + [HumanMessage(content=full_prompt)]
+
+def _error_reply(e: Exception) -> str:
+    """
+    Turn an agent/LLM exception into a user-facing error message.
+    
+    Args:
+        e: Exception raised while generating a reply
+        
+    Returns:
+        str: Error message to show/speak
+    """
+    if isinstance(e, ConnectionRefusedError):
+        return "🔴 Error: Cannot connect to Ollama. Please make sure Ollama is running:\n   Run: ollama serve"
+    error_msg = str(e)
+    if "Connection refused" in error_msg or "[Errno 61]" in error_msg:
+        return "🔴 Error: Cannot connect to Ollama. Please make sure Ollama is running:\n   Run: ollama serve"
+    if "system memory" in error_msg.lower() or "unable to load" in error_msg.lower():
+        return "🔴 Error: Model requires too much memory. Try using a smaller model like 'qwen2.5:1.5b' or 'qwen2.5:3b'.\n   Update model in modules/brain.py"
+    return f"🔴 Error: {e}"
+
+# ============================================
+# 🗃 Response Cache
+# ============================================
+def cached_reply(prompt: str, session_id: str):
+    """
+    Look up a cached answer to a repeated question (RESPONSE_CACHE).
+    
+    Args:
+        prompt: User's input prompt/question
+        session_id: Session identifier (scopes the cache unless it is global)
+        
+    Returns:
+        str | None: The cached answer, or None to ask the agent
+    """
+    if not RESPONSE_CACHE:
+        return None
+    try:
+        return get_response_cache().get(prompt, scope=cache_scope(session_id))
+    except Exception as e:
+        print(f"⚠️ Warning: Response cache lookup failed: {e}")
+        return None
+
+def _tools_used(messages) -> list:
+    """Names of the tools the agent called since the last user message."""
+    names = []
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            break
+        if isinstance(msg, AIMessage):
+            names.extend(call["name"] for call in msg.tool_calls)
+    return names
 
+def _store_reply(prompt, reply, tools, latency, scope):
     try:
-        # Get conversation history (includes system message)
-        history = get_session_messages(session_id)
+        get_response_cache().put(prompt, reply, tools=tools, latency=latency, scope=scope)
+    except Exception as e:
+        print(f"⚠️ Warning: Could not cache response: {e}")
+
+def cache_reply(prompt: str, reply: str, messages: list, started: float, session_id: str):
+    """Cache an agent answer off the reply path (its lifetime depends on the tools used)."""
+    if RESPONSE_CACHE:
+        latency = time.perf_counter() - started
+        # Same worker as recall - both use the embedder
+        _recall_executor.submit(_store_reply, prompt, reply, _tools_used(messages), latency, cache_scope(session_id))
+
+def ask_brain(prompt: str, session_id: str = "default") -> str:
+    """
+    Generate emotional and tool-aware responses using LLM agent.
+    The agent will automatically decide when to use available tools (weather, time, search).
+    
+    Args:
+        prompt: User's input prompt/question
+        session_id: Session identifier for conversation continuity
         
-        # Build messages list with history
-        messages = history + [HumanMessage(content=full_prompt)]
+    Returns:
+        str: AI-generated response text
+    """
+    try:
+        cached = cached_reply(prompt, session_id)
+        if cached is not None:
+            record_exchange(prompt, cached, session_id)
+            return cached
+
+        started = time.perf_counter()
+        messages = _build_messages(prompt, session_id)
         
         # Invoke agent directly - it will automatically use tools when needed
-        result = agent.invoke({"messages": messages})
+        with span("agent"):
+            result = get_resource("agent").invoke({"messages": messages}, config=_agent_config())
         
         # Extract the last AI message from the result
         if isinstance(result, dict):
@@ -175,8 +442,9 @@ def ask_brain(prompt: str, session_id: str = "default") -> str:
                 # Find the last AI message
                 for msg in reversed(result_messages):
                     if isinstance(msg, AIMessage) and msg.content:
-                        # Update history with all new messages
-                        store[session_id] = result_messages
+                        # Update history with all new messages (compacted to the token budget)
+                        store[session_id] = context_manager.compact(result_messages)
+                        cache_reply(prompt, msg.content, result_messages, started, session_id)
                         # Return just the content without emotion prefix
                         return msg.content
             
@@ -185,21 +453,132 @@ def ask_brain(prompt: str, session_id: str = "default") -> str:
         # If result is a list of messages
         if isinstance(result, list) and len(result) > 0:
             # Update history
-            store[session_id] = result
+            store[session_id] = context_manager.compact(result)
             # Find last AI message
             for msg in reversed(result):
                 if isinstance(msg, AIMessage) and msg.content:
+                    cache_reply(prompt, msg.content, result, started, session_id)
                     # Return just the content without emotion prefix
                     return msg.content
         
         return str(result)
 
-    except ConnectionRefusedError:
-        return "🔴 Error: Cannot connect to Ollama. Please make sure Ollama is running:\n   Run: ollama serve"
     except Exception as e:
-        error_msg = str(e)
-        if "Connection refused" in error_msg or "[Errno 61]" in error_msg:
-            return "🔴 Error: Cannot connect to Ollama. Please make sure Ollama is running:\n   Run: ollama serve"
-        if "system memory" in error_msg.lower() or "unable to load" in error_msg.lower():
-            return "🔴 Error: Model requires too much memory. Try using a smaller model like 'qwen2.5:1.5b' or 'qwen2.5:3b'.\n   Update model in modules/brain.py"
-        return f"🔴 Error: {e}"
+        inc("agent_errors")
+        return _error_reply(e)
+
+def ask_brain_stream(prompt: str, session_id: str = "default"):
+    """
+    Stream the agent's reply as it is generated.
+    Only text of the model's answer is yielded - tool calls and tool outputs
+    are skipped. The session history is updated once the stream completes; if
+    the stream is closed early (barge-in), the text yielded so far is recorded
+    as the reply instead, matching what the caller saves to memory.
+    
+    Args:
+        prompt: User's input prompt/question
+        session_id: Session identifier for conversation continuity
+        
+    Yields:
+        str: Text fragments of the AI response, in order
+    """
+    cached = cached_reply(prompt, session_id)
+    if cached is not None:
+        try:
+            yield cached
+        finally:
+            record_exchange(prompt, cached, session_id)
+        return
+
+    started = time.perf_counter()
+    final_messages = None
+    replied = []  # Text handed to the caller so far
+    try:
+        messages = _build_messages(prompt, session_id)
+
+        # "messages" mode gives LLM tokens, "values" mode gives full graph state
+        first_token = True
+        stream = get_resource("agent").stream({"messages": messages}, config=_agent_config(),
+                                              stream_mode=["messages", "values"])
+        for mode, payload in stream:
+            if mode == "values":
+                final_messages = payload.get("messages", final_messages)
+                continue
+
+            chunk, _metadata = payload
+            if not isinstance(chunk, AIMessageChunk) or chunk.tool_call_chunks:
+                continue
+            if isinstance(chunk.content, str) and chunk.content:
+                if first_token:
+                    first_token = False
+                    observe("agent_first_token", time.perf_counter() - started)
+                replied.append(chunk.content)
+                yield chunk.content
+
+    except GeneratorExit:
+        # Closed before the graph finished: the history gets the truncated reply
+        record_exchange(prompt, "".join(replied), session_id)
+        raise
+    except Exception as e:
+        inc("agent_errors")
+        yield _error_reply(e)
+        return
+    observe("agent", time.perf_counter() - started)
+
+    # Update history with all new messages once the full reply is known
+    if final_messages:
+        store[session_id] = context_manager.compact(final_messages)
+        reply = final_messages[-1]
+        if isinstance(reply, AIMessage) and isinstance(reply.content, str) and reply.content:
+            cache_reply(prompt, reply.content, final_messages, started, session_id)
+
+def record_exchange(prompt: str, reply: str, session_id: str = "default"):
+    """
+    Add a turn answered outside the agent (intent fast path) to the session
+    history, so follow-up questions still have it as context.
+    
+    Args:
+        prompt: User's input
+        reply: Reply that was given
+        session_id: Session identifier for conversation continuity
+    """
+    history = get_session_messages(session_id)
+    store[session_id] = context_manager.compact(history + [HumanMessage(content=prompt), AIMessage(content=reply)])
+
+# ============================================
+# 📝 Background Summarization
+# ============================================
+def _summarize_text(text: str) -> str:
+    """Ask the LLM to condense conversation notes into a short summary."""
+    response = get_resource("llm").invoke([
+        SystemMessage(content="Summarize the following conversation notes in at most 120 words. "
+                              "Keep names, facts, preferences and open requests. Reply with the summary only."),
+        HumanMessage(content=text),
+    ])
+    return response.content
+
+def summarize_idle_sessions():
+    """
+    Refine the rolling summaries of all sessions with the LLM.
+    Call while Mira is idle or asleep - it makes one LLM call per session that needs it.
+    """
+    for session_id in store.keys():
+        messages = store.peek(session_id)
+        if messages is None:
+            continue  # Spilled meanwhile
+        try:
+            refined = context_manager.refine(messages, _summarize_text)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not summarize session {session_id}: {e}")
+            continue
+        # Skip if a new turn replaced the history meanwhile
+        if refined is not messages and store.peek(session_id) is messages:
+            store[session_id] = refined
+
+def save_sessions():
+    """
+    Persist changed sessions and move long-unused ones out of memory.
+    Call while Mira is idle and on shutdown.
+    """
+    store.flush()
+    store.spill_idle(SESSION_IDLE_MINUTES * 60)
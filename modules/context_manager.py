@@ -0,0 +1,194 @@
+"""
+Conversation context management for the agent.
+Keeps each session's history within a token budget: stale tool calls and
+outputs are dropped, old turns are folded into a rolling summary (refined by
+the LLM in the background while Mira is idle), and the leading system prompt
+is never modified so Ollama can reuse its prompt KV cache.
+"""
+import json
+import os
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from modules.memory_recall import strip_recall
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+NOTE_MAX_CHARS = 200
+# Share of the budget an unrefined (extractive) summary may use
+SUMMARY_BUDGET_SHARE = 0.3
+
+
+def estimate_tokens(messages) -> int:
+    """
+    Rough token count for a list of messages (~4 UTF-8 bytes per token).
+    
+    Args:
+        messages: LangChain message objects
+        
+    Returns:
+        int: Estimated prompt tokens
+    """
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        size = len(content.encode("utf-8"))
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            size += len(json.dumps(tool_calls, default=str).encode("utf-8"))
+        total += size // 4 + 4  # Per-message formatting overhead
+    return total
+
+
+def is_summary(message) -> bool:
+    """Check whether a message is the rolling conversation summary."""
+    return isinstance(message, SystemMessage) and message.additional_kwargs.get("conversation_summary", False)
+
+
+def make_summary_message(text: str, refined: bool = False) -> SystemMessage:
+    """Build the summary message that sits right after the system prompt."""
+    return SystemMessage(content=SUMMARY_PREFIX + text,
+                         additional_kwargs={"conversation_summary": True, "refined": refined})
+
+
+def split_history(messages):
+    """
+    Split history into (system prompt, summary message or None, list of turns).
+    A turn starts at a HumanMessage and includes the agent/tool messages after it.
+    """
+    system = messages[0] if messages else None
+    summary = None
+    turns = []
+    for message in messages[1:]:
+        if is_summary(message):
+            summary = message
+        elif isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return system, summary, turns
+
+
+def _final_answer(turn):
+    for message in reversed(turn):
+        if isinstance(message, AIMessage) and message.content and not message.tool_calls:
+            return message
+    return None
+
+
+def compact_turn(turn):
+    """Keep only the user message and the final answer of a turn (drops tool traffic and recalled memories)."""
+    answer = _final_answer(turn)
+    question = turn[0]
+    if isinstance(question, HumanMessage) and isinstance(question.content, str):
+        stripped = strip_recall(question.content)
+        if stripped != question.content:
+            question = HumanMessage(content=stripped)
+    return [question] + ([answer] if answer is not None else [])
+
+
+def _user_text(message):
+    """Strip the emotion/tone wrapper that ask_brain adds around the user prompt."""
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return content.rsplit("User: ", 1)[-1].strip()
+
+
+def _clip(text, limit=NOTE_MAX_CHARS):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def turn_note(turn) -> str:
+    """Cheap extractive summary of one turn, used until the LLM refines it."""
+    answer = _final_answer(turn)
+    note = f"- User: {_clip(_user_text(turn[0]))}"
+    if answer is not None:
+        note += f"\n  Mira: {_clip(answer.content)}"
+    return note
+
+
+class ContextManager:
+    """
+    Keeps session histories within a token budget.
+    
+    Args:
+        budget: Target history size in estimated tokens (0 disables compaction)
+        keep_turns: Most recent turns kept verbatim (including tool messages)
+        tool_output_chars: Tool outputs in older kept turns are clipped to this length
+        low_watermark: When over budget, fold old turns until below budget * low_watermark
+            (folding in batches keeps the prompt prefix stable across many turns)
+    """
+
+    def __init__(self, budget: int = None, keep_turns: int = None, tool_output_chars: int = 300,
+                 low_watermark: float = 0.6):
+        self.budget = budget if budget is not None else int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+        self.keep_turns = keep_turns if keep_turns is not None else int(os.getenv("CONTEXT_KEEP_TURNS", "4"))
+        self.tool_output_chars = tool_output_chars
+        self.low_watermark = low_watermark
+
+    def compact(self, messages):
+        """
+        Compact a session history after a turn.
+        
+        Args:
+            messages: Full message list (system prompt first)
+            
+        Returns:
+            list: History within budget: [system, summary?, *turns]
+        """
+        if not self.budget or len(messages) < 2:
+            return messages
+
+        system, summary, turns = split_history(messages)
+
+        # Stale turns: drop tool calls/outputs, keep question + final answer
+        stale = max(0, len(turns) - self.keep_turns)
+        turns = [compact_turn(turn) for turn in turns[:stale]] + turns[stale:]
+
+        # Recent turns (except the newest): clip long tool outputs
+        for turn in turns[stale:-1]:
+            for i, message in enumerate(turn):
+                if isinstance(message, ToolMessage) and len(str(message.content)) > self.tool_output_chars:
+                    turn[i] = message.model_copy(update={
+                        "content": str(message.content)[:self.tool_output_chars] + " [truncated]"
+                    })
+
+        def build(summary_message, kept):
+            head = [system] + ([summary_message] if summary_message is not None else [])
+            return head + [message for turn in kept for message in turn]
+
+        history = build(summary, turns)
+        if estimate_tokens(history) <= self.budget:
+            return history
+
+        # Over budget: fold the oldest turns into the summary in one batch
+        target = self.budget * self.low_watermark
+        notes = []
+        while len(turns) > 1 and estimate_tokens(build(summary, turns)) > target:
+            notes.append(turn_note(turns.pop(0)))
+        previous = summary.content[len(SUMMARY_PREFIX):] if summary is not None else ""
+        text = "\n".join(filter(None, [previous] + notes))
+
+        # Until the LLM refines it, keep only the newest notes that fit the summary's share
+        max_chars = int(self.budget * SUMMARY_BUDGET_SHARE * 4)
+        if len(text) > max_chars:
+            text = text[-max_chars:].split("\n", 1)[-1]
+        summary = make_summary_message(text, refined=False)
+        return build(summary, turns)
+
+    def refine(self, messages, summarize):
+        """
+        Replace an unrefined (extractive) summary with an LLM-written one.
+        Meant to run in the background while Mira is idle.
+        
+        Args:
+            messages: Session history
+            summarize: Callable taking the summary text and returning a shorter summary
+            
+        Returns:
+            list: Updated history, or the same list if there was nothing to refine
+        """
+        for i, message in enumerate(messages):
+            if is_summary(message) and not message.additional_kwargs.get("refined"):
+                text = summarize(message.content[len(SUMMARY_PREFIX):])
+                return messages[:i] + [make_summary_message(text.strip(), refined=True)] + messages[i + 1:]
+        return messages
@@ -0,0 +1,137 @@
+"""
+Semantic endpointing - how long to wait for more speech, given what was said.
+With a fixed rule the recorder waits `silence_duration` (1.5 s) after every
+utterance. Here the partial transcript at a pause decides the wait:
+- "complete": a question or exclamation mark, or a known command (see
+  modules/intent_router) that ends a sentence - ENDPOINT_MIN_SILENCE (800 ms).
+  An unpunctuated command ("what time is it") may be a partial transcript of
+  a longer request ("what time is it in New York"), so it gets no shortcut
+- "sentence": a finished sentence ending in "." - ENDPOINT_SENTENCE_SILENCE
+- "incomplete": ends in a filler ("um"), conjunction, preposition or article
+  ("and", "for", "the"), or trailing "...", "," or "-" - ENDPOINT_MAX_SILENCE,
+  longer than the default, because the user is mid-sentence
+- "unknown": no transcript yet or nothing to go on - the recorder's default
+
+The transcript comes from the StreamingTranscriber, which is asked to decode
+once a pause reaches 200 ms. Until that decode covers the pause, the default wait
+applies, so a slow decoder never ends a recording earlier than before.
+"""
+import os
+import re
+
+from modules.intent_router import normalize, route_command
+
+SEMANTIC_ENDPOINTING = os.getenv("SEMANTIC_ENDPOINTING", "true").lower() in ("true", "1", "yes")
+# Silence (seconds) that ends a complete command, a finished sentence and an unfinished one
+ENDPOINT_MIN_SILENCE = float(os.getenv("ENDPOINT_MIN_SILENCE", "0.8"))
+ENDPOINT_SENTENCE_SILENCE = float(os.getenv("ENDPOINT_SENTENCE_SILENCE", "1.0"))
+ENDPOINT_MAX_SILENCE = float(os.getenv("ENDPOINT_MAX_SILENCE", "2.5"))
+# Gaps between words are shorter - a decode is only requested once a pause is this long
+DECODE_AFTER_PAUSE = 0.2
+
+# Words an utterance rarely ends with - more is coming
+TRAILING_WORDS = {
+    # Fillers
+    "um", "umm", "uh", "uhh", "er", "erm", "hmm", "like",
+    # Conjunctions
+    "and", "or", "but", "so", "because", "if", "then", "that", "which", "when", "while", "whether", "than",
+    # Prepositions
+    "to", "of", "in", "on", "at", "for", "with", "from", "about", "into", "by", "near", "between", "after",
+    "before",
+    # Articles and possessives
+    "a", "an", "the", "my", "your", "our", "their", "some",
+}
+_INCOMPLETE_END = re.compile(r"(?:\.\.\.|…|,|-|–|—|:)$")
+_QUESTION_END = re.compile(r"[?!]$")
+_SENTENCE_END = re.compile(r"[.।]$")
+
+
+def classify_utterance(text: str) -> str:
+    """
+    Judge whether a (partial) transcript is a finished utterance.
+
+    Args:
+        text: Transcript of everything said so far
+
+    Returns:
+        str: "complete", "sentence", "incomplete" or "unknown"
+    """
+    text = (text or "").strip()
+    words = normalize(text).split()
+    if not words:
+        return "unknown"
+    if _INCOMPLETE_END.search(text) or words[-1] in TRAILING_WORDS:
+        return "incomplete"
+    if _QUESTION_END.search(text):
+        return "complete"
+    if _SENTENCE_END.search(text):
+        return "complete" if route_command(text) is not None else "sentence"
+    return "unknown"
+
+
+class EndpointPolicy:
+    """
+    Maps an utterance class to the silence that ends it.
+
+    Args:
+        min_silence: Wait after a complete utterance
+        sentence_silence: Wait after a finished sentence
+        max_silence: Wait after an unfinished one
+    """
+
+    def __init__(self, min_silence: float = ENDPOINT_MIN_SILENCE,
+                 sentence_silence: float = ENDPOINT_SENTENCE_SILENCE, max_silence: float = ENDPOINT_MAX_SILENCE):
+        self.silences = {"complete": min_silence, "sentence": sentence_silence, "incomplete": max_silence}
+
+    def required_silence(self, text: str, default: float):
+        """
+        Silence that ends the utterance `text`.
+
+        Returns:
+            tuple: (seconds, utterance class); `default` seconds for "unknown"
+        """
+        label = classify_utterance(text)
+        return self.silences.get(label, default), label
+
+
+class SemanticEndpointer:
+    """
+    Endpointing for record_audio() driven by a StreamingTranscriber.
+
+    Args:
+        transcriber: StreamingTranscriber fed with the recording
+        policy: EndpointPolicy (default: from the ENDPOINT_* settings)
+    """
+
+    def __init__(self, transcriber, policy: EndpointPolicy = None):
+        self.transcriber = transcriber
+        self.policy = policy or EndpointPolicy()
+        self.decision = "unknown"  # Utterance class behind the last answer
+        self._pause_at = None  # Fed samples when the current pause started
+
+    def required_silence(self, pause: float, default: float) -> float:
+        """
+        Silence that ends the recording, asked once per recorded chunk.
+
+        Args:
+            pause: Seconds since the last voiced frame (0 while the user speaks)
+            default: The recorder's fixed silence_duration
+
+        Returns:
+            float: Seconds of silence after speech that end the recording now
+        """
+        if pause <= 0:
+            self._pause_at = None
+            self.decision = "unknown"
+            return default
+        if self._pause_at is None:
+            if pause < DECODE_AFTER_PAUSE:
+                return default
+            # A pause started: decode everything up to it right away
+            self._pause_at = self.transcriber.fed_samples
+            self.transcriber.request_decode()
+        if self.transcriber.transcribed_samples < self._pause_at:
+            self.decision = "unknown"
+            return default
+        silence, self.decision = self.policy.required_silence(self.transcriber.text, default)
+        return silence
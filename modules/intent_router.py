@@ -0,0 +1,363 @@
+"""
+Intent router - answers deterministic commands without the LLM agent.
+Runs before ask_brain(): anchored rules catch the common phrasings, and a
+small naive Bayes classifier over word unigrams/bigrams catches paraphrases.
+A classifier guess only counts if it is confident, mentions one of the
+intent's keywords and yields the slots the intent needs (e.g. a city for the
+weather). Everything else falls through to the agent.
+
+Intents are pluggable: add_intent() registers patterns, training examples,
+keywords, a slot extractor and a reply function. Intents without a reply
+(sleep) are control commands handled by the caller.
+"""
+import datetime
+import math
+import os
+import re
+from collections import Counter
+
+INTENT_ROUTER = os.getenv("INTENT_ROUTER", "true").lower() in ("true", "1", "yes")
+# Minimum classifier probability for a fast-path answer (rules always count)
+INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.9"))
+# Longer requests are rarely simple commands - leave them to the agent
+MAX_ROUTED_WORDS = 12
+
+FALLBACK = "other"
+
+# Filler words around a command ("hey mira, what time is it now please")
+_PREFIX = re.compile(r"^(?:(?:hey|hi|ok|okay|so|um|uh|please|mira|can you|could you)\s+)+")
+_SUFFIX = re.compile(r"(?:\s+(?:please|mira|now|right now|currently|today|at the moment|outside))+$")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation (keeping apostrophes) and collapse whitespace."""
+    text = text.lower().replace("’", "'")
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9' ]+", " ", text)).strip()
+
+
+def strip_fillers(text: str) -> str:
+    """Remove leading/trailing filler words from a normalized command."""
+    return _SUFFIX.sub("", _PREFIX.sub("", text)).strip()
+
+
+class Route:
+    """
+    A routing decision.
+
+    Args:
+        intent: Intent name
+        confidence: 1.0 for rule matches, classifier probability otherwise
+        slots: Extracted arguments (e.g. {"city": "delhi"})
+        source: "rule" or "classifier"
+    """
+
+    def __init__(self, intent: str, confidence: float, slots: dict = None, source: str = "rule"):
+        self.intent = intent
+        self.confidence = confidence
+        self.slots = slots or {}
+        self.source = source
+
+    def __repr__(self):
+        return f"Route({self.intent!r}, {self.confidence:.2f}, {self.slots}, {self.source})"
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes over word unigrams and bigrams (add-one smoothing)."""
+
+    def __init__(self):
+        self._examples = []
+        self._log_prior = {}
+        self._log_likelihood = {}
+        self._log_unseen = {}
+        self._vocab = set()
+
+    @staticmethod
+    def features(text: str) -> list:
+        words = text.split()
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def add_examples(self, label: str, examples):
+        self._examples.extend((normalize(e), label) for e in examples)
+        self._fit()
+
+    def _fit(self):
+        counts = {}
+        docs = Counter()
+        for text, label in self._examples:
+            counts.setdefault(label, Counter()).update(self.features(text))
+            docs[label] += 1
+        vocab = set().union(*counts.values()) if counts else set()
+        for label, counter in counts.items():
+            total = sum(counter.values()) + len(vocab)
+            self._log_prior[label] = math.log(docs[label] / len(self._examples))
+            self._log_likelihood[label] = {f: math.log((n + 1) / total) for f, n in counter.items()}
+            self._log_unseen[label] = math.log(1 / total)
+        self._vocab = vocab
+
+    def predict(self, text: str):
+        """
+        Classify a normalized text.
+
+        Returns:
+            tuple: (label, probability), or (None, 0.0) if nothing was trained
+        """
+        feats = [f for f in self.features(text) if f in self._vocab]  # Unknown words carry no evidence
+        if not self._log_prior or not feats:
+            return None, 0.0
+        scores = {
+            label: prior + sum(self._log_likelihood[label].get(f, self._log_unseen[label]) for f in feats)
+            for label, prior in self._log_prior.items()
+        }
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / total
+
+
+class IntentRouter:
+    """
+    Rule + classifier router for deterministic commands.
+
+    Args:
+        min_confidence: Minimum classifier probability to route a request
+    """
+
+    def __init__(self, min_confidence: float = INTENT_MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self.classifier = IntentClassifier()
+        self._rules = []  # (intent, compiled pattern)
+        self._intents = {}  # intent -> {"reply", "slots", "keywords"}
+
+    def add_intent(self, name: str, reply=None, patterns=(), examples=(), keywords=(), slots=None):
+        """
+        Register an intent.
+
+        Args:
+            name: Intent name
+            reply: Callable(slots) -> reply text; None for control intents
+            patterns: Regexes that must match the whole de-fillered command
+            examples: Training utterances for the classifier
+            keywords: A classifier guess is only accepted if one of these words occurs
+            slots: Callable(normalized, original) -> dict of slots, or None if
+                they can't be filled (the request then falls through); without
+                it an intent has no slots. `original` is the text as
+                transcribed (with case, e.g. for place names)
+        """
+        self._intents[name] = {"reply": reply, "slots": slots, "keywords": tuple(keywords)}
+        self._rules.extend((name, re.compile(p + r"$")) for p in patterns)
+        if examples:
+            self.classifier.add_examples(name, examples)
+
+    def add_fallback_examples(self, examples):
+        """Train the classifier on requests that belong to the agent."""
+        self.classifier.add_examples(FALLBACK, examples)
+
+    def route(self, text: str):
+        """
+        Decide whether a command can be answered without the agent.
+
+        Args:
+            text: Transcribed user command
+
+        Returns:
+            Route | None: The routing decision, or None to fall through to the agent
+        """
+        normalized = normalize(text)
+        command = strip_fillers(normalized) or normalized
+        if not command or len(command.split()) > MAX_ROUTED_WORDS:
+            return None
+
+        for name, pattern in self._rules:
+            if pattern.match(command):
+                extract = self._intents[name]["slots"]
+                slots = extract(normalized, text) if extract is not None else {}
+                if slots is not None:
+                    return Route(name, 1.0, slots, source="rule")
+
+        label, confidence = self.classifier.predict(command)
+        if label in (None, FALLBACK) or confidence < self.min_confidence:
+            return None
+        intent = self._intents[label]
+        words = set(command.split())
+        if intent["keywords"] and not any(k in words or (" " in k and k in command) for k in intent["keywords"]):
+            return None
+        slots = {}
+        if intent["slots"] is not None:
+            slots = intent["slots"](normalized, text)
+            if slots is None:
+                return None
+        return Route(label, confidence, slots, source="classifier")
+
+    def respond(self, route: Route) -> str:
+        """
+        Produce the templated reply for a routed intent.
+
+        Returns:
+            str | None: Reply text, or None for control intents
+        """
+        reply = self._intents[route.intent]["reply"]
+        return reply(route.slots) if reply else None
+
+
+# ============================================
+# 🕒 Built-in intents
+# ============================================
+# Requests about other places/times need the agent (time zones, forecasts)
+_NOT_NOW = re.compile(r"\b(?:tomorrow|yesterday|tonight|next|last|week|weekend|forecast|will|usually|normally|typically"
+                      r"|in [a-z]+ days?|january|february|march|april|may|june|july|august|september|october"
+                      r"|november|december|winter|summer|monsoon)\b")
+_CITY = re.compile(r"\b(?:in|at|for)\s+(?P<city>[a-z][a-z' -]*?)$")
+_CITY_FIRST = re.compile(r"^(?:what(?:'s| is) )?(?:the )?(?P<city>[a-z][a-z' -]*?) weather$")
+# Words that describe the weather or the moment rather than name a place ("nice weather", "weather in general")
+_NOT_CITIES = {
+    "the", "a", "an", "my", "our", "this", "that", "such", "what", "some", "current", "local", "general",
+    "here", "there", "out", "outside", "today", "today's", "todays", "tonight", "now", "lately", "usual",
+    "nice", "good", "bad", "great", "lovely", "beautiful", "pleasant", "perfect", "terrible", "horrible",
+    "awful", "crazy", "weird", "strange", "cold", "hot", "warm", "cool", "chilly", "freezing", "humid", "dry",
+    "wet", "rainy", "sunny", "cloudy", "windy", "stormy", "foggy", "snowy", "gloomy", "winter", "summer",
+    "spring", "autumn", "monsoon", "rain", "snow",
+}
+
+
+def _looks_like_place(city, original):
+    """A city slot must not be a weather word, and must be capitalised where the transcript has case."""
+    words = city.split()
+    if not 0 < len(words) <= 3 or any(word in _NOT_CITIES for word in words):
+        return False
+    if not original or original == original.lower():
+        return True  # Typed in lowercase - no case information
+    for word in words:
+        match = re.search(rf"(?<![\w']){re.escape(word)}(?![\w'])", original, re.IGNORECASE)
+        if match and not original[match.start()].isupper():
+            return False
+    return True
+
+
+def _time_slots(text, original=None):
+    # "what time is it in tokyo" needs a time zone lookup
+    return None if re.search(r"\b(?:in|at)\s+[a-z]", strip_fillers(text)) else {}
+
+
+def _weather_slots(text, original=None):
+    command = strip_fillers(text)
+    if _NOT_NOW.search(command):
+        return None
+    match = _CITY.search(command) or _CITY_FIRST.match(command)
+    if not match:
+        return None
+    city = match.group("city").strip()
+    if not _looks_like_place(city, original):
+        return None
+    return {"city": city}
+
+
+def _time_reply(slots):
+    now = datetime.datetime.now().strftime("%I:%M %p")
+    return f"The current time is {now}."
+
+
+def _date_reply(slots):
+    today = datetime.date.today()
+    return f"Today is {today:%A}, {today.day} {today:%B %Y}."
+
+
+def _weather_reply(slots):
+    from modules.tools import get_weather  # Imports langchain - only when the weather is asked for
+    return get_weather.invoke({"city": slots["city"]})
+
+
+router = IntentRouter()
+
+router.add_intent(
+    "time",
+    reply=_time_reply,
+    patterns=[
+        r"what(?:'s| is) the (?:current )?time",
+        r"what time is it",
+        r"(?:tell|give) me the (?:current )?time",
+        r"(?:tell me|do you know) what time it is",
+        r"do you know the time",
+        r"current time",
+        r"time check",
+    ],
+    examples=[
+        "what time is it", "what's the time", "tell me the time", "current time please",
+        "what is the time right now", "do you know what time it is", "can you check the time",
+        "what time do you have", "time please", "how late is it", "what's the time now",
+        "could you tell me the time", "time check",
+    ],
+    keywords=["time", "late", "clock"],
+    slots=_time_slots,
+)
+
+router.add_intent(
+    "date",
+    reply=_date_reply,
+    patterns=[
+        r"what(?:'s| is) (?:the |today's )?date",
+        r"what day is(?: it| today)?",
+        r"which day is (?:it|today)",
+        r"(?:tell|give) me (?:the|today's) date",
+    ],
+    examples=[
+        "what's the date", "what is today's date", "what day is it today", "tell me the date",
+        "which day is it", "what's today's date", "what date is it today", "today's date please",
+    ],
+    keywords=["date", "day"],
+)
+
+router.add_intent(
+    "weather",
+    reply=_weather_reply,
+    patterns=[
+        r"(?:(?:what(?:'s| is)|how(?:'s| is)|tell me|give me) )?(?:the )?(?:weather|temperature)(?: like)? (?:in|at|for) [a-z][a-z' -]*",
+        r"how (?:hot|cold|warm) is it (?:in|at) [a-z][a-z' -]*",
+        r"(?:what(?:'s| is) )?(?:the )?[a-z][a-z'-]*(?: [a-z][a-z'-]*)? weather",
+    ],
+    examples=[
+        "what's the weather in delhi", "weather in london", "how is the weather in mumbai",
+        "what is the temperature in paris", "tell me the weather for tokyo", "how hot is it in chennai",
+        "how's the weather like in pune", "temperature in berlin please", "what's it like outside in goa",
+        "is it hot in jaipur", "check the weather in kolkata",
+    ],
+    keywords=["weather", "temperature", "hot", "cold", "warm", "outside"],
+    slots=_weather_slots,
+)
+
+router.add_intent(
+    "sleep",
+    patterns=[
+        r"(?:you can |now )?(?:go(?:ing)? (?:back )?to sleep|sleep)(?: now| mira)?",
+        r"(?:(?:thanks|thank you|alright|that's it|that's all)\s+)*(?:stop listening|stop|goodbye|good bye|bye(?: bye)?|good night|see you(?: later)?)",
+        r"that(?:'s| is) (?:all|it)(?: for now)?",
+    ],
+    examples=[
+        "go to sleep", "sleep now", "stop listening", "goodbye", "bye", "good night",
+        "that's all for now", "you can sleep", "see you later", "ok bye", "stop listening to me",
+        "go back to sleep", "time to sleep mira", "we're done thanks bye",
+    ],
+    keywords=["sleep", "bye", "goodbye", "stop", "night", "later", "done", "all"],
+)
+
+# Requests that look similar but need the agent (knowledge, reasoning, other tools)
+router.add_fallback_examples([
+    "how can i sleep better", "why can't i sleep at night", "tell me a bedtime story",
+    "what time does the store close", "what time is it in new york", "how much time do i need to boil an egg",
+    "will it rain tomorrow in delhi", "what's the weather forecast for next week", "why is the sky blue",
+    "what's the capital of france", "tell me a joke", "who won the match yesterday",
+    "search the web for the latest news", "what's the date of the next full moon", "what day is christmas this year",
+    "how do i stop my dog from barking", "what is the best time to visit goa", "remind me what we talked about",
+    "explain how rainbows form", "what should i cook for dinner", "how far is the moon",
+    "what's the temperature of the sun", "is it healthy to sleep after lunch", "play some music",
+    "how are you today", "what's my sister's name", "translate good night to hindi", "what's a good time to exercise",
+    "how hot does an oven get", "can you help me with my homework", "what's the news today",
+])
+
+
+def route_command(text: str):
+    """Route a command with the default router (None = ask the agent)."""
+    return router.route(text)
+
+
+def answer_route(route: Route) -> str:
+    """Reply for a command routed by route_command()."""
+    return router.respond(route)
@@ -0,0 +1,284 @@
+"""
+Offline keyword spotter - the wake word engine used when Porcupine is unavailable.
+Audio frames first pass a cheap energy gate, so silence and steady background
+noise cost one RMS per frame. While there is voice, the recent audio is turned
+into MFCC features (vectorized NumPy) every `check_interval` seconds. Those
+features are matched against a few enrolled recordings of the wake word with
+subsequence DTW, which finds the best-aligned stretch of the audio, so the
+keyword is found even when the command follows it without a pause.
+
+Templates are user recordings (`python main.py --enroll-wake-word`) in
+runtime/wake_word/. The match threshold (KWS_THRESHOLD) is adjusted by how far
+the enrolled samples are from each other, so it adapts to the voice and microphone.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.audio_capture import RingBuffer
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.01
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 12  # c1..c12 (c0, the frame energy, is left out)
+DYNAMIC_RANGE = np.float32(np.log(10 ** 3.0))  # 30 dB below the loudest mel band in the clip
+
+# Threshold as a factor of the mean distance between enrolled samples
+KWS_THRESHOLD_FACTOR = float(os.getenv("KWS_THRESHOLD_FACTOR", "0.85"))
+# Match threshold (mean MFCC distance per frame); enrollment adjusts it by up to 15%
+KWS_THRESHOLD = float(os.getenv("KWS_THRESHOLD", "2.7"))
+# Energy gate: frame RMS (0-1) must exceed the noise floor by this ratio and KWS_MIN_LEVEL
+KWS_GATE_RATIO = float(os.getenv("KWS_GATE_RATIO", "3.0"))
+KWS_MIN_LEVEL = float(os.getenv("KWS_MIN_LEVEL", "0.01"))
+
+
+@lru_cache(maxsize=4)
+def _mel_filterbank(sample_rate: int, n_fft: int = N_FFT, n_mels: int = N_MELS):
+    """Triangular mel filters, shape (n_mels, n_fft // 2 + 1)."""
+    def to_mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def to_hz(m):
+        return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+    points = to_hz(np.linspace(to_mel(60.0), to_mel(min(7600.0, sample_rate / 2)), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, center, upper = points[:-2, None], points[1:-1, None], points[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n_mels: int = N_MELS, n_mfcc: int = N_MFCC):
+    """Orthonormal DCT-II rows 1..n_mfcc, shape (n_mfcc, n_mels)."""
+    n = np.arange(n_mels)
+    k = np.arange(1, n_mfcc + 1)[:, None]
+    return (np.sqrt(2.0 / n_mels) * np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels))).astype(np.float32)
+
+
+@lru_cache(maxsize=4)
+def _window(length: int):
+    return np.hamming(length).astype(np.float32)
+
+
+def mfcc(audio, sample_rate: int = SAMPLE_RATE):
+    """
+    MFCC features of a clip.
+
+    Args:
+        audio: Mono samples (int16, or float in [-1, 1])
+        sample_rate: Sample rate of `audio`
+
+    Returns:
+        np.ndarray: float32 array of shape (frames, N_MFCC), one row per 10 ms
+    """
+    audio = np.asarray(audio).reshape(-1)
+    if audio.dtype.kind in "iu":
+        audio = audio.astype(np.float32) * (1.0 / 32768.0)
+    frame_length = int(FRAME_SECONDS * sample_rate)
+    if len(audio) < frame_length:
+        return np.zeros((0, N_MFCC), dtype=np.float32)
+    emphasized = np.empty(len(audio), dtype=np.float32)
+    emphasized[0] = audio[0]
+    np.subtract(audio[1:], 0.97 * audio[:-1], out=emphasized[1:])
+    frames = sliding_window_view(emphasized, frame_length)[::int(HOP_SECONDS * sample_rate)]
+    spectrum = np.fft.rfft(frames * _window(frame_length), N_FFT)
+    power = spectrum.real ** 2 + spectrum.imag ** 2
+    log_mel = np.log(power.astype(np.float32) @ _mel_filterbank(sample_rate).T + 1e-8)
+    # Limit the dynamic range, so near-silent bands (where noise dominates) do not drive the distance
+    np.maximum(log_mel, log_mel.max() - DYNAMIC_RANGE, out=log_mel)
+    return log_mel @ _dct_matrix().T
+
+
+def match_cost(template, features) -> float:
+    """
+    How well `template` matches the best-aligned stretch of `features` (subsequence DTW).
+
+    Each template frame advances the alignment by 0, 1 or 2 feature frames, so
+    the spoken keyword may be up to twice as slow or fast as the template.
+
+    Args:
+        template: MFCC frames of an enrolled sample
+        features: MFCC frames of the audio being searched
+
+    Returns:
+        float: Mean per-frame distance along the best alignment (lower is better)
+    """
+    if len(features) < len(template) // 2:
+        return float("inf")
+    # Frame-to-frame Euclidean distances, shape (template frames, feature frames)
+    squared = ((template ** 2).sum(axis=1)[:, None] + (features ** 2).sum(axis=1)[None, :]
+               - 2.0 * template @ features.T)
+    cost = np.sqrt(np.maximum(squared, 0.0))
+    total = cost[0].copy()  # The match may start at any frame
+    for row in cost[1:]:
+        best = total.copy()
+        np.minimum(best[1:], total[:-1], out=best[1:])
+        np.minimum(best[2:], total[:-2], out=best[2:])
+        total = row + best
+    return float(total.min()) / len(template)
+
+
+def trim_silence(audio, sample_rate: int = SAMPLE_RATE, floor_db: float = 30.0):
+    """Cut leading/trailing audio that is background noise or `floor_db` below the loudest 10 ms."""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    hop = int(HOP_SECONDS * sample_rate)
+    if len(audio) < hop:
+        return audio
+    levels = np.sqrt(np.mean(audio[:len(audio) // hop * hop].reshape(-1, hop) ** 2, axis=1)) + 1e-9
+    gate = max(levels.max() * 10 ** (-floor_db / 20), np.percentile(levels, 10) * KWS_GATE_RATIO)
+    voiced = np.flatnonzero(levels > gate)
+    if len(voiced) == 0:
+        return audio
+    return audio[voiced[0] * hop:(voiced[-1] + 1) * hop]
+
+
+class KeywordSpotter:
+    """
+    Streaming wake word spotter: energy gate, MFCC features, DTW against enrolled templates.
+
+    Args:
+        templates: Enrolled recordings (float32 or int16 at `sample_rate`)
+        sample_rate: Rate of the enrolled audio and of the frames passed to process()
+        check_interval: Seconds between matches while there is voice
+        refractory: Seconds after a detection during which no new one is reported
+        threshold: Fixed match threshold (None = derived from the templates)
+    """
+
+    def __init__(self, templates=(), sample_rate: int = SAMPLE_RATE, check_interval: float = 0.1,
+                 refractory: float = 1.5, threshold: float = None):
+        self.sample_rate = sample_rate
+        self.check_samples = int(check_interval * sample_rate)
+        self.refractory_samples = int(refractory * sample_rate)
+        self.fixed_threshold = threshold
+        self.templates = []
+        self._template_seconds = 0.0
+        self.threshold = KWS_THRESHOLD if threshold is None else threshold
+        self.last_score = float("inf")
+        self.checks = 0
+        self.detections = 0
+        for audio in templates:
+            self.enroll(audio)
+        self.reset()
+
+    def enroll(self, audio):
+        """
+        Add a recording of the wake word as a template.
+
+        Args:
+            audio: Mono samples at `sample_rate` (silence around the word is trimmed)
+        """
+        audio = np.asarray(audio).reshape(-1)
+        if audio.dtype.kind in "iu":
+            audio = audio.astype(np.float32) * (1.0 / 32768.0)
+        speech = trim_silence(audio, self.sample_rate)
+        self.templates.append(mfcc(speech, self.sample_rate))
+        self._template_seconds = max(self._template_seconds, len(speech) / self.sample_rate)
+        self.threshold = self._calibrate()
+        self.reset()
+
+    def _calibrate(self) -> float:
+        """Threshold from the spread of the enrolled samples (each matched against the others)."""
+        if self.fixed_threshold is not None or len(self.templates) < 2:
+            return self.threshold if self.fixed_threshold is None else self.fixed_threshold
+        costs = [match_cost(a, b) for i, a in enumerate(self.templates)
+                 for j, b in enumerate(self.templates) if i != j]
+        # Very consistent samples (quiet room) would give a threshold that rejects the same voice in noise,
+        # so calibration only moves the threshold within a band around KWS_THRESHOLD
+        calibrated = KWS_THRESHOLD_FACTOR * float(np.mean(costs))
+        return float(np.clip(calibrated, 0.85 * KWS_THRESHOLD, 1.15 * KWS_THRESHOLD))
+
+    def reset(self):
+        """Forget buffered audio (e.g. after the assistant wakes up)."""
+        # Search window: the longest template at half speed, plus a little lead-in
+        window = int((2.0 * self._template_seconds + 0.3) * self.sample_rate)
+        self._ring = RingBuffer(max(window, self.sample_rate), dtype=np.float32)
+        self._noise = None
+        self._voice_until = 0
+        self._next_check = 0
+        self._quiet_until = 0
+
+    def process(self, frame) -> bool:
+        """
+        Feed the next frame of audio.
+
+        Args:
+            frame: Mono samples (int16, or float in [-1, 1]), typically 10-30 ms
+
+        Returns:
+            bool: True when the wake word has just been spoken
+        """
+        frame = np.asarray(frame).reshape(-1)
+        if frame.dtype.kind in "iu":
+            frame = frame.astype(np.float32) * (1.0 / 32768.0)
+        ring = self._ring
+        ring.write(frame)
+        position = ring.written
+
+        level = float(np.sqrt(np.dot(frame, frame) / max(1, len(frame))))
+        if self._noise is None:
+            self._noise = level
+        # Noise floor follows drops quickly and rises slowly, so speech does not raise it
+        self._noise += (0.1 if level < self._noise else 0.002) * (level - self._noise)
+        if level > max(KWS_MIN_LEVEL, self._noise * KWS_GATE_RATIO):
+            self._voice_until = position + int(0.3 * self.sample_rate)  # Keep checking as the word ends
+
+        if (not self.templates or position > self._voice_until or position < self._next_check
+                or position < self._quiet_until):
+            return False
+        self._next_check = position + self.check_samples
+        return self._check(position)
+
+    def _check(self, position: int) -> bool:
+        count = min(self._ring.capacity, position)
+        features = mfcc(self._ring.view(position - count, count), self.sample_rate)
+        self.checks += 1
+        self.last_score = min(match_cost(template, features) for template in self.templates)
+        if self.last_score > self.threshold:
+            return False
+        self.detections += 1
+        self._quiet_until = position + self.refractory_samples
+        return True
+
+    def recent_audio(self, seconds: float = 2.0):
+        """Copy of the last `seconds` of audio (e.g. for a second-stage check)."""
+        count = min(self._ring.written, self._ring.capacity, int(seconds * self.sample_rate))
+        return self._ring.view(self._ring.written - count, count).copy()
+
+    def stats(self) -> dict:
+        return {"templates": len(self.templates), "threshold": round(self.threshold, 3),
+                "checks": self.checks, "detections": self.detections}
+
+
+def load_templates(directory):
+    """
+    Read enrolled wake word samples.
+
+    Args:
+        directory: Folder of mono WAV files
+
+    Returns:
+        list: float32 arrays at 16 kHz
+    """
+    from pathlib import Path
+    from scipy.io import wavfile
+
+    templates = []
+    for path in sorted(Path(directory).glob("*.wav")):
+        rate, audio = wavfile.read(path)
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+        if audio.dtype.kind in "iu":
+            audio = audio.astype(np.float32) / 32768.0
+        if rate != SAMPLE_RATE:
+            from math import gcd
+            from scipy.signal import resample_poly
+            g = gcd(rate, SAMPLE_RATE)
+            audio = resample_poly(audio, SAMPLE_RATE // g, rate // g).astype(np.float32)
+        templates.append(audio.astype(np.float32))
+    return templates
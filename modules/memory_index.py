@@ -0,0 +1,272 @@
+"""
+Memory-mapped vector index over conversation memory.
+Unit-normalized embeddings are stored row by row in a float32 (or int8-quantized)
+matrix file that grows in place, next to an offset-indexed JSONL file holding
+the entries themselves. Each row also gets a low-dimensional random-projection
+sketch; search scans the sketches newest-first within a time budget and re-ranks
+a shortlist with the full vectors.
+"""
+import json
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+OFFSET = struct.Struct("<Q")
+INT8_SCALE = 127.0
+SEARCH_CHUNK_ROWS = 16384
+# Candidates re-ranked with full vectors per requested hit
+SHORTLIST_FACTOR = 128
+
+
+class VectorIndex:
+    """
+    Append-only vector index with memory-mapped storage.
+
+    Args:
+        directory: Directory for the index files
+        dim: Embedding dimension
+        dtype: "float32" or "int8" (4x smaller, slightly less precise)
+        model: Name of the embedding model; the index is reset if it changes
+        sketch_dim: Dimension of the projected sketch scanned first (0 = scan full vectors)
+    """
+
+    def __init__(self, directory, dim: int, dtype: str = "float32", model: str = None, sketch_dim: int = 64):
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported index dtype: {dtype}")
+        self.directory = Path(directory)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.model = model
+        self.sketch_dim = sketch_dim if 0 < sketch_dim < dim else 0
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._sketch = None
+        self._capacity = 0
+
+        # Fixed orthonormal projection (seeded, so it is the same on every start)
+        self._projection = None
+        if self.sketch_dim:
+            rng = np.random.default_rng(0)
+            self._projection = np.linalg.qr(rng.standard_normal((dim, self.sketch_dim)))[0].astype(np.float32)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.directory / "vectors.bin"
+        self._sketch_path = self.directory / "sketch.bin"
+        self._entries_path = self.directory / "entries.jsonl"
+        self._offsets_path = self.directory / "entries.idx"
+        self._check_meta()
+        self._count = self._recover()
+        self._map(max(self._count, 1024))
+
+    # --- storage ---
+
+    def _files(self):
+        return (self._vectors_path, self._sketch_path, self._entries_path, self._offsets_path)
+
+    def _check_meta(self):
+        """Reset the index if it was built with another model, dimension or layout."""
+        meta_path = self.directory / "meta.json"
+        meta = {"model": self.model, "dim": self.dim, "dtype": self.dtype.name, "sketch_dim": self.sketch_dim}
+        try:
+            stored = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stored = None
+        if stored != meta:
+            for path in self._files():
+                path.unlink(missing_ok=True)
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    def _recover(self) -> int:
+        """Count committed rows; rows are committed by their entries.idx record."""
+        def rows_in(path, row_bytes):
+            return path.stat().st_size // row_bytes if path.exists() else 0
+
+        offsets_size = self._offsets_path.stat().st_size if self._offsets_path.exists() else 0
+        count = min(offsets_size // OFFSET.size, rows_in(self._vectors_path, self.dim * self.dtype.itemsize))
+        if self.sketch_dim:
+            count = min(count, rows_in(self._sketch_path, self.sketch_dim * 4))
+        if offsets_size != count * OFFSET.size:
+            with open(self._offsets_path, "r+b") as f:
+                f.truncate(count * OFFSET.size)
+        return count
+
+    def _map(self, capacity):
+        """(Re)map the data files with room for `capacity` rows (files grow in place)."""
+        # Release our mappings before resizing (required on Windows)
+        self._matrix = self._sketch = None
+        self._matrix = self._map_file(self._vectors_path, self.dtype, capacity, self.dim)
+        if self.sketch_dim:
+            self._sketch = self._map_file(self._sketch_path, np.dtype(np.float32), capacity, self.sketch_dim)
+        self._capacity = capacity
+
+    @staticmethod
+    def _map_file(path, dtype, rows, cols):
+        with open(path, "ab") as f:
+            if f.tell() < rows * cols * dtype.itemsize:
+                f.truncate(rows * cols * dtype.itemsize)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=(rows, cols))
+
+    @staticmethod
+    def _normalize(vectors, dim):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _scores(self, rows, query):
+        """Cosine scores of full stored rows against a normalized float32 query."""
+        if self.dtype == np.int8:
+            return (rows.astype(np.float32) @ query) / INT8_SCALE
+        return rows @ query
+
+    # --- writing ---
+
+    def add(self, vectors, entries):
+        """
+        Append embeddings and the entries they describe.
+
+        Args:
+            vectors: Array of shape (n, dim) or (dim,)
+            entries: List of n JSON-serializable dicts
+        """
+        normalized = self._normalize(vectors, self.dim)
+        if len(normalized) != len(entries):
+            raise ValueError("vectors and entries must have the same length")
+        rows = np.round(normalized * INT8_SCALE).astype(np.int8) if self.dtype == np.int8 else normalized
+        lines = [(json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8") for entry in entries]
+
+        with self._lock:
+            start = self._count
+            end = start + len(rows)
+            if end > self._capacity:
+                self._map(max(self._capacity * 2, end))
+            self._matrix[start:end] = rows
+            self._matrix.flush()
+            if self.sketch_dim:
+                self._sketch[start:end] = normalized @ self._projection
+                self._sketch.flush()
+
+            with open(self._entries_path, "ab") as f:
+                position = f.tell()
+                f.write(b"".join(lines))
+            offsets = []
+            for line in lines:
+                offsets.append(OFFSET.pack(position))
+                position += len(line)
+            with open(self._offsets_path, "ab") as f:
+                f.write(b"".join(offsets))  # Commit point
+            self._count = end
+
+    # --- reading ---
+
+    def __len__(self):
+        return self._count
+
+    def search(self, query, k: int = 3, budget_ms: float = None, skip_recent: int = 0):
+        """
+        Top-k cosine similarity search, scanning the newest rows first.
+
+        Args:
+            query: Query embedding of shape (dim,)
+            k: Number of hits
+            budget_ms: Stop scanning older rows once this much time is spent (None = scan all)
+            skip_recent: Ignore the newest N rows (e.g. turns already in the prompt)
+
+        Returns:
+            list: (score, entry) pairs, best first
+        """
+        start_time = time.perf_counter()
+        q = self._normalize(query, self.dim)[0]
+        # Held for the whole search: trim() rewrites the files and renumbers the rows
+        with self._lock:
+            matrix, sketch = self._matrix, self._sketch
+            end = self._count - skip_recent
+            if sketch is not None:
+                scan, scan_query, keep = sketch, q @ self._projection, k * SHORTLIST_FACTOR
+            else:
+                scan, scan_query, keep = matrix, q, k
+
+            scores, rows = [], []
+            chunk_seconds = 0.0
+            while end > 0:
+                chunk_start = time.perf_counter()
+                begin = max(0, end - SEARCH_CHUNK_ROWS)
+                chunk = scan[begin:end]
+                chunk_scores = chunk @ scan_query if sketch is not None else self._scores(chunk, q)
+                top = min(keep, len(chunk_scores))
+                best = np.argpartition(chunk_scores, -top)[-top:]
+                scores.append(chunk_scores[best])
+                rows.append(best + begin)
+                end = begin
+
+                now = time.perf_counter()
+                chunk_seconds = max(chunk_seconds, now - chunk_start)
+                # Don't start a chunk that would overshoot the budget
+                if budget_ms is not None and (now - start_time + chunk_seconds) * 1000 > budget_ms:
+                    break
+
+            if not scores:
+                return []
+            scores = np.concatenate(scores)
+            rows = np.concatenate(rows)
+            if sketch is not None:
+                # Re-rank the shortlist with the full vectors
+                shortlist = np.sort(rows[np.argsort(-scores)[:keep]])
+                rows = shortlist
+                scores = self._scores(matrix[shortlist], q)
+            order = np.argsort(-scores)[:k]
+            return [(float(scores[i]), self._read_entry(int(rows[i]))) for i in order]
+
+    def _read_entry(self, row):
+        """Entry stored for `row` (call with the lock held)."""
+        with open(self._offsets_path, "rb") as f:
+            f.seek(row * OFFSET.size)
+            (position,) = OFFSET.unpack(f.read(OFFSET.size))
+        with open(self._entries_path, "rb") as f:
+            f.seek(position)
+            return json.loads(f.readline())
+
+    # --- maintenance ---
+
+    def trim(self, keep_last: int) -> int:
+        """
+        Drop all but the newest `keep_last` rows (the files are rewritten).
+
+        Returns:
+            int: Number of rows removed
+        """
+        with self._lock:
+            drop = self._count - keep_last
+            if drop <= 0:
+                return 0
+            matrix = np.array(self._matrix[drop:self._count])
+            sketch = np.array(self._sketch[drop:self._count]) if self.sketch_dim else None
+            offsets = np.fromfile(self._offsets_path, dtype="<u8", count=self._count)
+            with open(self._entries_path, "rb") as f:
+                f.seek(int(offsets[drop]))
+                entries = f.read()
+
+            self._matrix = self._sketch = None
+            for path in (self._vectors_path, self._sketch_path):
+                path.unlink(missing_ok=True)
+            self._entries_path.write_bytes(entries)
+            (offsets[drop:] - offsets[drop]).astype("<u8").tofile(self._offsets_path)
+            self._count = keep_last
+            self._map(max(keep_last, 1024))
+            self._matrix[:keep_last] = matrix
+            self._matrix.flush()
+            if sketch is not None:
+                self._sketch[:keep_last] = sketch
+                self._sketch.flush()
+            return drop
+
+    def clear(self):
+        """Remove every vector and entry."""
+        with self._lock:
+            self._matrix = self._sketch = None
+            for path in self._files():
+                path.unlink(missing_ok=True)
+            self._count = 0
+            self._map(1024)
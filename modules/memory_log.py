@@ -0,0 +1,276 @@
+"""
+Segmented append-only log of conversation entries.
+Entries are JSON lines split across fixed-size segment files; each segment has
+a small index of 8-byte line offsets, so appending, rotating (dropping the
+oldest segment) and reading the last N entries never touch the whole history.
+"""
+import json
+import os
+import shutil
+import struct
+import threading
+from pathlib import Path
+
+OFFSET = struct.Struct("<Q")
+SEGMENT_GLOB = "segment-*.jsonl"
+
+
+def _segment_name(number: int) -> str:
+    return f"segment-{number:010d}.jsonl"
+
+
+class SegmentedLog:
+    """
+    Append-only JSONL log split into segments of `segment_entries` entries.
+
+    Args:
+        directory: Directory holding the segment and index files
+        segment_entries: Entries per segment before rotating to a new one
+        max_segments: Segments kept on disk; the oldest is deleted on rotation
+            (None = keep everything)
+    """
+
+    def __init__(self, directory, segment_entries=1000, max_segments=None):
+        self.directory = Path(directory)
+        self.segment_entries = segment_entries
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._segments = []  # Segment numbers, oldest first
+        self._active_count = 0  # Entries in the newest segment
+        self._data = None
+        self._index = None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._segments = sorted(int(path.stem.split("-")[1]) for path in self.directory.glob(SEGMENT_GLOB))
+        if self._segments:
+            self._active_count = self._recover(self._segments[-1])
+
+    # --- paths ---
+
+    def _data_path(self, number):
+        return self.directory / _segment_name(number)
+
+    def _index_path(self, number):
+        return self._data_path(number).with_suffix(".idx")
+
+    # --- startup ---
+
+    def _recover(self, number) -> int:
+        """
+        Reconcile the newest segment with its index after an unclean shutdown.
+        Drops a torn last line and indexes lines written after the last index update.
+
+        Returns:
+            int: Number of entries in the segment
+        """
+        data_path = self._data_path(number)
+        index_path = self._index_path(number)
+        data_size = data_path.stat().st_size if data_path.exists() else 0
+        offsets = self._read_offsets(number)
+
+        # Index entries pointing past the data belong to lost writes
+        while offsets and offsets[-1] >= data_size:
+            offsets.pop()
+
+        start = offsets[-1] if offsets else 0
+        with open(data_path, "a+b") as f:
+            f.seek(start)
+            tail = f.read()
+            cut = tail.rfind(b"\n") + 1  # Drop a partially written last line
+            if cut < len(tail):
+                f.truncate(start + cut)
+            position = start
+            rebuilt = offsets[:-1] if offsets else []
+            for line in tail[:cut].splitlines(keepends=True):
+                rebuilt.append(position)
+                position += len(line)
+
+        with open(index_path, "wb") as f:
+            f.write(b"".join(OFFSET.pack(offset) for offset in rebuilt))
+        return len(rebuilt)
+
+    def _read_offsets(self, number, first=0):
+        """Read line offsets of a segment starting at entry `first`."""
+        try:
+            with open(self._index_path(number), "rb") as f:
+                f.seek(first * OFFSET.size)
+                raw = f.read()
+        except OSError:
+            return []
+        usable = len(raw) - len(raw) % OFFSET.size
+        return [value for (value,) in OFFSET.iter_unpack(raw[:usable])]
+
+    # --- writing ---
+
+    def _open_active(self):
+        """Open (or create) the newest segment for appending (lock held)."""
+        if not self._segments:
+            self._segments.append(0)
+            self._active_count = 0
+        number = self._segments[-1]
+        self._data = open(self._data_path(number), "ab")
+        self._index = open(self._index_path(number), "ab")
+
+    def _close_active(self):
+        for handle in (self._data, self._index):
+            if handle is not None:
+                handle.close()
+        self._data = self._index = None
+
+    def _rotate(self):
+        """Start a new segment and drop the oldest ones beyond `max_segments` (lock held)."""
+        self._close_active()
+        self._segments.append(self._segments[-1] + 1)
+        self._active_count = 0
+        if self.max_segments is not None:
+            while len(self._segments) > self.max_segments:
+                self._drop_segment(self._segments.pop(0))
+        self._open_active()
+
+    def _drop_segment(self, number):
+        for path in (self._data_path(number), self._index_path(number)):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def append(self, entry: dict):
+        """Append one entry (a JSON-serializable dict) to the log."""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._data is None:
+                self._open_active()
+            if self._active_count >= self.segment_entries:
+                self._rotate()
+            offset = self._data.tell()
+            self._data.write(line)
+            self._data.flush()
+            self._index.write(OFFSET.pack(offset))
+            self._index.flush()
+            self._active_count += 1
+
+    # --- reading ---
+
+    def _closed_count(self, number):
+        try:
+            return self._index_path(number).stat().st_size // OFFSET.size
+        except OSError:
+            return 0
+
+    def _segment_count(self, number):
+        if number == self._segments[-1]:
+            return self._active_count
+        return self._closed_count(number)
+
+    def tail(self, limit=None) -> list:
+        """
+        Read the newest entries, walking segments backwards from the end.
+
+        Args:
+            limit: Maximum number of entries (None for all)
+
+        Returns:
+            list: Entries, oldest first
+        """
+        with self._lock:
+            segments = list(self._segments)
+            active_count = self._active_count
+
+        chunks = []
+        remaining = limit
+        for number in reversed(segments):
+            if remaining is not None and remaining <= 0:
+                break
+            # Only the newest segment is still growing; older counts come from index sizes
+            count = active_count if number == segments[-1] else self._closed_count(number)
+            first = 0 if remaining is None else max(0, count - remaining)
+            entries = self._read_segment(number, first, count)
+            chunks.append(entries)
+            if remaining is not None:
+                remaining -= len(entries)
+
+        result = []
+        for entries in reversed(chunks):
+            result.extend(entries)
+        return result
+
+    def _read_segment(self, number, first, count):
+        """Parse entries [first, count) of a segment, seeking straight to the first one."""
+        if first >= count:
+            return []
+        offsets = self._read_offsets(number, first)
+        if not offsets:
+            return []
+        try:
+            with open(self._data_path(number), "rb") as f:
+                f.seek(offsets[0])
+                raw = f.read()
+        except OSError:
+            return []
+
+        entries = []
+        for line in raw.splitlines()[:count - first]:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # Skip malformed lines
+        return entries
+
+    def __len__(self):
+        with self._lock:
+            return sum(self._segment_count(number) for number in self._segments)
+
+    # --- maintenance ---
+
+    def trim(self, keep_last: int) -> int:
+        """
+        Drop whole old segments while at least `keep_last` entries remain.
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            total = sum(self._segment_count(number) for number in self._segments)
+            removed = 0
+            while len(self._segments) > 1:
+                oldest = self._segments[0]
+                count = self._segment_count(oldest)
+                if total - count < keep_last:
+                    break
+                self._segments.pop(0)
+                self._drop_segment(oldest)
+                total -= count
+                removed += count
+            return removed
+
+    def clear(self, backup=None):
+        """
+        Remove every entry. With `backup` (a directory path), the segments are
+        moved there instead (replacing any previous backup).
+        """
+        with self._lock:
+            self._close_active()
+            if backup is not None:
+                backup = Path(backup)
+                if backup.exists():
+                    shutil.rmtree(backup)
+                os.replace(self.directory, backup)
+                self.directory.mkdir(parents=True, exist_ok=True)
+            else:
+                for number in self._segments:
+                    self._drop_segment(number)
+            self._segments = []
+            self._active_count = 0
+
+    def iter_entries(self):
+        """Yield every entry, oldest first, one segment at a time."""
+        with self._lock:
+            segments = list(self._segments)
+            active_count = self._active_count
+        for number in segments:
+            count = active_count if number == segments[-1] else self._closed_count(number)
+            yield from self._read_segment(number, 0, count)
+
+    def close(self):
+        with self._lock:
+            self._close_active()
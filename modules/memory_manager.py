@@ -1,116 +1,201 @@
 """
 Memory management module for storing conversation history.
-Includes cleanup functionality to prevent unbounded growth.
+By default entries go to a segmented append-only log under data/memory/; the
+oldest segment is dropped when the log exceeds MAX_MEMORY_ENTRIES, so growth is
+bounded without ever rewriting the history. With MEMORY_BACKEND=sqlite the full
+history is kept in data/memory.db with a full-text index for search_memory().
 """
 import json
+import math
 import os
+import re
+import threading
 from pathlib import Path
+from modules.memory_log import SegmentedLog
 from utils.config import MAX_MEMORY_ENTRIES
+from utils.metrics import traced
 
 # Get current file's directory
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
+MEMORY_DIR = DATA_DIR / "memory"
+BACKUP_DIR = DATA_DIR / "memory.bak"
+MEMORY_DB = DATA_DIR / "memory.db"
+# Legacy single-file JSONL memory, imported into the log on first use. The file
+# is left in place (it ships with the repo); the sentinel records the import and
+# sits outside data/memory/, which clear_memory() moves to the backup.
 MEM_FILE = DATA_DIR / "memory.json"
+MEM_FILE_IMPORTED = DATA_DIR / "memory.json.imported"
+
+# Storage backend: "log" (segmented JSONL, bounded) or "sqlite" (full history, searchable)
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "log").lower()
+# Entries per segment file; rotation drops one segment at a time
+MEMORY_SEGMENT_ENTRIES = int(os.getenv("MEMORY_SEGMENT_ENTRIES", str(max(1, MAX_MEMORY_ENTRIES // 4))))
 
 # Ensure the data directory exists
 DATA_DIR.mkdir(exist_ok=True)
 
+_store = None
+_store_lock = threading.Lock()
+
+def get_memory_store():
+    """
+    Get the shared memory backend, opening it (and migrating older data) on first use.
+
+    Returns:
+        SegmentedLog | SQLiteMemory: The conversation memory store
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if MEMORY_BACKEND == "sqlite":
+                _store = _open_sqlite()
+            else:
+                # Keep at least MAX_MEMORY_ENTRIES: full segments plus the one being written
+                max_segments = math.ceil(MAX_MEMORY_ENTRIES / MEMORY_SEGMENT_ENTRIES) + 1
+                _store = SegmentedLog(MEMORY_DIR, segment_entries=MEMORY_SEGMENT_ENTRIES,
+                                      max_segments=max_segments)
+                if _legacy_file_pending() and len(_store) == 0:
+                    _migrate_legacy_file(_store)
+        return _store
+
+def _open_sqlite():
+    """Open data/memory.db, importing the JSONL memory the first time."""
+    from modules.memory_sqlite import SQLiteMemory, read_jsonl
+
+    store = SQLiteMemory(MEMORY_DB)
+    if len(store) == 0:
+        # The log already holds data/memory.json's entries once it has been migrated
+        sources = ([MEM_FILE] if _legacy_file_pending() else []) + [MEMORY_DIR]
+        for source in sources:
+            if source.exists():
+                count = store.import_entries(read_jsonl(source))
+                if source == MEM_FILE:
+                    _mark_legacy_imported(count, MEMORY_DB)
+                if count:
+                    print(f"📦 Imported {count} memory entries from {source} into {MEMORY_DB}")
+    return store
+
+def _legacy_file_pending() -> bool:
+    """Whether data/memory.json still has to be imported (earlier versions renamed it to .json.migrated)."""
+    return MEM_FILE.exists() and not MEM_FILE_IMPORTED.exists() and not MEM_FILE.with_suffix(".json.migrated").exists()
+
+def _mark_legacy_imported(count: int, target: Path):
+    MEM_FILE_IMPORTED.write_text(json.dumps({"entries": count, "into": target.name}), encoding="utf-8")
+
+def _migrate_legacy_file(log: SegmentedLog):
+    """Import entries from the old single-file data/memory.json into the log."""
+    try:
+        migrated = 0
+        with open(MEM_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        log.append(json.loads(line))
+                        migrated += 1
+                    except json.JSONDecodeError:
+                        continue  # Skip malformed lines
+        _mark_legacy_imported(migrated, MEMORY_DIR)
+        print(f"📦 Migrated {migrated} memory entries to {MEMORY_DIR}")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not migrate {MEM_FILE}: {e}")
+
+@traced("save_memory")
 def save_memory(user_input: str, ai_response: str):
     """
     Save a conversation pair to memory.
-    
+
     Args:
         user_input: User's input text
         ai_response: AI's response text
     """
     try:
-        # Ensure directory exists
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        
-        # Save as JSONL (one JSON object per line)
-        with open(MEM_FILE, "a", encoding="utf-8") as f:
-            json.dump({"user": user_input, "ai": ai_response}, f, ensure_ascii=False)
-            f.write("\n")
-        
-        # Periodically clean up if file gets too large
-        if os.path.getsize(MEM_FILE) > MAX_MEMORY_ENTRIES * 200:  # Rough estimate
-            cleanup_memory()
-            
+        # Cheap either way: one appended line, or a queued insert for the SQLite writer
+        get_memory_store().append({"user": user_input, "ai": ai_response})
     except Exception as e:
         print(f"⚠️ Warning: Could not save memory: {e}")
+        return
+
+    from modules.memory_recall import MEMORY_RECALL, index_entry
+    if MEMORY_RECALL:
+        try:
+            index_entry(user_input, ai_response)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not index memory for recall: {e}")
 
 def load_memory(limit=None):
     """
-    Load conversation memory from file.
-    
+    Load conversation memory.
+
     Args:
         limit: Maximum number of entries to load (None for all)
-        
+
     Returns:
         list: List of conversation dictionaries
     """
-    if not MEM_FILE.exists():
-        return []
-    
     try:
-        memories = []
-        with open(MEM_FILE, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    try:
-                        memories.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue  # Skip malformed lines
-        
-        # Return most recent entries if limit specified
-        if limit and len(memories) > limit:
-            return memories[-limit:]
-        
-        return memories
+        # Reads backwards from the newest entry, only as far as needed
+        return get_memory_store().tail(limit)
     except Exception as e:
         print(f"⚠️ Warning: Could not load memory: {e}")
         return []
 
+def search_memory(query: str, limit: int = 5):
+    """
+    Search past conversations for a query.
+
+    Args:
+        query: Free-text query; every word must appear in the user or AI text
+        limit: Maximum number of hits
+
+    Returns:
+        list: Matching conversation dictionaries, best match first
+    """
+    try:
+        store = get_memory_store()
+        if hasattr(store, "search"):
+            return store.search(query, limit)  # FTS5 ranked search
+        return _scan_memory(store, query, limit)
+    except Exception as e:
+        print(f"⚠️ Warning: Could not search memory: {e}")
+        return []
+
+def _scan_memory(store, query, limit):
+    """Linear search over the log backend, newest matches first."""
+    words = re.findall(r"\w+", query.lower())
+    if not words:
+        return []
+    hits = []
+    for entry in reversed(store.tail()):
+        text = f"{entry.get('user', '')} {entry.get('ai', '')}".lower()
+        if all(word in text for word in words):
+            hits.append(entry)
+            if len(hits) >= limit:
+                break
+    return hits
+
 def cleanup_memory(keep_last=500):
     """
-    Clean up memory file by keeping only the most recent entries.
-    
+    Drop old memory entries, keeping at least the most recent ones.
+
     Args:
         keep_last: Number of recent entries to keep
     """
     try:
-        memories = load_memory()
-        if len(memories) <= keep_last:
-            return  # No cleanup needed
-        
-        # Keep only the most recent entries
-        memories_to_keep = memories[-keep_last:]
-        
-        # Backup old file
-        backup_file = MEM_FILE.with_suffix('.json.bak')
-        if MEM_FILE.exists():
-            import shutil
-            shutil.copy2(MEM_FILE, backup_file)
-        
-        # Write back only recent entries
-        with open(MEM_FILE, "w", encoding="utf-8") as f:
-            for memory in memories_to_keep:
-                json.dump(memory, f, ensure_ascii=False)
-                f.write("\n")
-        
-        print(f"🧹 Cleaned up memory: kept {len(memories_to_keep)} most recent entries")
-        
+        removed = get_memory_store().trim(keep_last)
+        if removed:
+            print(f"🧹 Cleaned up memory: removed {removed} old entries")
     except Exception as e:
         print(f"⚠️ Warning: Could not cleanup memory: {e}")
 
 def clear_memory():
     """Clear all memory (use with caution)."""
     try:
-        if MEM_FILE.exists():
-            backup_file = MEM_FILE.with_suffix('.json.bak')
-            import shutil
-            shutil.copy2(MEM_FILE, backup_file)
-            MEM_FILE.unlink()
-            print("🗑️ Memory cleared (backup saved)")
+        store = get_memory_store()
+        store.clear(backup=MEMORY_DB.with_suffix(".db.bak") if MEMORY_BACKEND == "sqlite" else BACKUP_DIR)
+        from modules.memory_recall import MEMORY_RECALL, clear_index
+        if MEMORY_RECALL:
+            clear_index()
+        print("🗑️ Memory cleared (backup saved)")
     except Exception as e:
         print(f"⚠️ Warning: Could not clear memory: {e}")
@@ -0,0 +1,158 @@
+"""
+Semantic recall over conversation memory.
+Every saved conversation pair is embedded with a small local CPU model and added
+to a memory-mapped vector index (runtime/memory_index/); ask_brain looks up the
+most similar past conversations for each prompt and adds them to the user message.
+Recall is opt-in (MEMORY_RECALL=true): it needs torch/transformers and downloads
+the embedding model on first use.
+"""
+import os
+import threading
+
+import numpy as np
+
+from modules.memory_index import VectorIndex
+from utils.model_registry import register, get_resource
+from utils.runtime_paths import get_memory_index_dir
+
+MEMORY_RECALL = os.getenv("MEMORY_RECALL", "false").lower() in ("true", "1", "yes")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# "float32" or "int8" (4x smaller vector file, slightly less precise)
+MEMORY_INDEX_DTYPE = os.getenv("MEMORY_INDEX_DTYPE", "float32").lower()
+MEMORY_RECALL_K = int(os.getenv("MEMORY_RECALL_K", "3"))
+# Hits below this cosine similarity are not worth the prompt space
+MEMORY_RECALL_MIN_SCORE = float(os.getenv("MEMORY_RECALL_MIN_SCORE", "0.45"))
+# Time budget for the index scan; older rows are skipped once it is spent
+MEMORY_RECALL_BUDGET_MS = float(os.getenv("MEMORY_RECALL_BUDGET_MS", "10"))
+# Most conversations kept in the index (older ones are dropped)
+MEMORY_RECALL_MAX_ENTRIES = int(os.getenv("MEMORY_RECALL_MAX_ENTRIES", "50000"))
+
+RECALL_HEADER = "Relevant past conversations:\n"
+RECALL_FOOTER = "(End of past conversations)\n"
+RECALL_MAX_CHARS = 200
+
+# ============================================
+# 🔢 Embedding Model
+# ============================================
+def _load_embedder():
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL)
+    model = AutoModel.from_pretrained(EMBEDDING_MODEL)
+    model.eval()
+
+    def embed(texts):
+        """Mean-pooled, unit-normalized embeddings as a float32 array of shape (n, dim)."""
+        batch = tokenizer(list(texts), padding=True, truncation=True, max_length=256, return_tensors="pt")
+        with torch.no_grad():
+            hidden = model(**batch).last_hidden_state
+        mask = batch["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        pooled = torch.nn.functional.normalize(pooled, dim=1)
+        return pooled.numpy().astype(np.float32)
+
+    embed.dim = model.config.hidden_size
+    return embed
+
+register("embedder", _load_embedder)
+
+# ============================================
+# 📇 Index
+# ============================================
+_index = None
+_index_lock = threading.Lock()
+
+def entry_text(entry: dict) -> str:
+    """Text embedded for one conversation pair."""
+    return f"User: {entry.get('user', '')}\nMira: {entry.get('ai', '')}"
+
+def get_memory_index() -> VectorIndex:
+    """
+    Get the shared vector index, backfilling it from saved memory the first time.
+
+    Returns:
+        VectorIndex: The memory index
+    """
+    return _open_index()
+
+def _open_index(pending=0):
+    """Open the index; the newest `pending` saved entries are left for the caller to add."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            embed = get_resource("embedder")
+            index = VectorIndex(get_memory_index_dir(), dim=embed.dim, dtype=MEMORY_INDEX_DTYPE,
+                                model=EMBEDDING_MODEL)
+            if len(index) == 0:
+                _backfill(index, embed, pending)
+            _index = index
+        return _index
+
+def _backfill(index, embed, pending=0, batch_size=64):
+    """Embed the most recent conversations saved before the index existed."""
+    from modules.memory_manager import load_memory
+    from utils.config import MAX_MEMORY_ENTRIES
+
+    # Bounded like the memory log - the SQLite backend may hold the whole history
+    entries = load_memory(limit=min(MAX_MEMORY_ENTRIES, MEMORY_RECALL_MAX_ENTRIES) + pending)
+    if pending:
+        entries = entries[:-pending]
+    for start in range(0, len(entries), batch_size):
+        batch = entries[start:start + batch_size]
+        index.add(embed([entry_text(entry) for entry in batch]), batch)
+    if entries:
+        print(f"🧠 Indexed {len(entries)} past conversations for recall")
+
+register("memory_index", get_memory_index)
+
+def index_entry(user_input: str, ai_response: str):
+    """Embed one conversation pair and add it to the index (called from save_memory)."""
+    entry = {"user": user_input, "ai": ai_response}
+    index = _open_index(pending=1)  # This entry is already in memory - don't backfill it twice
+    index.add(get_resource("embedder")([entry_text(entry)]), [entry])
+    if len(index) > MEMORY_RECALL_MAX_ENTRIES * 5 // 4:  # Trim in steps, not on every save
+        index.trim(MEMORY_RECALL_MAX_ENTRIES)
+
+def clear_index():
+    """Drop every indexed conversation."""
+    get_memory_index().clear()
+
+# ============================================
+# 🔎 Recall
+# ============================================
+def recall(query: str, k: int = None, skip_recent: int = 0) -> list:
+    """
+    Find past conversations similar to a query.
+
+    Args:
+        query: The user's prompt
+        k: Number of hits (default MEMORY_RECALL_K)
+        skip_recent: Ignore the newest N conversations (already in the session history)
+
+    Returns:
+        list: Conversation dictionaries, best match first
+    """
+    vector = get_resource("embedder")([query])[0]
+    hits = get_memory_index().search(vector, k=k or MEMORY_RECALL_K, budget_ms=MEMORY_RECALL_BUDGET_MS,
+                                     skip_recent=skip_recent)
+    return [entry for score, entry in hits if score >= MEMORY_RECALL_MIN_SCORE]
+
+def _clip(text):
+    text = " ".join(str(text).split())
+    return text if len(text) <= RECALL_MAX_CHARS else text[:RECALL_MAX_CHARS - 3] + "..."
+
+def format_recall(entries) -> str:
+    """Format recalled conversations for the user message ("" if there are none)."""
+    if not entries:
+        return ""
+    lines = [f"- User: {_clip(entry.get('user', ''))}\n  Mira: {_clip(entry.get('ai', ''))}" for entry in entries]
+    return RECALL_HEADER + "\n".join(lines) + "\n" + RECALL_FOOTER
+
+def strip_recall(content: str) -> str:
+    """Remove a recalled-conversations block (header to footer) from a user message."""
+    start = content.find(RECALL_HEADER)
+    if start == -1:
+        return content
+    end = content.find(RECALL_FOOTER, start)
+    return content[:start] + content[end + len(RECALL_FOOTER):] if end != -1 else content
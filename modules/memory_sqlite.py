@@ -0,0 +1,301 @@
+"""
+SQLite backend for conversation memory (MEMORY_BACKEND=sqlite).
+Keeps the full history in data/memory.db in WAL mode, batches inserts through
+a background writer thread, and maintains an FTS5 index over user and AI text
+for ranked full-text search.
+
+Import existing JSONL memory (data/memory.json or the data/memory/ log):
+    python -m modules.memory_sqlite data/memory.json
+"""
+import argparse
+import json
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    user TEXT NOT NULL,
+    ai TEXT NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+    user, ai, content='memory', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS memory_ai AFTER INSERT ON memory BEGIN
+    INSERT INTO memory_fts(rowid, user, ai) VALUES (new.id, new.user, new.ai);
+END;
+CREATE TRIGGER IF NOT EXISTS memory_ad AFTER DELETE ON memory BEGIN
+    INSERT INTO memory_fts(memory_fts, rowid, user, ai) VALUES ('delete', old.id, old.user, old.ai);
+END;
+"""
+
+_STOP = object()
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching all of its words (syntax characters stripped)."""
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"' for word in words)
+
+
+class SQLiteMemory:
+    """
+    Conversation memory stored in SQLite with batched writes and FTS5 search.
+
+    Args:
+        path: Database file
+        batch_size: Maximum entries written per transaction
+    """
+
+    def __init__(self, path, batch_size=256):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._queue = queue.Queue()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            print("⚠️ Warning: SQLite was built without FTS5 - search_memory falls back to a slow scan")
+            self.has_fts = False
+        conn.commit()
+
+        self._writer = threading.Thread(target=self._write_loop, name="memory-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        """Per-thread connection (WAL lets readers run alongside the writer)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- writing ---
+
+    def append(self, entry: dict):
+        """Queue one entry ({"user": ..., "ai": ...}) for the background writer."""
+        self._queue.put((entry.get("ts", time.time()), entry.get("user", ""), entry.get("ai", "")))
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                with conn:
+                    conn.executemany("INSERT INTO memory (ts, user, ai) VALUES (?, ?, ?)", batch)
+            except sqlite3.Error as e:
+                print(f"⚠️ Warning: Could not write {len(batch)} memory entries: {e}")
+            for _ in range(len(batch) + stop):
+                self._queue.task_done()
+            if stop:
+                break
+        conn.close()
+
+    def flush(self):
+        """Wait until every queued entry has been written."""
+        self._queue.join()
+
+    # --- reading ---
+
+    def tail(self, limit=None) -> list:
+        """
+        Read the newest entries.
+
+        Args:
+            limit: Maximum number of entries (None for all)
+
+        Returns:
+            list: Entries, oldest first
+        """
+        self.flush()  # Read your own writes
+        conn = self._connect()
+        if limit is None:
+            rows = conn.execute("SELECT user, ai FROM memory ORDER BY id").fetchall()
+        else:
+            rows = conn.execute("SELECT user, ai FROM memory ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+            rows.reverse()
+        return [{"user": user, "ai": ai} for user, ai in rows]
+
+    def iter_entries(self):
+        """Yield every entry, oldest first."""
+        self.flush()
+        cursor = self._connect().execute("SELECT user, ai FROM memory ORDER BY id")
+        for user, ai in cursor:
+            yield {"user": user, "ai": ai}
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """
+        Ranked full-text search over user and AI text (bm25 over every match,
+        newer entries first among equal scores).
+
+        Args:
+            query: Free text; every word must match
+            limit: Maximum number of hits
+
+        Returns:
+            list: Hits ({"user", "ai", "ts", "score"}), best first
+        """
+        match = fts_query(query)
+        if not match:
+            return []
+        self.flush()
+        conn = self._connect()
+        if self.has_fts:
+            # Rank the full match set, so an old but relevant entry is never cut off for a newer one
+            rows = conn.execute(
+                "SELECT m.user, m.ai, m.ts, c.score FROM ("
+                "  SELECT rowid, bm25(memory_fts) AS score FROM memory_fts"
+                "  WHERE memory_fts MATCH ? ORDER BY bm25(memory_fts), rowid DESC LIMIT ?"
+                ") c JOIN memory m ON m.id = c.rowid ORDER BY c.score, c.rowid DESC",
+                (match, limit)).fetchall()
+        else:
+            words = re.findall(r"\w+", query.lower())
+            where = " AND ".join("(lower(user) LIKE ? OR lower(ai) LIKE ?)" for _ in words)
+            params = [f"%{word}%" for word in words for _ in range(2)]
+            rows = conn.execute(f"SELECT user, ai, ts, 0.0 FROM memory WHERE {where} "
+                                f"ORDER BY id DESC LIMIT ?", (*params, limit)).fetchall()
+        # bm25() is lower-is-better; report higher-is-better scores
+        return [{"user": user, "ai": ai, "ts": ts, "score": -score} for user, ai, ts, score in rows]
+
+    def __len__(self):
+        self.flush()
+        return self._connect().execute("SELECT count(*) FROM memory").fetchone()[0]
+
+    # --- maintenance ---
+
+    def trim(self, keep_last: int) -> int:
+        """
+        Delete all but the most recent `keep_last` entries.
+
+        Returns:
+            int: Number of entries removed
+        """
+        self.flush()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM memory WHERE id <= "
+                "(SELECT id FROM memory ORDER BY id DESC LIMIT 1 OFFSET ?)", (keep_last,))
+        return cursor.rowcount
+
+    def clear(self, backup=None):
+        """
+        Remove every entry. With `backup` (a file path), the database is copied there first.
+        """
+        self.flush()
+        conn = self._connect()
+        if backup is not None:
+            target = sqlite3.connect(backup)
+            with target:
+                conn.backup(target)
+            target.close()
+        with conn:
+            conn.execute("DELETE FROM memory")
+            if self.has_fts:
+                conn.execute("INSERT INTO memory_fts(memory_fts) VALUES ('delete-all')")
+
+    def import_entries(self, entries, batch_size=10_000) -> int:
+        """
+        Bulk-insert entries synchronously (used for migrations).
+
+        Returns:
+            int: Number of entries imported
+        """
+        self.flush()
+        conn = self._connect()
+        imported = 0
+        batch = []
+        now = time.time()
+        for entry in entries:
+            batch.append((entry.get("ts", now), entry.get("user", ""), entry.get("ai", "")))
+            if len(batch) >= batch_size:
+                with conn:
+                    conn.executemany("INSERT INTO memory (ts, user, ai) VALUES (?, ?, ?)", batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            with conn:
+                conn.executemany("INSERT INTO memory (ts, user, ai) VALUES (?, ?, ?)", batch)
+            imported += len(batch)
+        return imported
+
+    def close(self):
+        """Write pending entries and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._writer.join()
+
+
+def read_jsonl(path):
+    """
+    Yield entries from a JSONL file, or from every segment of a memory log directory.
+
+    Args:
+        path: data/memory.json-style file or data/memory/-style directory
+    """
+    path = Path(path)
+    files = sorted(path.glob("segment-*.jsonl")) if path.is_dir() else [path]
+    for file in files:
+        with open(file, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Skip malformed lines
+
+
+def main(argv=None):
+    from modules.memory_manager import DATA_DIR, MEMORY_DB
+
+    parser = argparse.ArgumentParser(description="Import JSONL conversation memory into SQLite.")
+    parser.add_argument("sources", nargs="*", default=[str(DATA_DIR / "memory.json"), str(DATA_DIR / "memory")],
+                        help="JSONL files or memory log directories (default: data/memory.json and data/memory/)")
+    parser.add_argument("--db", default=str(MEMORY_DB), help="Target database")
+    args = parser.parse_args(argv)
+
+    memory = SQLiteMemory(args.db)
+    total = 0
+    for source in args.sources:
+        if not Path(source).exists():
+            continue
+        start = time.perf_counter()
+        count = memory.import_entries(read_jsonl(source))
+        total += count
+        print(f"📦 Imported {count} entries from {source} in {time.perf_counter() - start:.1f} s")
+    memory.close()
+    print(f"✅ Imported {total} entries into {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Semantic response cache - answers repeated questions without an LLM round trip.
+Questions are keyed by their content words in order, so "What's the weather
+in Delhi?" and "weather in Delhi" share an entry, but "convert 100 dollars to
+rupees" and "convert 100 rupees to dollars" do not. Paraphrases are matched by
+embedding similarity (the memory recall embedder) above a threshold. Names,
+numbers and the words after "to", "from", "in"... must agree on every hit, so
+"weather in Delhi" never answers "weather in Mumbai".
+
+How long an answer stays valid depends on the tools it used: answers that
+involve the time are never cached, weather answers are short-lived, and
+answers that need no tools live longest. Entries are scoped per session or
+shared, bounded with LRU eviction, and hit rates and saved latency are counted.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import modules.memory_recall  # Registers the "embedder" resource
+from utils.model_registry import get_resource
+
+RESPONSE_CACHE = os.getenv("RESPONSE_CACHE", "false").lower() in ("true", "1", "yes")
+# "session" (answers reused only within a conversation) or "global"
+RESPONSE_CACHE_SCOPE = os.getenv("RESPONSE_CACHE_SCOPE", "session").lower()
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "256"))
+# Minimum cosine similarity for a paraphrase to reuse an answer (0 disables semantic matching)
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92"))
+# Lifetimes in seconds: answers without tools, and per tool (the shortest one used wins)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+TOOL_TTLS = {
+    "get_time": 0,  # The answer is stale a minute later
+    "get_weather": float(os.getenv("RESPONSE_CACHE_WEATHER_TTL", "300")),
+    "web_search": float(os.getenv("RESPONSE_CACHE_SEARCH_TTL", "1800")),
+}
+
+# Questions about the time or date are never cached, whatever tools the answer used
+_TIME_WORDS = re.compile(r"\b(?:time|clock|o'clock|date|day|tonight|tomorrow|yesterday)\b")
+_STOP_WORDS = {
+    "a", "an", "the", "is", "are", "was", "what", "what's", "whats", "how", "how's", "hows", "tell", "me",
+    "please", "can", "could", "you", "mira", "hey", "ok", "okay", "of", "like", "about",
+    "do", "does", "know", "give", "i", "want", "it", "it's", "so", "um", "uh", "there",
+}
+# Words that give the next one a direction or place ("to rupees", "from Pune") - kept in keys and entities
+_DIRECTION_WORDS = {"to", "into", "from", "in", "at", "for", "per", "than"}
+
+
+def content_words(text: str) -> list:
+    """Lowercased words of a question without punctuation and filler words."""
+    words = re.sub(r"[^a-z0-9' ]+", " ", text.lower().replace("’", "'")).split()
+    return [w for w in words if w not in _STOP_WORDS]
+
+
+def cache_key(text: str) -> str:
+    """Exact-match key: content words in their spoken order."""
+    return " ".join(content_words(text))
+
+
+def entities(text: str) -> set:
+    """
+    Names, numbers and directions in a question: capitalized words after the
+    first, words with digits, and each direction word with the content word
+    after it ("to rupees").
+    """
+    words = re.findall(r"[A-Za-z0-9']+", text)
+    names = {w.lower() for i, w in enumerate(words) if any(c.isdigit() for c in w) or (i > 0 and w[0].isupper())}
+    content = content_words(text)
+    names.update(f"{w} {nxt}" for w, nxt in zip(content, content[1:])
+                 if w in _DIRECTION_WORDS and nxt not in _DIRECTION_WORDS)
+    return names
+
+
+class ResponseCache:
+    """
+    LRU cache of agent answers with tool-dependent TTLs and semantic lookup.
+
+    Args:
+        max_entries: Maximum cached answers across all scopes
+        threshold: Minimum cosine similarity for a semantic hit (0 = exact keys only)
+        embed: Callable(list of str) -> unit-normalized float32 array; None = exact keys only
+        clock: Time source in seconds (monotonic by default)
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_ENTRIES, threshold: float = RESPONSE_CACHE_THRESHOLD,
+                 embed=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.embed = embed
+        self._clock = clock
+        self._entries = OrderedDict()  # (scope, key) -> entry dict
+        self._stats = {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "stored": 0,
+                       "not_cacheable": 0, "expired": 0, "saved_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, question: str, tools: list) -> float:
+        """
+        How long an answer may be reused.
+
+        Args:
+            question: The user's question
+            tools: Names of the tools the answer used
+
+        Returns:
+            float: Lifetime in seconds (0 = don't cache)
+        """
+        if _TIME_WORDS.search(question.lower()):
+            return 0
+        if not tools:
+            return RESPONSE_CACHE_TTL
+        return min(TOOL_TTLS.get(name, 0) for name in tools)  # Unknown tools: don't cache
+
+    def _vector(self, text):
+        if self.embed is None or self.threshold <= 0:
+            return None
+        return self.embed([text])[0]
+
+    def get(self, question: str, scope: str = "*"):
+        """
+        Look up a cached answer.
+
+        Args:
+            question: The user's question
+            scope: Session id, or "*" for the shared scope
+
+        Returns:
+            str | None: The cached answer, or None on a miss
+        """
+        key = cache_key(question)
+        if not key:
+            return None
+        names = entities(question)
+        now = self._clock()
+        with self._lock:
+            self._stats["lookups"] += 1
+            entry = self._entries.get((scope, key))
+            if entry is not None and entry["expires_at"] > now and entry["entities"] == names:
+                return self._hit((scope, key), entry, "exact_hits")
+            candidates = [(k, e) for k, e in self._entries.items()
+                          if k[0] == scope and e["vector"] is not None and e["expires_at"] > now]
+
+        if not candidates:
+            return None
+        vector = self._vector(question)
+        if vector is None:
+            return None
+        scores = np.stack([e["vector"] for _, e in candidates]) @ vector
+        for i in np.argsort(-scores):
+            if scores[i] < self.threshold:
+                break
+            cache_id, entry = candidates[i]
+            if entry["entities"] == names:
+                with self._lock:
+                    if cache_id in self._entries:
+                        return self._hit(cache_id, entry, "semantic_hits")
+        return None
+
+    def _hit(self, cache_id, entry, kind):
+        self._entries.move_to_end(cache_id)
+        self._stats[kind] += 1
+        self._stats["saved_seconds"] += entry["latency"]
+        return entry["answer"]
+
+    def put(self, question: str, answer: str, tools: list = (), latency: float = 0.0, scope: str = "*"):
+        """
+        Cache an answer if its tools allow it.
+
+        Args:
+            question: The user's question
+            answer: The agent's final answer
+            tools: Names of the tools the answer used
+            latency: Seconds the answer took (reported as saved on each hit)
+            scope: Session id, or "*" for the shared scope
+        """
+        key = cache_key(question)
+        ttl = self.ttl_for(question, list(tools))
+        if not key or not answer or ttl <= 0:
+            with self._lock:
+                self._stats["not_cacheable"] += 1
+            return
+        entry = {
+            "answer": answer,
+            "expires_at": self._clock() + ttl,
+            "latency": latency,
+            "entities": entities(question),
+            "vector": self._vector(question),
+        }
+        with self._lock:
+            self._entries[(scope, key)] = entry
+            self._entries.move_to_end((scope, key))
+            self._stats["stored"] += 1
+            self._evict()
+
+    def _evict(self):
+        now = self._clock()
+        for cache_id in [k for k, e in self._entries.items() if e["expires_at"] <= now]:
+            del self._entries[cache_id]
+            self._stats["expired"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self, scope: str = None):
+        """Drop all entries, or only those of one scope."""
+        with self._lock:
+            if scope is None:
+                self._entries.clear()
+            else:
+                for cache_id in [k for k in self._entries if k[0] == scope]:
+                    del self._entries[cache_id]
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters and latency saved.
+
+        Returns:
+            dict: Counters plus "entries" and "hit_rate"
+        """
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["semantic_hits"]
+            lookups = self._stats["lookups"]
+            return dict(self._stats, entries=len(self._entries), saved_seconds=round(self._stats["saved_seconds"], 2),
+                        hit_rate=hits / lookups if lookups else 0.0)
+
+
+# ============================================
+# 🗃 Shared cache
+# ============================================
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _load_embed():
+    try:
+        return get_resource("embedder")
+    except Exception as e:
+        print(f"⚠️ Warning: Response cache falls back to exact matches ({e})")
+        return None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the shared response cache (the embedder is loaded on first use)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(embed=_load_embed() if RESPONSE_CACHE_THRESHOLD > 0 else None)
+        return _cache
+
+
+def cache_scope(session_id: str) -> str:
+    """Cache scope for a session under RESPONSE_CACHE_SCOPE."""
+    return "*" if RESPONSE_CACHE_SCOPE == "global" else session_id
@@ -0,0 +1,217 @@
+"""
+Bounded, persistent store of conversation sessions.
+Keeps recently used sessions in memory (LRU, bounded by session count and by
+estimated size) and spills the rest to compressed files under runtime/sessions/,
+one file per session named by a hash of its id, so any session loads back in
+O(1) when it is used again.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+# Rough per-message overhead (role, ids, metadata) on top of its content
+MESSAGE_OVERHEAD_BYTES = 256
+
+
+def estimate_bytes(messages) -> int:
+    """Estimate the in-memory size of a message list."""
+    total = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        total += len(content) + MESSAGE_OVERHEAD_BYTES
+    return total
+
+
+class SessionStore:
+    """
+    Dict-like store of session id -> message list with LRU spill to disk.
+
+    Args:
+        session_dir: Directory for spilled sessions (None = memory only, evicted sessions are lost)
+        max_sessions: Maximum number of sessions kept in memory
+        max_bytes: Maximum estimated size of the sessions kept in memory
+    """
+
+    def __init__(self, session_dir=None, max_sessions=256, max_bytes=64 * 1024 * 1024):
+        self.session_dir = Path(session_dir) if session_dir is not None else None
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        # session id -> [messages, estimated bytes, dirty, last used]
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self.hits_memory = 0
+        self.loads_disk = 0
+        self.spills = 0
+
+        if self.session_dir is not None:
+            self.session_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id):
+        digest = hashlib.sha1(str(session_id).encode("utf-8")).hexdigest()
+        return self.session_dir / f"{digest}.json.gz"
+
+    # --- dict-like API ---
+
+    def __getitem__(self, session_id):
+        with self._lock:
+            entry = self._memory.get(session_id)
+            if entry is not None:
+                self._memory.move_to_end(session_id)
+                entry[3] = time.monotonic()
+                self.hits_memory += 1
+                return entry[0]
+
+            messages = self._load(session_id)
+            if messages is None:
+                raise KeyError(session_id)
+            self.loads_disk += 1
+            self._insert(session_id, messages, dirty=False)
+            return messages
+
+    def __setitem__(self, session_id, messages):
+        with self._lock:
+            self._insert(session_id, messages, dirty=True)
+
+    def __delitem__(self, session_id):
+        with self._lock:
+            entry = self._memory.pop(session_id, None)
+            if entry is not None:
+                self._memory_bytes -= entry[1]
+            removed = False
+            if self.session_dir is not None:
+                try:
+                    self._path(session_id).unlink()
+                    removed = True
+                except OSError:
+                    pass
+            if entry is None and not removed:
+                raise KeyError(session_id)
+
+    def __contains__(self, session_id):
+        with self._lock:
+            if session_id in self._memory:
+                return True
+        return self.session_dir is not None and self._path(session_id).exists()
+
+    def __len__(self):
+        """Number of sessions currently held in memory."""
+        with self._lock:
+            return len(self._memory)
+
+    def get(self, session_id, default=None):
+        """Return a session's messages (loading it from disk if needed), or `default`."""
+        try:
+            return self[session_id]
+        except KeyError:
+            return default
+
+    def peek(self, session_id):
+        """Return an in-memory session without loading it or marking it as used (None if not resident)."""
+        with self._lock:
+            entry = self._memory.get(session_id)
+            return entry[0] if entry is not None else None
+
+    def keys(self):
+        """Ids of the sessions currently held in memory (spilled sessions are not listed)."""
+        with self._lock:
+            return list(self._memory.keys())
+
+    # --- memory tier ---
+
+    def _insert(self, session_id, messages, dirty):
+        """Insert or replace a session and evict least recently used ones (lock held)."""
+        size = estimate_bytes(messages)
+        old = self._memory.pop(session_id, None)
+        if old is not None:
+            self._memory_bytes -= old[1]
+        self._memory[session_id] = [messages, size, dirty, time.monotonic()]
+        self._memory_bytes += size
+
+        while len(self._memory) > 1 and (len(self._memory) > self.max_sessions
+                                         or self._memory_bytes > self.max_bytes):
+            evicted_id, _ = next(iter(self._memory.items()))
+            self._spill(evicted_id)
+
+    def _spill(self, session_id):
+        """Write a session to disk if it changed and drop it from memory (lock held)."""
+        entry = self._memory.pop(session_id)
+        self._memory_bytes -= entry[1]
+        if entry[2]:
+            self._save(session_id, entry[0])
+        self.spills += 1
+
+    # --- disk tier ---
+
+    def _save(self, session_id, messages):
+        if self.session_dir is None:
+            return
+        payload = json.dumps({"id": session_id, "messages": messages_to_dict(messages)},
+                             separators=(",", ":")).encode("utf-8")
+        path = self._path(session_id)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(gzip.compress(payload, compresslevel=6))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Warning: Could not save session {session_id}: {e}")
+
+    def _load(self, session_id):
+        if self.session_dir is None:
+            return None
+        path = self._path(session_id)
+        try:
+            data = json.loads(gzip.decompress(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError) as e:
+            print(f"⚠️ Warning: Could not load session {session_id}: {e}")
+            return None
+        return messages_from_dict(data["messages"])
+
+    # --- maintenance ---
+
+    def flush(self):
+        """Write every changed in-memory session to disk (keeps them in memory)."""
+        with self._lock:
+            for session_id, entry in self._memory.items():
+                if entry[2]:
+                    self._save(session_id, entry[0])
+                    entry[2] = False
+
+    def spill_idle(self, max_idle_seconds: float) -> int:
+        """
+        Move sessions unused for longer than `max_idle_seconds` out of memory.
+
+        Returns:
+            int: Number of sessions spilled
+        """
+        cutoff = time.monotonic() - max_idle_seconds
+        with self._lock:
+            idle = [session_id for session_id, entry in self._memory.items() if entry[3] < cutoff]
+            for session_id in idle:
+                self._spill(session_id)
+        return len(idle)
+
+    def stats(self) -> dict:
+        """
+        Residency and disk counters.
+
+        Returns:
+            dict: Store statistics
+        """
+        with self._lock:
+            return {
+                "memory_sessions": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "hits_memory": self.hits_memory,
+                "loads_disk": self.loads_disk,
+                "spills": self.spills,
+            }
@@ -1,55 +1,267 @@
 """
-Speech-to-text module using OpenAI Whisper.
-Caches the model to avoid reloading on each transcription.
+Speech-to-text module using Whisper.
+The engine (openai-whisper, int8-quantized Whisper or faster-whisper) is chosen
+with STT_BACKEND - see modules/stt_backends.py. It is loaded once and cached.
+Also provides a streaming transcriber that decodes while recording is in progress.
 """
-import torch
-import whisper
+import threading
+from math import gcd
+import numpy as np
+from utils.metrics import traced
+from utils.model_registry import register, get_resource
 from utils.runtime_paths import get_transcript_path
 
-# Global model cache
-_whisper_model = None
-_device = None
+# Whisper models expect 16 kHz mono float32 audio
+WHISPER_SAMPLE_RATE = 16000
 
-def get_whisper_model():
-    """Get or load Whisper model (cached for performance)."""
-    global _whisper_model, _device
+def _load_stt_backend():
+    """Load the configured STT engine (torch/whisper are imported there to keep startup fast)."""
+    from modules.stt_backends import load_stt_backend, STT_BACKEND, STT_MODEL
+
+    print(f"🧠 Loading speech-to-text ({STT_BACKEND}, {STT_MODEL})...")
+    backend = load_stt_backend()
+    print(f"✅ Speech-to-text loaded and cached ({backend.name} on {backend.device})")
+    return backend
+
+register("stt", _load_stt_backend)
+
+def get_stt_backend():
+    """Get or load the speech-to-text engine (cached for performance)."""
+    return get_resource("stt")
+
+def to_whisper_audio(audio, sample_rate):
+    """
+    Convert recorded samples to the 16 kHz mono float32 format Whisper expects.
     
-    if _whisper_model is None:
-        _device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"🧠 Loading Whisper model on {_device} (float32-safe)...")
+    Args:
+        audio: NumPy array of int16 or float samples (any shape with one channel)
+        sample_rate: Sample rate of the input audio
         
-        # Force Whisper to use float32 precision to prevent NaN errors
-        _whisper_model = whisper.load_model("base", device=_device)
-        _whisper_model = _whisper_model.to(dtype=torch.float32)
-        print("✅ Whisper model loaded and cached")
-    
-    return _whisper_model
+    Returns:
+        np.ndarray: 1-D float32 array at 16 kHz, in the range [-1, 1]
+    """
+    audio = np.asarray(audio).reshape(-1)
+    if audio.dtype == np.int16:
+        audio = np.multiply(audio, 1.0 / 32768.0, dtype=np.float32)
+    else:
+        # No copy when the input is already float32 (e.g. record_audio(in_memory=True))
+        audio = audio.astype(np.float32, copy=False)
+
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        from scipy.signal import resample_poly
+        factor = gcd(sample_rate, WHISPER_SAMPLE_RATE)
+        audio = resample_poly(audio, WHISPER_SAMPLE_RATE // factor, sample_rate // factor).astype(np.float32)
+    return audio
+
+def save_transcript(text):
+    """Save the latest transcription to runtime/transcripts/output.txt."""
+    try:
+        transcript_path = get_transcript_path("output.txt")
+        with open(transcript_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"✅ Transcription saved to {transcript_path}")
+    except Exception as e:
+        print(f"⚠️ Warning: Could not save transcription: {e}")
 
-def transcribe_audio(audio_file):
+@traced("transcribe_audio")
+def transcribe_audio(audio_file, sample_rate=WHISPER_SAMPLE_RATE, save=True):
     """
-    Transcribe audio file to text using Whisper.
+    Transcribe audio to text with the configured STT engine.
     
     Args:
-        audio_file: Path to audio file to transcribe
+        audio_file: Path to audio file, or a NumPy buffer of samples. A 16 kHz
+            float32 buffer is passed to Whisper as-is (no file, no ffmpeg).
+        sample_rate: Sample rate of a NumPy buffer (ignored for file paths)
+        save: Write the transcript file (pass False to do it off the critical path)
         
     Returns:
         str: Transcribed text
     """
-    model = get_whisper_model()
+    backend = get_stt_backend()
+    
+    if isinstance(audio_file, np.ndarray):
+        audio_file = to_whisper_audio(audio_file, sample_rate)
     
     print("🎧 Transcribing...")
-    result = model.transcribe(audio_file, fp16=False)
+    result = backend.transcribe(audio_file)
     
     text = result["text"].strip()
     print(f"\n📝 Transcription: {text}")
     
     # Save transcription to organized location
-    try:
-        transcript_path = get_transcript_path("output.txt")
-        with open(transcript_path, "w", encoding="utf-8") as f:
-            f.write(text)
-        print(f"✅ Transcription saved to {transcript_path}")
-    except Exception as e:
-        print(f"⚠️ Warning: Could not save transcription: {e}")
+    if save:
+        save_transcript(text)
     
-    return text
\ No newline at end of file
+    return text
+
+class StreamingTranscriber:
+    """
+    Incremental Whisper transcription while the user is still speaking.
+    
+    Audio is fed frame by frame from the recorder. A background worker decodes
+    the not-yet-committed part of the recording every `step` seconds; all but
+    the last Whisper segment of each window are committed, so the committed
+    prefix never needs decoding again. After endpointing, `finalize()` only
+    decodes the short uncommitted tail. `request_decode()` decodes new audio
+    right away (e.g. at a pause, for the semantic endpointer), and `text` with
+    `transcribed_samples` tell how much of the fed audio it covers.
+    
+    Args:
+        step: Seconds of new audio between background decodes
+        max_window: Longest uncommitted window (seconds) decoded at once
+    """
+
+    def __init__(self, step: float = 1.0, max_window: float = 20.0):
+        self.step = step
+        self.max_window = max_window
+        self.sample_rate = None
+
+        self._frames = []
+        self._audio = np.zeros(0, dtype=np.int16)
+        self._committed_text = []
+        self._committed_samples = 0
+        self._decoded_samples = 0
+        self._fed_samples = 0
+        self._transcribed_samples = 0
+        self._decode_now = False
+        self.partial_text = ""
+
+        self._lock = threading.Lock()
+        self._new_audio = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="stt-stream", daemon=True)
+        self._worker.start()
+
+    @property
+    def committed_text(self) -> str:
+        """Text that is final and will not change."""
+        return " ".join(self._committed_text)
+
+    @property
+    def text(self) -> str:
+        """Committed text followed by the open partial segment."""
+        with self._lock:
+            return " ".join(self._committed_text + ([self.partial_text] if self.partial_text else []))
+
+    @property
+    def fed_samples(self) -> int:
+        """Samples fed so far."""
+        return self._fed_samples
+
+    @property
+    def transcribed_samples(self) -> int:
+        """Samples covered by `text` (its last decode ended here)."""
+        return self._transcribed_samples
+
+    def request_decode(self):
+        """Decode the audio fed so far without waiting for `step` seconds of it."""
+        self._decode_now = True
+        self._new_audio.set()
+
+    def feed(self, chunk, sample_rate: int = WHISPER_SAMPLE_RATE):
+        """
+        Add a chunk of recorded audio (called from the recording loop).
+        
+        Args:
+            chunk: NumPy array of int16 samples
+            sample_rate: Sample rate of the chunk
+        """
+        with self._lock:
+            self.sample_rate = sample_rate
+            self._frames.append(np.asarray(chunk, dtype=np.int16).reshape(-1))
+            self._fed_samples += self._frames[-1].size
+        self._new_audio.set()
+
+    def _snapshot(self):
+        """Join pending frames into the audio buffer and return it."""
+        with self._lock:
+            if self._frames:
+                self._audio = np.concatenate([self._audio] + self._frames)
+                self._frames = []
+            return self._audio, self.sample_rate
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._new_audio.wait(timeout=self.step)
+            self._new_audio.clear()
+            if self._stopped.is_set():
+                break
+
+            audio, sample_rate = self._snapshot()
+            decode_now, self._decode_now = self._decode_now, False
+            new_samples = 0 if sample_rate is None else len(audio) - self._decoded_samples
+            if new_samples <= 0 or (not decode_now and new_samples < self.step * sample_rate):
+                continue
+            try:
+                self._decode(audio, sample_rate, final=False)
+            except Exception as e:
+                print(f"⚠️ Warning: Streaming transcription error: {e}")
+
+    def _decode(self, audio, sample_rate, final):
+        """Decode the uncommitted window and advance the committed prefix."""
+        start = self._committed_samples
+        end = len(audio)
+        if not final:
+            end = min(end, start + int(self.max_window * sample_rate))
+        self._decoded_samples = end
+        window = audio[start:end]
+        if len(window) == 0:
+            return
+
+        result = get_stt_backend().transcribe(
+            to_whisper_audio(window, sample_rate),
+            condition_on_previous_text=False,
+            initial_prompt=self.committed_text[-200:] or None,
+        )
+        segments = [seg for seg in result.get("segments", []) if seg["text"].strip()]
+
+        with self._lock:  # `text` is read from the recording thread
+            if final:
+                self._committed_text.extend(seg["text"].strip() for seg in segments)
+                self._committed_samples = end
+                self.partial_text = ""
+                self._transcribed_samples = end
+                return
+
+            if len(segments) <= 1 and end - start >= int(self.max_window * sample_rate):
+                # A full window with one run-on segment (or no speech at all): commit it
+                # whole, or the same window would be decoded again on every step
+                self._committed_text.extend(seg["text"].strip() for seg in segments)
+                self._committed_samples = end
+                self.partial_text = ""
+            else:
+                # The last segment may still change as more audio arrives - keep it open
+                if len(segments) > 1:
+                    self._committed_text.extend(seg["text"].strip() for seg in segments[:-1])
+                    self._committed_samples = start + int(segments[-2]["end"] * sample_rate)
+                self.partial_text = segments[-1]["text"].strip() if segments else ""
+            self._transcribed_samples = end
+
+    def cancel(self):
+        """Stop background decoding without producing a transcript."""
+        self._stopped.set()
+        self._new_audio.set()
+        self._worker.join()
+
+    @traced("transcribe_finalize")
+    def finalize(self, save: bool = True) -> str:
+        """
+        Stop background decoding and transcribe the remaining tail.
+        
+        Args:
+            save: Write the transcript file (pass False to do it off the critical path)
+        
+        Returns:
+            str: Full transcription of everything that was fed
+        """
+        self.cancel()
+
+        audio, sample_rate = self._snapshot()
+        if sample_rate is not None:
+            self._decode(audio, sample_rate, final=True)
+
+        text = self.committed_text.strip()
+        print(f"\n📝 Transcription: {text}")
+        if save:
+            save_transcript(text)
+        return text
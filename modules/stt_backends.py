@@ -0,0 +1,143 @@
+"""
+Speech-to-text engines behind one interface.
+STT_BACKEND selects the engine:
+- "whisper": openai-whisper in PyTorch (float32, GPU when available)
+- "quantized": openai-whisper with int8 dynamic quantization of the Linear layers (CPU)
+- "faster-whisper": CTranslate2 engine (pip install faster-whisper), int8 on CPU by default
+
+Every engine returns Whisper-style results ({"text", "segments"}), so
+transcribe_audio() and the StreamingTranscriber work with any of them.
+"""
+import os
+
+# Engine: "whisper", "quantized" or "faster-whisper"
+STT_BACKEND = os.getenv("STT_BACKEND", "whisper").lower()
+# Model size: tiny, base, small, medium, large-v3 (or a local model path for faster-whisper)
+STT_MODEL = os.getenv("STT_MODEL", "base")
+# CTranslate2 compute type for faster-whisper: int8, int8_float16, float16, float32, default
+STT_COMPUTE_TYPE = os.getenv("STT_COMPUTE_TYPE", "int8")
+# CPU threads for decoding (0 = library default)
+STT_THREADS = int(os.getenv("STT_THREADS", "0") or 0)
+# 1 = greedy decoding (Whisper's default); larger values use beam search
+STT_BEAM_SIZE = int(os.getenv("STT_BEAM_SIZE", "1") or 1)
+
+BACKENDS = ("whisper", "quantized", "faster-whisper")
+
+
+class WhisperBackend:
+    """
+    openai-whisper engine, optionally int8-quantized.
+
+    Args:
+        model_size: Whisper model name
+        quantize: Apply int8 dynamic quantization (runs on CPU)
+        threads: torch intra-op threads (0 = torch default)
+    """
+
+    def __init__(self, model_size: str = STT_MODEL, quantize: bool = False, threads: int = STT_THREADS):
+        import torch
+        import whisper
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.device = "cuda" if torch.cuda.is_available() and not quantize else "cpu"
+        self.name = "quantized" if quantize else "whisper"
+        self.model_size = model_size
+
+        # Force Whisper to use float32 precision to prevent NaN errors
+        model = whisper.load_model(model_size, device=self.device).to(dtype=torch.float32)
+        if quantize:
+            # whisper's Linear subclass only adds a dtype cast to forward(); make the layers
+            # plain nn.Linear so quantize_dynamic swaps them for int8 versions
+            for module in model.modules():
+                if isinstance(module, whisper.model.Linear):
+                    module.__class__ = torch.nn.Linear
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def transcribe(self, audio, initial_prompt: str = None, condition_on_previous_text: bool = True) -> dict:
+        """
+        Transcribe a clip.
+
+        Args:
+            audio: Path to an audio file, or 16 kHz mono float32 samples
+            initial_prompt: Text that precedes the clip (improves continuity)
+            condition_on_previous_text: Feed earlier segments of the clip as context
+
+        Returns:
+            dict: {"text": str, "segments": [{"text", "start", "end"}, ...]}
+        """
+        options = {"beam_size": STT_BEAM_SIZE} if STT_BEAM_SIZE > 1 else {}
+        result = self.model.transcribe(audio, fp16=False, initial_prompt=initial_prompt,
+                                       condition_on_previous_text=condition_on_previous_text, **options)
+        return {"text": result["text"],
+                "segments": [{"text": s["text"], "start": s["start"], "end": s["end"]}
+                             for s in result.get("segments", [])]}
+
+
+class FasterWhisperBackend:
+    """
+    faster-whisper (CTranslate2) engine.
+
+    Args:
+        model_size: Whisper model name or path to a converted model
+        compute_type: CTranslate2 compute type (int8 = quantized weights)
+        threads: CPU threads (0 = CTranslate2 default)
+    """
+
+    def __init__(self, model_size: str = STT_MODEL, compute_type: str = STT_COMPUTE_TYPE,
+                 threads: int = STT_THREADS):
+        from faster_whisper import WhisperModel
+
+        from utils.runtime_paths import get_models_dir
+
+        self.name = "faster-whisper"
+        self.model_size = model_size
+        self.device = "cpu"
+        try:
+            import torch
+            if torch.cuda.is_available():
+                self.device = "cuda"
+        except ImportError:
+            pass
+        if self.device == "cuda" and compute_type == "int8":
+            compute_type = "int8_float16"
+        self.compute_type = compute_type
+        # Converted models are downloaded once into runtime/models/
+        self.model = WhisperModel(model_size, device=self.device, compute_type=compute_type, cpu_threads=threads,
+                                  download_root=str(get_models_dir() / "faster-whisper"))
+
+    def transcribe(self, audio, initial_prompt: str = None, condition_on_previous_text: bool = True) -> dict:
+        """Transcribe a clip (same arguments and result as WhisperBackend.transcribe)."""
+        segments, _ = self.model.transcribe(audio, beam_size=STT_BEAM_SIZE, initial_prompt=initial_prompt,
+                                            condition_on_previous_text=condition_on_previous_text)
+        segments = [{"text": s.text, "start": s.start, "end": s.end} for s in segments]  # Decodes lazily
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+def load_stt_backend(backend: str = None, model_size: str = None):
+    """
+    Build a speech-to-text engine.
+
+    Args:
+        backend: One of BACKENDS (default: STT_BACKEND)
+        model_size: Model name (default: STT_MODEL)
+
+    Returns:
+        WhisperBackend | FasterWhisperBackend: Engine with a transcribe() method
+    """
+    backend = backend or STT_BACKEND
+    model_size = model_size or STT_MODEL
+    if backend not in BACKENDS:
+        print(f"⚠️ Warning: Unknown STT_BACKEND '{backend}', using whisper. Options: {', '.join(BACKENDS)}")
+        backend = "whisper"
+
+    if backend == "faster-whisper":
+        try:
+            return FasterWhisperBackend(model_size)
+        except ImportError:
+            print("⚠️ Warning: faster-whisper not available, using openai-whisper. "
+                  "Install with: pip install faster-whisper")
+            backend = "whisper"
+    return WhisperBackend(model_size, quantize=backend == "quantized")
+
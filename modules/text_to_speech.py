@@ -1,13 +1,23 @@
 """
 Text-to-speech module using Edge TTS.
 Supports bilingual (Hindi/English) speech with emotion-based voice modulation.
+Synthesized audio is cached (memory + disk) so repeated phrases play instantly,
+and played from memory by a persistent output engine (modules/audio_output.py).
 """
 import asyncio
-import tempfile
-import pygame
+import hashlib
+import json
 import os
 import re
+import threading
 import edge_tts
+from modules.audio_output import AudioOutput
+from modules.tts_cache import TTSCache
+from utils.metrics import span
+from utils.runtime_paths import get_tts_cache_dir
+
+# Sentence boundary: ./?/! followed by whitespace, or a Hindi danda (।)
+SENTENCE_END = re.compile(r"(?<=[.?!])\s+|(?<=\u0964)\s*")
 
 def remove_emojis(text):
     """Remove emojis from text before speaking."""
@@ -21,80 +31,199 @@ def remove_emojis(text):
     )
     return emoji_pattern.sub('', text)
 
-async def _speak_async(text, lang="en", emotion="neutral"):
+# Language-based neural voices
+VOICES = {
+    "en": {
+        "neutral": "en-US-JennyNeural",
+        "happy": "en-US-AnaNeural",
+        "sad": "en-US-GuyNeural",
+        "angry": "en-US-ChristopherNeural",
+    },
+    "hi": {
+        "neutral": "hi-IN-SwaraNeural",       # Indian female voice
+        "happy": "hi-IN-MadhurNeural",        # Cheerful male voice
+        "sad": "hi-IN-SwaraNeural",           # Soft tone female
+        "angry": "hi-IN-MadhurNeural",        # Firm tone
+    }
+}
+
+# Adjust speed & pitch slightly based on emotion
+RATE_MAP = {
+    "happy": "+15%",   # faster and energetic
+    "sad": "-10%",     # slower and calm
+    "angry": "+5%",    # firm and slightly faster
+    "neutral": "+0%"   # normal rate
+}
+
+_tts_cache = None
+
+def get_tts_cache():
+    """Get the shared synthesis cache (created on first use)."""
+    global _tts_cache
+    if _tts_cache is None:
+        # Changing VOICES or RATE_MAP changes the fingerprint and invalidates old audio
+        fingerprint = hashlib.sha1(json.dumps([VOICES, RATE_MAP], sort_keys=True).encode("utf-8")).hexdigest()
+        _tts_cache = TTSCache(
+            get_tts_cache_dir(),
+            memory_max_bytes=int(float(os.getenv("TTS_CACHE_MEMORY_MB", "16")) * 1024 * 1024),
+            disk_max_bytes=int(float(os.getenv("TTS_CACHE_DISK_MB", "100")) * 1024 * 1024),
+            fingerprint=fingerprint,
+        )
+    return _tts_cache
+
+def invalidate_tts_cache():
+    """Drop all cached speech audio (e.g. after editing the voice maps)."""
+    get_tts_cache().invalidate()
+
+def detect_language(text):
+    """Detect Hindi (Devanagari) vs English text."""
+    return "hi" if any("\u0900" <= ch <= "\u097F" for ch in text) else "en"
+
+def select_voice(lang="en", emotion="neutral"):
+    """
+    Choose the voice and speaking rate for a language and emotion.
+    
+    Returns:
+        tuple: (voice name, rate string)
+    """
+    lang_voices = VOICES.get(lang, VOICES["en"])
+    voice = lang_voices.get(emotion, lang_voices["neutral"])
+    rate = RATE_MAP.get(emotion, "0%")
+    return voice, rate
+
+async def _synthesize_async(text, voice, rate):
+    """Synthesize speech with Edge TTS into an in-memory MP3."""
+    tts = edge_tts.Communicate(text=text, voice=voice, rate=rate)
+    audio = bytearray()
+    async for chunk in tts.stream():
+        if chunk["type"] == "audio":
+            audio.extend(chunk["data"])
+    return bytes(audio)
+
+async def synthesize(text, lang="en", emotion="neutral"):
     """
-    Async function to convert text to speech.
+    Get MP3 audio for text, from the cache when possible.
     
     Args:
-        text: Text to speak
+        text: Text to synthesize (emojis are removed)
         lang: Language code ("en" or "hi")
         emotion: Emotional tone ("neutral", "happy", "sad", "angry")
+        
+    Returns:
+        bytes: MP3 audio
     """
     text = remove_emojis(text)
+    voice, rate = select_voice(lang, emotion)
 
-    # Language-based neural voices
-    voices = {
-        "en": {
-            "neutral": "en-US-JennyNeural",
-            "happy": "en-US-AnaNeural",
-            "sad": "en-US-GuyNeural",
-            "angry": "en-US-ChristopherNeural",
-        },
-        "hi": {
-            "neutral": "hi-IN-SwaraNeural",       # Indian female voice
-            "happy": "hi-IN-MadhurNeural",        # Cheerful male voice
-            "sad": "hi-IN-SwaraNeural",           # Soft tone female
-            "angry": "hi-IN-MadhurNeural",        # Firm tone
-        }
-    }
+    cache = get_tts_cache()
+    audio = cache.get(text, voice, rate)
+    if audio is None:
+        with span("tts_synthesis", chars=len(text)):
+            audio = await _synthesize_async(text, voice, rate)
+        if audio:
+            cache.put(text, voice, rate, audio)
+    return audio
 
-    # Choose the right voice
-    lang_voices = voices.get(lang, voices["en"])
-    voice = lang_voices.get(emotion, lang_voices["neutral"])
+def prerender(phrases, emotion="neutral"):
+    """
+    Synthesize fixed phrases ahead of time so they play without synthesis delay.
+    
+    Args:
+        phrases: Iterable of phrases to cache
+        emotion: Emotional tone the phrases are spoken with
+    """
+    async def _render_all():
+        for phrase in phrases:
+            await synthesize(phrase, detect_language(phrase), emotion)
+    asyncio.run(_render_all())
+    return len(phrases)
 
-    # Adjust speed & pitch slightly based on emotion
-    rate_map = {
-        "happy": "+15%",   # faster and energetic
-        "sad": "-10%",     # slower and calm
-        "angry": "+5%",    # firm and slightly faster
-        "neutral": "+0%"   # normal rate
-    }
-    rate = rate_map.get(emotion, "0%")
+_audio_output = None
+_audio_output_lock = threading.Lock()
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-        file_path = fp.name
+def get_audio_output():
+    """Get the shared playback engine (opens the output device on first use)."""
+    global _audio_output
+    with _audio_output_lock:
+        if _audio_output is None:
+            _audio_output = AudioOutput(synthesize, detect_language)
+    return _audio_output
 
-    try:
-        # Generate & save speech
-        tts = edge_tts.Communicate(text=text, voice=voice, rate=rate)
-        await tts.save(file_path)
-
-        # Play audio
-        pygame.mixer.init()
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        pygame.mixer.quit()
-    finally:
-        # Clean up temp file
-        try:
-            os.remove(file_path)
-        except Exception:
-            pass
+def close_audio_output():
+    """Stop playback and release the output device."""
+    global _audio_output
+    with _audio_output_lock:
+        if _audio_output is not None:
+            _audio_output.close()
+            _audio_output = None
 
 def speak(text, emotion="neutral"):
     """
     Convert text to speech with automatic language detection.
+    Blocks until the text has been spoken.
     
     Args:
         text: Text to speak (automatically detects Hindi/English)
         emotion: Emotional tone for voice modulation
     """
-    # Automatically detect Hindi/English and use correct accent
-    lang = "hi" if any("\u0900" <= ch <= "\u097F" for ch in text) else "en"
-    
     try:
-        asyncio.run(_speak_async(text, lang, emotion))
+        output = get_audio_output()
+        output.enqueue(text, emotion=emotion)
+        output.flush()
     except Exception as e:
         print(f"⚠️ Error in text-to-speech: {e}")
+
+def split_sentences(text):
+    """
+    Split buffered text into complete sentences and an unfinished remainder.
+    
+    Args:
+        text: Text accumulated so far (may end mid-sentence)
+        
+    Returns:
+        tuple: (list of complete sentences, remaining text)
+    """
+    parts = SENTENCE_END.split(text)
+    remainder = parts.pop()
+    sentences = [part.strip() for part in parts if part.strip()]
+    return sentences, remainder
+
+def speak_stream(chunks, emotion="neutral", wait=True, cancel=None):
+    """
+    Speak streamed text sentence by sentence while it is still being generated.
+    Each completed sentence is queued on the playback engine as soon as it arrives.
+    
+    Args:
+        chunks: Iterable of text fragments (e.g. LLM tokens)
+        emotion: Emotional tone for voice modulation
+        wait: Block until playback finishes (False returns once all text is queued)
+        cancel: Optional threading.Event; when set (e.g. on barge-in) the stream
+            is abandoned and nothing more is queued
+        
+    Returns:
+        str: The full text that was received (on cancel, up to the chunk the
+            stream was closed at - what the producer has yielded)
+    """
+    output = get_audio_output()
+    received = []
+    buffer = ""
+    for chunk in chunks:
+        received.append(chunk)
+        if cancel is not None and cancel.is_set():
+            if hasattr(chunks, "close"):
+                chunks.close()
+            return "".join(received)
+        buffer += chunk
+        complete, buffer = split_sentences(buffer)
+        for sentence in complete:
+            if cancel is not None and cancel.is_set():
+                break
+            output.enqueue(sentence, emotion=emotion)
+
+    # Speak whatever is left once the stream ends
+    if buffer.strip() and not (cancel is not None and cancel.is_set()):
+        output.enqueue(buffer.strip(), emotion=emotion)
+    if wait:
+        output.flush()
+
+    return "".join(received)
@@ -0,0 +1,117 @@
+"""
+Tool executor - bounds and times out the agent's tool calls.
+The agent graph (langchain `create_agent`) already runs the tool calls of one
+step in parallel, each as a separate task. `as_middleware()` routes those
+tasks through a bounded thread pool, each with its own deadline. A call that
+misses its deadline is cancelled if it has not started yet, and if it is
+already running its late result is discarded. Either way it becomes an error
+ToolMessage, so the model can answer without it instead of waiting for a
+straggler.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextvars import copy_context
+from langchain_core.messages import ToolMessage
+from utils.metrics import observe
+
+# Tool calls running at the same time (across all sessions)
+TOOL_MAX_PARALLEL = int(os.getenv("TOOL_MAX_PARALLEL", "4"))
+# Outer deadline for one tool call; tools that hit the network have their own,
+# shorter deadlines in modules/tools.py, so this only catches runaway tools
+TOOL_CALL_TIMEOUT = float(os.getenv("TOOL_CALL_TIMEOUT", "10"))
+
+
+class ToolExecutor:
+    """
+    Bounded, deadline-aware executor for tool calls.
+
+    Args:
+        max_workers: Maximum number of tool calls running at once
+        timeout: Default deadline per call in seconds
+        deadlines: Optional {tool name: deadline in seconds} overrides
+    """
+
+    def __init__(self, max_workers: int = TOOL_MAX_PARALLEL, timeout: float = TOOL_CALL_TIMEOUT, deadlines: dict = None):
+        self.timeout = timeout
+        self.deadlines = dict(deadlines or {})
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-exec")
+        self._stats = {"calls": 0, "timeouts": 0, "cancelled": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, event: str):
+        with self._lock:
+            self._stats[event] += 1
+
+    def deadline_for(self, name: str) -> float:
+        """Deadline in seconds for a tool."""
+        return self.deadlines.get(name, self.timeout)
+
+    def _submit(self, func, *args):
+        self._count("calls")
+        # Run in a copy of the caller's context (LangGraph keeps the run config there)
+        return self._pool.submit(copy_context().run, func, *args)
+
+    def _wait(self, future, tool_call: dict, started: float, deadline_at: float):
+        """Wait for a call until `deadline_at`; returns an error ToolMessage if it misses it."""
+        try:
+            result = future.result(timeout=max(0.0, deadline_at - time.monotonic()))
+            if isinstance(result, ToolMessage) and result.status == "error":
+                self._count("errors")  # The tool raised (the tool node turns that into a message)
+            return result
+        except FutureTimeoutError:
+            if future.cancel():
+                self._count("cancelled")  # Still queued - never ran
+            else:
+                self._count("timeouts")  # Running - its result will be ignored
+            name = tool_call.get("name", "tool")
+            return ToolMessage(
+                content=f"⚠️ {name} did not finish in time. Answer without it.",
+                tool_call_id=tool_call.get("id", ""),
+                name=name,
+                status="error",
+            )
+        finally:
+            # Latency as seen by the agent (a missed deadline counts as the deadline)
+            observe(f"tool.{tool_call.get('name', 'tool')}", time.monotonic() - started)
+
+    def call(self, tool_call: dict, func, *args):
+        """
+        Run one tool call under its deadline.
+
+        Args:
+            tool_call: Tool call dict ({"name", "args", "id"}) from the model
+            func: Callable that executes the call and returns a ToolMessage
+            *args: Arguments for `func`
+
+        Returns:
+            The result of `func`, or an error ToolMessage if the deadline passed
+        """
+        started = time.monotonic()
+        deadline_at = started + self.deadline_for(tool_call.get("name", ""))
+        return self._wait(self._submit(func, *args), tool_call, started, deadline_at)
+
+    def as_middleware(self):
+        """
+        Agent middleware that runs every tool call through this executor.
+
+        Returns:
+            AgentMiddleware: Pass in `create_agent(..., middleware=[...])`
+        """
+        from langchain.agents.middleware import wrap_tool_call
+
+        @wrap_tool_call(name="ToolExecutorMiddleware")
+        def run_in_executor(request, handler):
+            return self.call(request.tool_call, handler, request)
+
+        return run_in_executor
+
+    def stats(self) -> dict:
+        """Call, timeout, cancellation and error counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def shutdown(self):
+        """Cancel queued calls and stop the pool (call on shutdown)."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,25 +1,124 @@
 from langchain.tools import tool
-import requests
 import datetime
+import os
+import re
+import threading
 from utils.config import CONFIG
+from utils.http_client import get_http_session, call_with_deadline, DeadlineExceeded
+from utils.model_registry import register, get_resource
+from utils.ttl_cache import TTLCache
 
-@tool("Get current weather info for a given city")
+# Base URL is configurable so benchmarks/tests can point at a local stub server
+WEATHER_BASE_URL = os.getenv("WEATHER_BASE_URL", "http://api.openweathermap.org/data/2.5")
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", "3"))
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))  # 10 minutes
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "6"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+
+# Results of network tools, keyed per tool and normalized argument
+tool_cache = TTLCache(max_entries=int(os.getenv("TOOL_CACHE_ENTRIES", "512")))
+
+_call_stats = {}
+_stats_lock = threading.Lock()
+
+def _count(tool_name: str, event: str):
+    with _stats_lock:
+        counters = _call_stats.setdefault(tool_name, {"calls": 0, "timeouts": 0, "errors": 0})
+        counters[event] += 1
+
+def tool_stats() -> dict:
+    """
+    Per-tool call, timeout, error and cache counters.
+
+    Returns:
+        dict: {tool name: counters}
+    """
+    cache = tool_cache.stats()
+    with _stats_lock:
+        names = set(cache) | set(_call_stats)
+        return {name: {**_call_stats.get(name, {}), **{f"cache_{k}": v for k, v in cache.get(name, {}).items()}}
+                for name in names}
+
+def normalize_query(text: str) -> str:
+    """Normalize a tool argument for cache keys (case, whitespace and trailing punctuation)."""
+    return re.sub(r"\s+", " ", text).strip().strip("?.!,").lower()
+
+# ============================================
+# 🌦 Weather
+# ============================================
+def _fetch_weather(city: str, api_key: str):
+    response = get_http_session().get(
+        f"{WEATHER_BASE_URL}/weather",
+        params={"q": city, "appid": api_key, "units": "metric"},
+        timeout=WEATHER_TIMEOUT,
+    )
+    return response.json()
+
+@tool("get_weather", description="Get current weather info for a given city")
 def get_weather(city: str) -> str:
     """Get current weather info for a given city."""
     api_key = CONFIG.get("openweather_api_key", "")
     if not api_key:
         return "❌ Weather API key missing."
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-    r = requests.get(url)
-    data = r.json()
-    if data.get("cod") != 200:
+
+    key = normalize_query(city)
+    cached = tool_cache.get("get_weather", key)
+    if cached is not None:
+        return cached
+
+    _count("get_weather", "calls")
+    try:
+        data = call_with_deadline(_fetch_weather, WEATHER_TIMEOUT, city, api_key)
+    except DeadlineExceeded:
+        _count("get_weather", "timeouts")
+        return f"⚠️ The weather service did not respond in time for {city}."
+    except Exception as e:
+        _count("get_weather", "errors")
+        return f"⚠️ Could not get the weather for {city}: {e}"
+
+    if str(data.get("cod")) != "200":
         return f"City not found: {city}"
     temp = data["main"]["temp"]
     desc = data["weather"][0]["description"]
-    return f"{city.title()} का तापमान {temp}°C है और मौसम {desc} है।"
+    result = f"{city.title()} का तापमान {temp}°C है और मौसम {desc} है।"
+    tool_cache.put("get_weather", key, result, WEATHER_CACHE_TTL)
+    return result
+
+# ============================================
+# 🔎 Web Search
+# ============================================
+def _load_search():
+    from langchain_community.tools import DuckDuckGoSearchRun
+    return DuckDuckGoSearchRun()
+
+register("search", _load_search)
+
+@tool
+def web_search(query: str) -> str:
+    """Search the web for current information. Input should be a search query."""
+    key = normalize_query(query)
+    cached = tool_cache.get("web_search", key)
+    if cached is not None:
+        return cached
+
+    _count("web_search", "calls")
+    try:
+        result = call_with_deadline(get_resource("search").invoke, SEARCH_TIMEOUT, query)
+    except DeadlineExceeded:
+        _count("web_search", "timeouts")
+        return "⚠️ Web search did not respond in time. Answer from what you already know."
+    except Exception as e:
+        _count("web_search", "errors")
+        return f"⚠️ Web search failed: {e}"
+
+    tool_cache.put("web_search", key, result, SEARCH_CACHE_TTL)
+    return result
 
+# ============================================
+# 🕒 Time
+# ============================================
 @tool
 def get_time() -> str:
     """Get the current system time."""
     now = datetime.datetime.now().strftime("%I:%M %p")
-    return f"The current time is {now}."
\ No newline at end of file
+    return f"The current time is {now}."
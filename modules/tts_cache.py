@@ -0,0 +1,197 @@
+"""
+Synthesis cache for text-to-speech audio.
+Two tiers: a bounded in-memory LRU and an on-disk store under runtime/tts_cache/,
+both keyed on (normalized text, voice, rate) and evicted by total size.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+# Typographic variants that edge-tts reads the same way
+_PUNCTUATION = str.maketrans({"’": "'", "‘": "'", "“": '"', "”": '"', "…": "...", "–": "-", "—": "-"})
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for cache lookups (whitespace and punctuation variants).
+    Case is kept: edge-tts reads "US" and "us" differently.
+    """
+    text = re.sub(r"\s+", " ", text.translate(_PUNCTUATION)).strip()
+    return re.sub(r" ([,.!?;:])", r"\1", text)
+
+
+class TTSCache:
+    """
+    Two-tier (memory + disk) LRU cache of synthesized audio bytes.
+    
+    Args:
+        cache_dir: Directory for the on-disk tier
+        memory_max_bytes: Size budget of the in-memory tier
+        disk_max_bytes: Size budget of the on-disk tier
+        fingerprint: Identifier of the voice configuration; if it differs from
+            the one stored on disk, the disk tier is invalidated
+    """
+
+    def __init__(self, cache_dir, memory_max_bytes=16 * 1024 * 1024, disk_max_bytes=100 * 1024 * 1024,
+                 fingerprint=None):
+        self.cache_dir = Path(cache_dir)
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._disk_bytes = sum(path.stat().st_size for path in self.cache_dir.glob("*.mp3"))
+        if fingerprint is not None:
+            self._check_fingerprint(fingerprint)
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate: str) -> str:
+        """Build the cache key for one synthesis request."""
+        raw = f"{voice}|{rate}|{normalize_text(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.mp3"
+
+    def get(self, text: str, voice: str, rate: str):
+        """
+        Look up synthesized audio.
+        
+        Returns:
+            bytes | None: Cached audio, or None on a miss
+        """
+        key = self.make_key(text, voice, rate)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)  # Mark as recently used for disk eviction
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits_disk += 1
+            self._put_memory(key, audio)
+        return audio
+
+    def put(self, text: str, voice: str, rate: str, audio: bytes):
+        """Store synthesized audio in both tiers."""
+        key = self.make_key(text, voice, rate)
+        with self._lock:
+            self._put_memory(key, audio)
+
+        path = self._path(key)
+        try:
+            existed = path.exists()
+            # A temp file per writer: two threads may synthesize the same phrase at once
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as tmp:
+                tmp.write(audio)
+            try:
+                os.replace(tmp.name, path)
+            except OSError:
+                os.unlink(tmp.name)
+                raise
+            with self._lock:
+                if not existed:
+                    self._disk_bytes += len(audio)
+                over_budget = self._disk_bytes > self.disk_max_bytes
+            if over_budget:
+                self._evict_disk()
+        except OSError as e:
+            print(f"⚠️ Warning: Could not write TTS cache entry: {e}")
+
+    def _put_memory(self, key, audio):
+        """Insert into the memory tier and evict least recently used entries (lock held)."""
+        if len(audio) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier fits its budget."""
+        entries = []
+        for path in self.cache_dir.glob("*.mp3"):
+            try:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+    def _check_fingerprint(self, fingerprint):
+        """Invalidate the disk tier if the voice configuration changed."""
+        marker = self.cache_dir / "fingerprint.json"
+        try:
+            stored = json.loads(marker.read_text(encoding="utf-8")).get("fingerprint")
+        except (OSError, ValueError):
+            stored = None
+        if stored != fingerprint:
+            self.invalidate()
+            marker.write_text(json.dumps({"fingerprint": fingerprint}), encoding="utf-8")
+
+    def invalidate(self):
+        """Drop every cached entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for path in self.cache_dir.glob("*.mp3"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters and tier sizes.
+        
+        Returns:
+            dict: Cache statistics
+        """
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+            }
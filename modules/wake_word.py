@@ -1,11 +1,18 @@
 """
 Wake Word Detection Module
 Detects "Hey Mira" or custom wake words before activating the assistant.
-Supports both Porcupine (offline) and fallback keyword detection.
+Supports Porcupine, the built-in keyword spotter (enrolled samples of your
+voice) and, as a last resort, keyword matching in transcribed text.
 """
 import os
 from pathlib import Path
 
+from utils.runtime_paths import get_wake_word_dir
+
+# Confirm keyword spotter detections by transcribing the last seconds with Whisper
+KWS_VERIFY = os.getenv("KWS_VERIFY", "false").lower() in ("true", "1", "yes")
+KWS_VERIFY_SECONDS = 2.5
+
 # Try to import Porcupine for real wake word detection
 PORCUPINE_AVAILABLE = False
 try:
@@ -42,6 +49,9 @@ class WakeWordDetector:
         self.access_key = access_key
         self.porcupine = None
         self.use_porcupine = False
+        self.spotter = None
+        self.verify = KWS_VERIFY
+        self.rejected = 0
 
         if PORCUPINE_AVAILABLE:
             try:
@@ -64,18 +74,57 @@ class WakeWordDetector:
             print("[INFO] Porcupine not installed, using keyword-based detection")
             print("[TIP] Install with: pip install pvporcupine")
             self.use_porcupine = False
+
+        if not self.use_porcupine:
+            self._load_spotter()
+
+    def _load_spotter(self):
+        """Use the keyword spotter if wake word samples have been enrolled."""
+        from modules.keyword_spotter import KeywordSpotter, load_templates
+
+        try:
+            templates = load_templates(get_wake_word_dir())
+        except Exception as e:
+            print(f"[WARNING] Could not load wake word samples: {e}")
+            return
+        if not templates:
+            print("[TIP] Enroll your voice for offline wake word detection: python main.py --enroll-wake-word 3")
+            return
+        self.spotter = KeywordSpotter(templates)
+        print(f"[OK] Wake word detection enabled (keyword spotter, {len(templates)} samples"
+              f"{', Whisper verification' if self.verify else ''})")
+
+    @property
+    def listens_to_audio(self) -> bool:
+        """True if detect_from_audio() works (Porcupine or enrolled keyword spotter)."""
+        return self.use_porcupine or self.spotter is not None
+
+    @property
+    def frame_length(self) -> int:
+        """Samples per detect_from_audio() call."""
+        return self.porcupine.frame_length if self.use_porcupine else 320
+
+    def reset(self):
+        """Forget buffered audio before listening again."""
+        if self.spotter is not None:
+            self.spotter.reset()
     
     def detect_from_audio(self, audio_data, sample_rate: int = 16000) -> bool:
         """
-        Detect wake word from audio data (Porcupine method).
+        Detect wake word from audio data (Porcupine or keyword spotter).
         
         Args:
-            audio_data: Audio samples (must match Porcupine sample rate)
-            sample_rate: Audio sample rate (Porcupine uses 16000)
+            audio_data: int16 audio frame of `frame_length` samples
+            sample_rate: Audio sample rate (both engines use 16000)
             
         Returns:
             bool: True if wake word detected
         """
+        if self.spotter is not None:
+            if not self.spotter.process(audio_data):
+                return False
+            return self._verify() if self.verify else True
+
         if not self.use_porcupine or self.porcupine is None:
             return False
         
@@ -93,6 +142,25 @@ class WakeWordDetector:
         
         return False
     
+    def _verify(self) -> bool:
+        """Second stage: transcribe the audio around a keyword spotter hit and look for the wake word."""
+        from modules.speech_to_text import transcribe_audio
+
+        try:
+            text = transcribe_audio(self.spotter.recent_audio(KWS_VERIFY_SECONDS), save=False)
+        except Exception as e:
+            print(f"[WARNING] Wake word verification failed: {e}")
+            return True
+        if self.detect_from_text(text):
+            return True
+        self.rejected += 1
+        return False
+
+    def stats(self) -> dict:
+        if self.spotter is None:
+            return {}
+        return {**self.spotter.stats(), "verify_rejected": self.rejected}
+
     def detect_from_text(self, text: str) -> bool:
         """
         Detect wake word from transcribed text (fallback method).
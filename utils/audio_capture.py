@@ -0,0 +1,285 @@
+"""
+Always-on microphone capture shared by wake word detection, VAD recording and barge-in.
+One callback-driven 16 kHz input stream writes into a preallocated ring buffer
+and stays open for the whole session, so the device is never reopened between
+listening modes. Each consumer reads through its own cursor and gets zero-copy
+views of the buffer. A new reader can start in the past (pre-roll), so the
+first syllables of a command spoken right away are not lost.
+
+The buffer stores every sample twice (mirrored halves), so any window up to
+the buffer length is one contiguous slice - no copy at the wrap-around point.
+Views stay valid until the buffer wraps (CAPTURE_BUFFER_SECONDS later).
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from utils.metrics import inc
+
+# One process-wide stream instead of a stream per listening mode
+SHARED_CAPTURE = os.getenv("SHARED_CAPTURE", "true").lower() in ("true", "1", "yes")
+# Seconds of audio kept; also the longest possible recording
+CAPTURE_BUFFER_SECONDS = float(os.getenv("CAPTURE_BUFFER_SECONDS", "90"))
+# Audio from before the recording started that is prepended to each command
+PREROLL_SECONDS = float(os.getenv("PREROLL_SECONDS", "0.3"))
+
+CAPTURE_SAMPLE_RATE = 16000  # Whisper, Porcupine and the barge-in detector all use 16 kHz
+CAPTURE_BLOCK_SIZE = 320  # 20 ms per callback
+READ_TIMEOUT = 2.0  # Seconds without new audio before a read gives up
+
+
+class RingBuffer:
+    """
+    Preallocated mirrored ring buffer of samples.
+
+    Args:
+        capacity: Number of samples kept
+        dtype: Sample type
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self.written = 0  # Total samples ever written (absolute position of the next sample)
+
+    def write(self, samples):
+        """Append samples, overwriting the oldest ones."""
+        n = len(samples)
+        if n > self.capacity:
+            self.written += n - self.capacity
+            samples, n = samples[-self.capacity:], self.capacity
+        start = self.written % self.capacity
+        first = min(n, self.capacity - start)
+        for offset in (0, self.capacity):
+            self._data[offset + start:offset + start + first] = samples[:first]
+            self._data[offset:offset + n - first] = samples[first:]
+        self.written += n  # Published last, so readers never see a half-written block
+
+    def oldest(self) -> int:
+        """Absolute position of the oldest sample still in the buffer."""
+        return max(0, self.written - self.capacity)
+
+    def view(self, position: int, count: int):
+        """
+        Zero-copy view of `count` samples starting at absolute `position`.
+
+        Args:
+            position: Absolute sample position (must still be in the buffer)
+            count: Number of samples (at most the capacity)
+
+        Returns:
+            np.ndarray: Read-only view into the buffer
+        """
+        start = position % self.capacity
+        view = self._data[start:start + count]
+        view.flags.writeable = False
+        return view
+
+
+class CaptureReader:
+    """
+    One consumer's cursor into the shared capture.
+
+    Works like a blocking `sounddevice.InputStream` for the code that reads it:
+    `read(frames)` returns `(samples, overflowed)` with samples shaped (frames, 1).
+
+    Args:
+        capture: AudioCapture to read from
+        preroll: Seconds of already-captured audio to start with
+    """
+
+    def __init__(self, capture, preroll: float = 0.0):
+        self.capture = capture
+        ring = capture.ring
+        self.start_position = max(ring.oldest(), ring.written - int(preroll * capture.sample_rate))
+        self.position = self.start_position
+        self.delivered = 0  # Samples returned by read() - positions in the caller's recording
+        self._resumed_at = self.start_position  # Where delivery became contiguous again after a lap
+        self._overflows_seen = capture.overflows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read(self, frames: int, timeout: float = READ_TIMEOUT):
+        """
+        Wait for and return the next `frames` samples.
+
+        Args:
+            frames: Number of samples
+            timeout: Seconds to wait for audio before raising
+
+        Returns:
+            tuple: (int16 view shaped (frames, 1), overflowed) - overflowed is True if
+                samples were lost since the last read (device overflow or reader lapped)
+        """
+        ring = self.capture.ring
+        if not self.capture.wait_for(self.position + frames, timeout):
+            raise RuntimeError(f"No audio from the microphone for {timeout:.0f}s")
+        overflowed = self.capture.overflows != self._overflows_seen
+        self._overflows_seen = self.capture.overflows
+        if self.position < ring.oldest():
+            # Lapped by the writer - skip to the newest audio; the samples delivered
+            # before the gap are overwritten as well
+            overflowed = True
+            self.capture.count_lapped()
+            self.position = self._resumed_at = ring.written - frames
+        samples = ring.view(self.position, frames)
+        self.position += frames
+        self.delivered += frames
+        return samples.reshape(-1, 1), overflowed
+
+    def recorded(self):
+        """
+        Copy of the delivered samples that are still buffered.
+
+        These are the last `len(result)` of the `delivered` samples read() returned,
+        so sample `i` of the caller's recording is `result[i - (delivered - len(result))]`.
+        Audio skipped after a lap is never included.
+
+        Returns:
+            np.ndarray: int16 samples shaped (n, 1)
+        """
+        ring = self.capture.ring
+        start = max(self._resumed_at, ring.oldest())
+        return ring.view(start, self.position - start).reshape(-1, 1).copy()
+
+
+class AudioCapture:
+    """
+    Callback-driven microphone stream writing into a RingBuffer.
+
+    Args:
+        sample_rate: Capture rate
+        block_size: Samples per stream callback
+        buffer_seconds: Seconds of audio kept
+    """
+
+    def __init__(self, sample_rate: int = CAPTURE_SAMPLE_RATE, block_size: int = CAPTURE_BLOCK_SIZE,
+                 buffer_seconds: float = CAPTURE_BUFFER_SECONDS):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.ring = RingBuffer(int(buffer_seconds * sample_rate))
+        self.overflows = 0
+        self.lapped = 0
+        self._stream = None
+        self._new_audio = threading.Condition()
+
+    def start(self):
+        import sounddevice as sd
+
+        self._stream = sd.InputStream(samplerate=self.sample_rate, channels=1, dtype="int16",
+                                      blocksize=self.block_size, callback=self._callback)
+        self._stream.start()
+        return self
+
+    def _callback(self, indata, frames, time_info, status):
+        # Runs on the audio thread: only copy into the buffer and wake the readers
+        if status and status.input_overflow:
+            self.overflows += 1
+            inc("audio_overflows")
+        self.ring.write(indata[:, 0])
+        with self._new_audio:
+            self._new_audio.notify_all()
+
+    def wait_for(self, position: int, timeout: float) -> bool:
+        """Block until the buffer has been written up to `position`."""
+        deadline = time.monotonic() + timeout
+        with self._new_audio:
+            while self.ring.written < position:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._new_audio.wait(remaining):
+                    return self.ring.written >= position
+        return True
+
+    def count_lapped(self):
+        self.lapped += 1
+        inc("capture_lapped")
+
+    def reader(self, preroll: float = 0.0) -> CaptureReader:
+        """
+        New consumer cursor.
+
+        Args:
+            preroll: Seconds of already-captured audio to include
+
+        Returns:
+            CaptureReader: Starts `preroll` seconds before the live position
+        """
+        return CaptureReader(self, preroll)
+
+    def stats(self) -> dict:
+        return {
+            "seconds_captured": round(self.ring.written / self.sample_rate, 1),
+            "overflows": self.overflows,
+            "lapped_reads": self.lapped,
+        }
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+# ============================================
+# 🎙 Shared capture
+# ============================================
+_capture = None
+_capture_lock = threading.Lock()
+
+
+def get_capture():
+    """
+    Get the shared capture, starting the stream on first use.
+
+    Returns:
+        AudioCapture | None: None if SHARED_CAPTURE is off or the stream could not be opened
+    """
+    global _capture
+    if not SHARED_CAPTURE:
+        return None
+    with _capture_lock:
+        if _capture is None:
+            try:
+                _capture = AudioCapture().start()
+            except Exception as e:
+                print(f"⚠️ Warning: Shared audio capture unavailable, opening streams per use: {e}")
+                return None
+        return _capture
+
+
+def open_input_stream(sample_rate: int, block_size: int, preroll: float = 0.0):
+    """
+    Input for a listening loop: a reader of the shared capture, or a dedicated stream.
+
+    Args:
+        sample_rate: Rate the caller needs (the shared capture serves 16 kHz only)
+        block_size: Samples per read (dedicated stream only)
+        preroll: Seconds of already-captured audio to start with (shared capture only)
+
+    Returns:
+        Context manager whose `read(frames)` returns (int16 samples (frames, 1), overflowed)
+    """
+    capture = get_capture() if sample_rate == CAPTURE_SAMPLE_RATE else None
+    if capture is not None:
+        return capture.reader(preroll)
+    import sounddevice as sd
+    return sd.InputStream(samplerate=sample_rate, channels=1, dtype="int16", blocksize=block_size)
+
+
+def capture_stats() -> dict:
+    """Stats of the shared capture (empty if it is not running)."""
+    return _capture.stats() if _capture is not None else {}
+
+
+def close_capture():
+    """Stop the shared stream (call on shutdown)."""
+    global _capture
+    with _capture_lock:
+        if _capture is not None:
+            _capture.close()
+            _capture = None
@@ -0,0 +1,188 @@
+"""
+Barge-in support: keep the microphone open while Mira is speaking and cut the
+reply short as soon as the user starts talking.
+Uses an energy detector with playback-echo suppression, so Mira's own voice
+leaking from the speakers into the microphone does not trigger it.
+"""
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+from utils.vad import VAD_TRIM, trim_silence
+
+SAMPLE_RATE = 16000
+FRAME_DURATION = 0.02  # 20 ms frames
+
+
+class EchoSuppressingDetector:
+    """
+    Energy-based speech detector that ignores playback echo.
+    
+    The echo path gain (mic level / playback level) is learned from frames that
+    are not speech; a frame only counts as speech when it is louder than both the
+    absolute threshold and the predicted echo by `echo_margin`.
+    
+    Args:
+        threshold: Minimum RMS level (0-1) for speech
+        echo_margin: How much louder than the predicted echo speech must be
+        trigger_frames: Consecutive speech frames needed to trigger
+        initial_echo_gain: Echo path gain assumed before any adaptation
+    """
+
+    def __init__(self, threshold: float = 0.02, echo_margin: float = 2.0, trigger_frames: int = 4,
+                 initial_echo_gain: float = 0.5):
+        self.threshold = threshold
+        self.echo_margin = echo_margin
+        self.trigger_frames = trigger_frames
+        self.echo_gain = initial_echo_gain
+        self._speech_run = 0
+
+    def is_speech(self, frame, playback_level: float = 0.0) -> bool:
+        """
+        Classify one frame.
+        
+        Args:
+            frame: float32 samples in [-1, 1]
+            playback_level: RMS level of the audio being played at the same time
+            
+        Returns:
+            bool: True if the frame contains the user's speech
+        """
+        level = float(np.sqrt(np.mean(np.square(frame, dtype=np.float32))))
+        predicted_echo = self.echo_gain * playback_level
+        speech = level > self.threshold and level > predicted_echo * self.echo_margin
+
+        # Learn the echo path from non-speech frames while something is playing
+        if not speech and playback_level > 1e-4:
+            self.echo_gain = 0.95 * self.echo_gain + 0.05 * (level / playback_level)
+        return speech
+
+    def process(self, frame, playback_level: float = 0.0) -> bool:
+        """
+        Feed one frame; returns True once speech has lasted `trigger_frames` frames.
+        """
+        if self.is_speech(frame, playback_level):
+            self._speech_run += 1
+        else:
+            self._speech_run = 0
+        return self._speech_run >= self.trigger_frames
+
+
+def mic_frames(stop_event, sample_rate: int = SAMPLE_RATE, frame_duration: float = FRAME_DURATION):
+    """Yield float32 microphone frames until `stop_event` is set."""
+    from utils.audio_capture import open_input_stream
+
+    frame_size = int(sample_rate * frame_duration)
+    with open_input_stream(sample_rate, frame_size) as stream:
+        while not stop_event.is_set():
+            frame, _overflowed = stream.read(frame_size)
+            yield frame[:, 0] * np.float32(1.0 / 32768.0)
+
+
+class BargeInMonitor:
+    """
+    Listen during playback and interrupt it when the user speaks.
+    
+    Call start() when a reply begins, finish() once all of it has been queued,
+    then join() to get the captured speech (or None if nobody interrupted).
+    
+    Args:
+        output: AudioOutput whose device provides level() and that is stopped on barge-in
+        detector: Speech detector (defaults to EchoSuppressingDetector)
+        frame_source: Callable `frame_source(stop_event)` yielding float32 frames
+            (defaults to the microphone; fixtures can replay recorded audio)
+        preroll: Seconds of audio before the trigger kept in the capture
+        silence_duration: Seconds of silence that end the captured utterance
+        max_duration: Maximum length of the captured utterance in seconds
+        interrupt: Stop playback when the user speaks (False only captures the
+            speech, letting the reply finish)
+        triggered: Optional threading.Event to set when speech is detected
+            (e.g. shared with speak_stream's `cancel`)
+    """
+
+    def __init__(self, output, detector=None, frame_source=None, preroll: float = 0.3,
+                 silence_duration: float = 0.8, max_duration: float = 30.0, interrupt: bool = True,
+                 triggered=None):
+        self.output = output
+        self.detector = detector or EchoSuppressingDetector(
+            threshold=float(os.getenv("BARGE_IN_THRESHOLD", "0.02")))
+        self.frame_source = frame_source or mic_frames
+        self.preroll = preroll
+        self.silence_duration = silence_duration
+        self.max_duration = max_duration
+        self.interrupt = interrupt
+
+        self.triggered = triggered or threading.Event()
+        self._finished = threading.Event()
+        self._stop = threading.Event()
+        self._captured = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="barge-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def finish(self):
+        """Signal that the reply has been fully queued; stop once playback ends."""
+        self._finished.set()
+
+    def join(self, timeout: float = None):
+        """
+        Wait for the monitor to end.
+        
+        Returns:
+            np.ndarray | None: Captured 16 kHz float32 speech if the user barged in
+        """
+        self._finished.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+        return self._captured
+
+    def _run(self):
+        try:
+            self._monitor()
+        except Exception as e:
+            print(f"⚠️ Barge-in monitor error: {e}")
+        finally:
+            self._stop.set()
+
+    def _monitor(self):
+        preroll_frames = deque(maxlen=max(1, int(self.preroll / FRAME_DURATION)))
+        captured = []
+        silence_frames = 0
+        max_frames = int(self.max_duration / FRAME_DURATION)
+        end_frames = int(self.silence_duration / FRAME_DURATION)
+
+        speaking = False
+
+        for frame in self.frame_source(self._stop):
+            if not speaking:
+                preroll_frames.append(frame)
+                if self.detector.process(frame, self.output.device.level()):
+                    # User started talking: cut the reply and keep recording
+                    if self.interrupt:
+                        self.triggered.set()
+                        self.output.stop()
+                        print("\n✋ Barge-in detected, listening...")
+                    else:
+                        print("\n🗣️ Speech detected during reply, listening...")
+                    captured.extend(preroll_frames)
+                    speaking = True
+                elif self._finished.is_set() and not self.output.is_playing():
+                    return
+                continue
+
+            captured.append(frame)
+            silence_frames = 0 if self.detector.is_speech(frame) else silence_frames + 1
+            if silence_frames >= end_frames or len(captured) >= max_frames:
+                break
+
+        if captured:
+            speech = np.concatenate(captured).astype(np.float32, copy=False)
+            # Drop the silence that ended the utterance before it goes to Whisper
+            self._captured = trim_silence(speech, SAMPLE_RATE) if VAD_TRIM else speech
@@ -0,0 +1,75 @@
+"""
+Shared HTTP client for tools.
+One requests.Session with keep-alive connection pooling is reused by every
+tool call, so repeated requests skip TCP/TLS setup. Calls are bounded by a
+hard deadline - not just per-socket timeouts - so a slow upstream cannot hang
+a turn.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "8"))
+# Worker threads for deadline-bounded calls; a call that misses its deadline
+# keeps its worker until the socket timeout fires, so keep a few spare
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "4"))
+
+_session = None
+_session_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool-call")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not finish within its deadline."""
+
+
+def get_http_session():
+    """
+    Get the shared requests.Session (created on first use).
+
+    Returns:
+        requests.Session: Session with pooled keep-alive connections
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def call_with_deadline(func, timeout: float, *args, **kwargs):
+    """
+    Run `func(*args, **kwargs)` and give up after `timeout` seconds.
+
+    Args:
+        func: Callable to run
+        timeout: Deadline in seconds
+
+    Returns:
+        The function's result
+
+    Raises:
+        DeadlineExceeded: If the call did not finish in time
+    """
+    future = _executor.submit(func, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(f"{getattr(func, '__name__', 'call')} exceeded {timeout:.1f} s") from None
+
+
+def close_http_session():
+    """Close pooled connections (call on shutdown)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
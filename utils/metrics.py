@@ -0,0 +1,357 @@
+"""
+Lightweight in-process metrics and tracing for the voice pipeline.
+Spans time pipeline steps (recording, transcription, LLM calls, tools, TTS,
+playback, memory writes) into fixed-bucket histograms, and counters track events
+(turns, errors, cache hits, buffer overflows). Each finished span costs two
+clock reads and a lock, so instrumentation stays on in production.
+
+Span events and periodic snapshots are written by a background thread to a
+rotating JSON-lines file (runtime/logs/metrics.jsonl). Set METRICS_PORT to also
+serve the Prometheus text format on http://127.0.0.1:<port>/metrics. Components
+with their own stats() (caches, tool executor, sessions) register a collector,
+and its values are included in every snapshot.
+"""
+import bisect
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+import utils.config  # Loads .env - this module is imported before anything else reads it
+from utils.runtime_paths import get_log_path
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("true", "1", "yes")
+# Span events are also written to the JSONL file (histograms are always kept)
+METRICS_TRACE = os.getenv("METRICS_TRACE", "true").lower() in ("true", "1", "yes")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "30"))
+METRICS_FILE_MB = float(os.getenv("METRICS_FILE_MB", "10"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0") or 0)  # 0 = no Prometheus endpoint
+
+# Histogram bucket upper bounds in seconds (Prometheus-style, +Inf implied); finer
+# between 0.1 s and 3 s, where most pipeline stages land
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0,
+           5.0, 7.5, 10.0, 20.0, 30.0, 60.0)
+MAX_PENDING_EVENTS = 10000  # Oldest span events are dropped if the exporter falls behind
+
+# Turn id of the work in progress (set by the conversation loop, inherited by copied contexts)
+current_turn = ContextVar("current_turn", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with sum, count and max."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "p50": round(self.quantile(0.5), 4),
+            "p95": round(self.quantile(0.95), 4),
+            "p99": round(self.quantile(0.99), 4),
+            "max": round(self.max, 4),
+        }
+
+
+class Metrics:
+    """Registry of histograms, counters and stats collectors."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.collectors = {}
+        self.events = deque(maxlen=MAX_PENDING_EVENTS)
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, **attrs):
+        """Record a duration (and a span event for the trace file)."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+        if METRICS_TRACE:
+            event = {"ts": round(time.time(), 3), "span": name, "s": round(seconds, 4)}
+            turn = current_turn.get()
+            if turn is not None:
+                event["turn"] = turn
+            if attrs:
+                event.update(attrs)
+            self.events.append(event)  # deque.append is thread-safe
+
+    def inc(self, name: str, amount: int = 1):
+        """Increment a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def register_collector(self, name: str, collect):
+        """
+        Include a component's own stats in snapshots.
+
+        Args:
+            name: Prefix for the values (e.g. "tts_cache")
+            collect: Zero-argument callable returning a (possibly nested) dict of numbers
+        """
+        self.collectors[name] = collect
+
+    def snapshot(self) -> dict:
+        """
+        Current histograms, counters and collector values.
+
+        Returns:
+            dict: {"ts", "uptime", "spans", "counters", "components"}
+        """
+        with self._lock:
+            spans = {name: h.summary() for name, h in self.histograms.items()}
+            counters = dict(self.counters)
+        components = {}
+        for name, collect in list(self.collectors.items()):
+            try:
+                components[name] = collect()
+            except Exception as e:
+                components[name] = {"error": str(e)}
+        return {"ts": round(time.time(), 3), "uptime": round(time.time() - self.started, 1),
+                "spans": spans, "counters": counters, "components": components}
+
+    def prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, h in sorted(self.histograms.items()):
+                metric = f"mira_{_metric_name(name)}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, n in zip(self.buckets_of(h), h.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{metric}_sum {h.sum}")
+                lines.append(f"{metric}_count {h.count}")
+            for name, value in sorted(self.counters.items()):
+                metric = f"mira_{_metric_name(name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+        for name, collect in sorted(self.collectors.items()):
+            try:
+                values = collect()
+            except Exception:
+                continue
+            for key, value in _flatten(values, _metric_name(name)):
+                lines.append(f"mira_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def buckets_of(histogram):
+        return [str(b) for b in histogram.buckets] + ["+Inf"]
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name).lower()
+
+
+def _flatten(values, prefix):
+    """Yield (name, number) pairs from a nested stats dict."""
+    if isinstance(values, bool):
+        yield prefix, int(values)
+    elif isinstance(values, (int, float)):
+        yield prefix, values
+    elif isinstance(values, dict):
+        for key, value in values.items():
+            yield from _flatten(value, f"{prefix}_{_metric_name(str(key))}")
+
+
+metrics = Metrics()
+
+# ============================================
+# ⏱ Instrumentation helpers
+# ============================================
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Time a block of code into the `name` histogram.
+
+    Args:
+        name: Span name (e.g. "transcribe")
+        **attrs: Extra fields for the trace event
+    """
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(name, time.perf_counter() - start, **attrs)
+
+
+def traced(name: str):
+    """Decorator form of span() for functions and coroutines."""
+    def decorate(func):
+        import asyncio
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def observe(name: str, seconds: float, **attrs):
+    """Record a duration measured elsewhere."""
+    if METRICS_ENABLED:
+        metrics.observe(name, seconds, **attrs)
+
+
+def inc(name: str, amount: int = 1):
+    """Increment a counter."""
+    if METRICS_ENABLED:
+        metrics.inc(name, amount)
+
+
+def register_collector(name: str, collect):
+    """Include a component's stats() in snapshots (see Metrics.register_collector)."""
+    metrics.register_collector(name, collect)
+
+# ============================================
+# 📤 Export
+# ============================================
+_exporter = None
+
+
+class MetricsExporter:
+    """
+    Background writer for span events and snapshots, plus the optional HTTP endpoint.
+
+    Args:
+        path: JSONL file (rotated at METRICS_FILE_MB, 3 backups kept)
+        interval: Seconds between flushes
+        port: Serve /metrics on 127.0.0.1:port (0 = off)
+    """
+
+    def __init__(self, path=None, interval: float = METRICS_FLUSH_SECONDS, port: int = METRICS_PORT):
+        self.interval = interval
+        handler = logging.handlers.RotatingFileHandler(
+            path or get_log_path("metrics.jsonl"), maxBytes=int(METRICS_FILE_MB * 1024 * 1024),
+            backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._log = logging.getLogger("mira.metrics")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        self._log.addHandler(handler)
+        self._handler = handler
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._server = self._serve(port) if port else None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _serve(self, port):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        except OSError as e:
+            print(f"⚠️ Warning: Metrics endpoint not started on port {port}: {e}")
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"📈 Metrics at http://127.0.0.1:{port}/metrics")
+        return server
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        """Write pending span events and a snapshot line."""
+        try:
+            lines = []
+            while metrics.events:
+                lines.append(json.dumps(metrics.events.popleft(), ensure_ascii=False))
+            lines.append(json.dumps({"snapshot": metrics.snapshot()}, ensure_ascii=False, default=str))
+            self._log.info("\n".join(lines))  # One write per flush (rotation happens between flushes)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not write metrics: {e}")
+
+    def close(self):
+        """Final flush; stops the writer and the HTTP endpoint."""
+        self._stop.set()
+        self.flush()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._log.removeHandler(self._handler)
+        self._handler.close()
+
+
+def start_metrics_export():
+    """Start the background exporter (no-op if metrics are disabled or already running)."""
+    global _exporter
+    if METRICS_ENABLED and _exporter is None:
+        _exporter = MetricsExporter().start()
+    return _exporter
+
+
+def stop_metrics_export():
+    """Flush and stop the exporter (call on shutdown)."""
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
@@ -6,6 +6,7 @@ import sounddevice as sd
 from scipy.io.wavfile import write
 import numpy as np
 import os
+import time
 
 # Load .env file if available (must be done before reading env vars)
 try:
@@ -23,14 +24,16 @@ except ImportError:
 except Exception:
     pass  # Ignore errors, will use default values
 
-try:
-    import webrtcvad
-    VAD_AVAILABLE = True
-except ImportError:
-    VAD_AVAILABLE = False
-    print("⚠️ Warning: webrtcvad not available. Install with: pip install webrtcvad")
+from utils.audio_capture import PREROLL_SECONDS, CaptureReader, get_capture, open_input_stream
+from utils.metrics import inc, observe, traced
+from utils.vad import VAD_TRIM, VAD_TRIM_PADDING_MS, VoiceActivityDetector
 
-def record_audio(filename="command.wav", duration=30, use_vad=True, silence_duration=1.5):
+# Whisper's native rate - recording at 16 kHz avoids any resampling before STT
+WHISPER_SAMPLE_RATE = 16000
+
+@traced("record_audio")
+def record_audio(filename="command.wav", duration=30, use_vad=True, silence_duration=1.5, on_audio=None,
+                 in_memory=False, endpointer=None):
     """
     Record audio from microphone with optional Voice Activity Detection.
     
@@ -39,11 +42,21 @@ def record_audio(filename="command.wav", duration=30, use_vad=True, silence_dura
         duration: Maximum recording duration in seconds (used if VAD disabled or falls back)
         use_vad: Enable Voice Activity Detection for automatic stop
         silence_duration: Seconds of silence before stopping (VAD only)
+        on_audio: Optional callback `on_audio(chunk, sample_rate)` called with
+            each recorded chunk while recording (e.g. StreamingTranscriber.feed)
+        in_memory: Capture at 16 kHz and return a float32 NumPy buffer instead of
+            writing a WAV file. `filename` is then only written as a debug sink
+            when SAVE_DEBUG_AUDIO is enabled.
+        endpointer: Optional object whose `required_silence(pause, default)`
+            replaces `silence_duration` at each pause and whose `decision`
+            labels the stop (VAD only), e.g. the SemanticEndpointer from
+            modules/endpointing.py
         
     Returns:
-        str: Path to saved audio file
+        str | np.ndarray: Path to saved audio file, or 16 kHz float32 samples
+            when `in_memory` is set (None if nothing was recorded)
     """
-    fs = 44100  # Sample rate
+    fs = WHISPER_SAMPLE_RATE if in_memory else 44100  # Sample rate
     
     # Get duration from environment if available (override default parameter)
     env_duration = os.getenv("RECORDING_DURATION")
@@ -62,114 +75,181 @@ def record_audio(filename="command.wav", duration=30, use_vad=True, silence_dura
     if env_vad in ("false", "0", "no"):
         vad_enabled = False
     
-    if vad_enabled and VAD_AVAILABLE:
-        return _record_with_vad(filename, fs, silence_duration, max_duration=duration)
-    else:
-        if not VAD_AVAILABLE and use_vad:
-            print("⚠️ VAD not available, using fixed duration recording")
-        return _record_fixed_duration(filename, fs, duration)
+    if vad_enabled:
+        return _record_with_vad(filename, fs, silence_duration, max_duration=duration, on_audio=on_audio,
+                                in_memory=in_memory, endpointer=endpointer)
+    return _record_fixed_duration(filename, fs, duration, on_audio=on_audio, in_memory=in_memory)
+
+def _finish_recording(filename, fs, audio_frames, in_memory):
+    """
+    Turn recorded int16 frames into the requested output.
+    
+    Args:
+        filename: WAV path (always written in file mode, debug sink in memory mode)
+        fs: Sample rate of the frames
+        audio_frames: List of int16 NumPy arrays
+        in_memory: Return a float32 buffer instead of the file path
+        
+    Returns:
+        str | np.ndarray: File path, or float32 samples in [-1, 1]
+    """
+    if not in_memory:
+        audio = np.concatenate(audio_frames, axis=0)
+        write(filename, fs, audio)
+        print(f"✅ Audio saved as {filename} ({len(audio) / fs:.1f}s)")
+        return filename
+
+    # Single allocation: frames are joined and cast to float32 in one step, then scaled in place
+    audio = np.concatenate(audio_frames, axis=None, dtype=np.float32)
+    audio *= 1.0 / 32768.0
+    print(f"✅ Audio captured in memory ({len(audio) / fs:.1f}s)")
+
+    if os.getenv("SAVE_DEBUG_AUDIO", "false").lower() in ("true", "1", "yes"):
+        try:
+            write(filename, fs, audio)
+            print(f"🐞 Debug copy saved as {filename}")
+        except Exception as e:
+            print(f"⚠️ Warning: Could not save debug audio: {e}")
+    return audio
 
-def _record_fixed_duration(filename, fs, duration):
+def _record_fixed_duration(filename, fs, duration, on_audio=None, in_memory=False):
     """Record audio for a fixed duration."""
     print("🎙️ Recording... Speak now!")
     print(f"⏱️ Recording for {duration} seconds...")
     
-    audio = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype='int16')
-    sd.wait()
+    capture = get_capture() if in_memory else None
+    if capture is not None:
+        # From the always-on capture, starting with the pre-roll
+        with capture.reader(preroll=PREROLL_SECONDS) as stream:
+            stream.read(int(duration * fs), timeout=duration + 2)
+            audio = stream.recorded()
+    else:
+        audio = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype='int16')
+        sd.wait()
     
     # Check for silence
     if np.max(np.abs(audio)) < 1000:  # Very quiet threshold
         print("⚠️ Warning: Audio seems too quiet. Try speaking louder or closer to mic.")
     
-    write(filename, fs, audio)
-    print(f"✅ Audio saved as {filename}")
-    return filename
+    if on_audio:
+        on_audio(audio, fs)
+    
+    return _finish_recording(filename, fs, [audio], in_memory)
 
-def _record_with_vad(filename, fs, silence_duration, max_duration=60):
+def _samples_between(chunks, chunk_size, start, end):
+    """Samples [start, end) of a recording kept as equal-sized chunks."""
+    first, last = start // chunk_size, (end - 1) // chunk_size + 1
+    joined = np.concatenate(chunks[first:last], axis=None)
+    offset = first * chunk_size
+    return joined[start - offset:end - offset]
+
+def _record_with_vad(filename, fs, silence_duration, max_duration=60, on_audio=None, in_memory=False,
+                     endpointer=None):
     """
-    Record audio with Voice Activity Detection using simple amplitude-based detection.
-    Stops recording after detecting silence.
+    Record audio with frame-level Voice Activity Detection (see utils/vad.py).
+    Stops `silence_duration` after the last speech frame, or after the silence
+    the `endpointer` asks for at the current pause. Unless VAD_TRIM is off,
+    leading and trailing silence is cut from the result, and `on_audio` only
+    receives the part that is kept.
     
     Args:
         filename: Output filename
         fs: Sample rate
         silence_duration: Seconds of silence before stopping
         max_duration: Maximum recording duration in seconds (default 60)
+        on_audio: Optional callback `on_audio(chunk, sample_rate)` for recorded speech
+        in_memory: Return float32 samples instead of writing `filename`
+        endpointer: Optional object with `required_silence(pause, default)` -> seconds and a `decision`
     """
-    print("🎙️ Recording with Voice Activity Detection...")
+    detector = VoiceActivityDetector(fs)
+    print(f"🎙️ Recording with Voice Activity Detection ({detector.engine_name})...")
     print("💬 Speak now! (Will stop automatically after silence)")
     print(f"⏱️ Maximum duration: {max_duration} seconds")
     
-    frame_duration = 0.1  # 100ms frames for VAD
-    frame_size = int(fs * frame_duration)
-    
-    audio_frames = []
-    last_speech_frame = 0
-    silence_threshold_frames = int(silence_duration / frame_duration)
+    # Read ~100 ms at a time, a whole number of VAD frames
+    frame_seconds = detector.frame_length / fs
+    chunk_size = detector.frame_length * max(1, round(0.1 / frame_seconds))
+    max_chunks = int(max_duration * fs / chunk_size)
+    padding = int(VAD_TRIM_PADDING_MS / 1000 * fs)
     
-    max_frames = int(max_duration / frame_duration)
-    
-    # Amplitude threshold for speech detection (adjustable - can be tuned via env)
-    import os
-    env_threshold = os.getenv("VAD_THRESHOLD", "")
-    if env_threshold:
-        try:
-            speech_threshold = int(float(env_threshold) * 32767)  # Convert to int16 range
-        except ValueError:
-            speech_threshold = 2000
-    else:
-        speech_threshold = 2000
+    chunks = []
+    fed = None  # Samples already passed to on_audio
+    last_speech_time = None
     
     try:
-        with sd.InputStream(samplerate=fs, channels=1, dtype='int16', 
-                           blocksize=frame_size) as stream:
-            frames_collected = 0
-            speech_detected = False
-            
-            while frames_collected < max_frames:
-                # Read audio chunk
-                audio_chunk, overflowed = stream.read(frame_size)
+        # In-memory recordings (16 kHz) read the shared capture, starting with the pre-roll
+        with open_input_stream(fs, chunk_size, preroll=PREROLL_SECONDS) as stream:
+            while len(chunks) < max_chunks:
+                audio_chunk, overflowed = stream.read(chunk_size)
                 if overflowed:
+                    inc("audio_overflows")
                     print("⚠️ Audio buffer overflow")
+                chunks.append(audio_chunk)
                 
-                audio_frames.append(audio_chunk)
-                frames_collected += 1
+                had_speech, voiced_until = detector.speech_detected, detector.last_voiced
+                detector.process(audio_chunk)
+                if detector.speech_detected and not had_speech:
+                    print("🗣️ Speech detected...", end="", flush=True)
+                if detector.last_voiced != voiced_until:
+                    last_speech_time = time.perf_counter()
                 
-                # Simple amplitude-based speech detection
-                max_amplitude = np.max(np.abs(audio_chunk))
-                is_speech = max_amplitude > speech_threshold
+                if on_audio and not VAD_TRIM:
+                    on_audio(audio_chunk, fs)
+                elif on_audio and detector.speech_detected:
+                    # Speech so far, plus pauses once speech resumes - never the silence around it
+                    start = fed if fed is not None else max(0, detector.speech_start - padding)
+                    end = detector.position if detector.in_speech else detector.speech_end
+                    if end > start:
+                        on_audio(_samples_between(chunks, chunk_size, start, end), fs)
+                        fed = end
                 
-                if is_speech:
-                    if not speech_detected:
-                        speech_detected = True
-                        print("🗣️ Speech detected...", end="", flush=True)
-                    last_speech_frame = frames_collected
-                else:
-                    # Stop if we've had enough silence after speech was detected
-                    if speech_detected and (frames_collected - last_speech_frame) >= silence_threshold_frames:
+                needed = silence_duration
+                if endpointer is not None and detector.last_voiced is not None:
+                    pause = (detector.position - detector.last_voiced) / fs
+                    needed = endpointer.required_silence(pause, silence_duration)
+                
+                if detector.silence_after_speech() >= needed:
+                    # Endpointing delay: last speech frame to the stop decision
+                    observe("vad_endpoint", time.perf_counter() - last_speech_time)
+                    if endpointer is not None:
+                        inc(f"endpoint_{endpointer.decision}")
+                        print(f"\n✅ Recording stopped ({needed:.1f}s of silence, utterance {endpointer.decision})")
+                    else:
                         print("\n✅ Recording stopped (silence detected)")
-                        break
-                    elif frames_collected % 10 == 0:  # Print dots every second
-                        print(".", end="", flush=True)
+                    break
+                elif len(chunks) % 10 == 0:  # Print dots every second
+                    print(".", end="", flush=True)
             
-            if frames_collected >= max_frames:
+            if len(chunks) >= max_chunks:
                 print(f"\n⚠️ Maximum duration ({max_duration}s) reached")
-            elif not speech_detected:
+            elif not detector.speech_detected:
                 print("\n⚠️ No speech detected, using full recording")
+
+            offset = 0  # Recorded samples missing from the start of `audio`
+            if not chunks:
+                audio = None
+            elif isinstance(stream, CaptureReader):
+                # Chunks are views of the capture buffer - take one copy of the whole range.
+                # After a lap only the audio since the gap is left, so detector positions shift.
+                audio = stream.recorded()
+                offset = stream.delivered - len(audio)
+            else:
+                audio = np.concatenate(chunks, axis=0)
         
-        # Combine all frames
-        if audio_frames:
-            audio = np.concatenate(audio_frames, axis=0)
-            write(filename, fs, audio)
-            duration = len(audio) / fs
-            print(f"✅ Audio saved as {filename} ({duration:.1f}s)")
-            return filename
-        else:
+        if audio is None or len(audio) == 0:
             print("❌ No audio recorded")
             return None
+        
+        span = detector.speech_range() if VAD_TRIM else None
+        if span is not None and span[1] > offset:  # Otherwise the speech was lost in the gap - keep it all
+            start, end = max(0, span[0] - offset), span[1] - offset
+            trimmed = len(audio) - (min(end, len(audio)) - start)
+            audio = audio[start:end]
+            print(f"✂️ Trimmed {trimmed / fs:.1f}s of silence")
+        return _finish_recording(filename, fs, [audio], in_memory)
             
     except Exception as e:
         print(f"⚠️ VAD recording error: {e}")
         print(f"🔄 Falling back to fixed duration recording ({max_duration}s)...")
-        return _record_fixed_duration(filename, fs, duration=max_duration)
-
+        return _record_fixed_duration(filename, fs, duration=max_duration, on_audio=on_audio,
+                                      in_memory=in_memory)
@@ -0,0 +1,95 @@
+"""
+Lazy model/resource registry.
+Heavy resources (ML models, agent graphs, remote model preloads) are registered
+with a loader and only built on first use - or warmed up in the background.
+Load times are recorded for the startup profile (`python main.py --profile-startup`).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_loaders = {}
+_resources = {}
+_locks = {}
+_timings = {}
+_registry_lock = threading.Lock()
+_executor = None
+
+def register(name: str, loader):
+    """
+    Register a loader for a lazily-built resource.
+    
+    Args:
+        name: Resource name used with get_resource()
+        loader: Zero-argument callable that builds and returns the resource
+    """
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+
+def get_resource(name: str):
+    """
+    Get a resource, loading it on first use (thread-safe, loads only once).
+    
+    Args:
+        name: Registered resource name
+        
+    Returns:
+        The loaded resource
+    """
+    if name in _resources:
+        return _resources[name]
+    if name not in _loaders:
+        raise KeyError(f"Unknown resource: {name}")
+
+    with _locks[name]:
+        if name not in _resources:
+            start = time.perf_counter()
+            _resources[name] = _loaders[name]()
+            record_timing(name, time.perf_counter() - start)
+    return _resources[name]
+
+def is_loaded(name: str) -> bool:
+    """Check whether a resource has already been loaded."""
+    return name in _resources
+
+def record_timing(name: str, seconds: float):
+    """Record how long a startup component took (shown in the startup report)."""
+    _timings[name] = seconds
+
+def warm_up(names, max_workers: int = 4) -> dict:
+    """
+    Load resources concurrently in a background thread pool.
+    Returns immediately; failures are reported and the resource is retried on first use.
+    
+    Args:
+        names: Resource names to load
+        max_workers: Size of the warm-up thread pool
+        
+    Returns:
+        dict: Mapping of resource name to Future
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warmup")
+
+    def _load(name):
+        try:
+            get_resource(name)
+        except Exception as e:
+            print(f"⚠️ Warning: Could not preload {name}: {e}")
+            raise
+
+    return {name: _executor.submit(_load, name) for name in names}
+
+def startup_report() -> str:
+    """
+    Format the per-component load timings.
+    
+    Returns:
+        str: Multi-line timing report, slowest component first
+    """
+    lines = ["⏱️ Startup profile:"]
+    for name, seconds in sorted(_timings.items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"   {name:<20} {seconds * 1000:8.0f} ms")
+    return "\n".join(lines)
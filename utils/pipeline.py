@@ -0,0 +1,119 @@
+"""
+Queue-connected worker stages for the conversation pipeline.
+Each stage owns a queue and worker thread(s), and tracks queue depth and how
+long items wait before a worker picks them up.
+"""
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class Stage:
+    """
+    A named pipeline stage: items submitted to it are handled by worker threads.
+    
+    Args:
+        name: Stage name (used for thread names and stats)
+        handler: Callable invoked with each submitted item
+        workers: Number of worker threads
+        maxsize: Queue bound (0 = unbounded)
+    """
+
+    def __init__(self, name: str, handler, workers: int = 1, maxsize: int = 0):
+        self.name = name
+        self.handler = handler
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.processed = 0
+        self.errors = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, item):
+        """Queue an item for the stage's workers."""
+        if self._closed:
+            raise RuntimeError(f"Stage '{self.name}' is closed")
+        self._queue.put((time.perf_counter(), item))
+
+    def _run(self):
+        while True:
+            queued_at, item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                waited = time.perf_counter() - queued_at
+                with self._lock:
+                    self.total_wait += waited
+                    self.max_wait = max(self.max_wait, waited)
+                try:
+                    self.handler(item)
+                    with self._lock:
+                        self.processed += 1
+                except Exception as e:
+                    with self._lock:
+                        self.errors += 1
+                    logger.error(f"❌ Error in {self.name} stage: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    @property
+    def depth(self) -> int:
+        """Number of items waiting or being handled."""
+        return self._queue.unfinished_tasks
+
+    def stats(self) -> dict:
+        """
+        Queue depth and wait-time statistics.
+        
+        Returns:
+            dict: Stage statistics (wait times in milliseconds)
+        """
+        with self._lock:
+            handled = self.processed + self.errors
+            return {
+                "stage": self.name,
+                "depth": self.depth,
+                "processed": self.processed,
+                "errors": self.errors,
+                "avg_wait_ms": round(self.total_wait / handled * 1000, 1) if handled else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+            }
+
+    def drain(self):
+        """Block until every submitted item has been handled."""
+        self._queue.join()
+
+    def close(self, drain: bool = True, timeout: float = None):
+        """
+        Stop the stage's workers.
+        
+        Args:
+            drain: Handle everything still queued first (False discards pending items)
+            timeout: Maximum seconds to wait for each worker to finish
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if not drain:
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._queue.task_done()
+        for _ in self._threads:
+            self._queue.put((time.perf_counter(), _STOP))
+        for thread in self._threads:
+            thread.join(timeout)
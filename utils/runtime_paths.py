@@ -13,6 +13,11 @@ RUNTIME_DIR = BASE_DIR / "runtime"
 AUDIO_DIR = RUNTIME_DIR / "audio"
 LOGS_DIR = RUNTIME_DIR / "logs"
 TRANSCRIPTS_DIR = RUNTIME_DIR / "transcripts"
+TTS_CACHE_DIR = RUNTIME_DIR / "tts_cache"
+MODELS_DIR = RUNTIME_DIR / "models"
+SESSIONS_DIR = RUNTIME_DIR / "sessions"
+MEMORY_INDEX_DIR = RUNTIME_DIR / "memory_index"
+WAKE_WORD_DIR = RUNTIME_DIR / "wake_word"
 
 def ensure_runtime_dirs():
     """Create runtime directories if they don't exist."""
@@ -35,6 +40,31 @@ def get_transcript_path(filename="output.txt"):
     ensure_runtime_dirs()
     return TRANSCRIPTS_DIR / filename
 
+def get_tts_cache_dir():
+    """Get the runtime/tts_cache/ directory for cached speech audio."""
+    TTS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return TTS_CACHE_DIR
+
+def get_models_dir():
+    """Get the runtime/models/ directory for locally converted/exported models."""
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    return MODELS_DIR
+
+def get_sessions_dir():
+    """Get the runtime/sessions/ directory for persisted conversation sessions."""
+    SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
+    return SESSIONS_DIR
+
+def get_memory_index_dir():
+    """Get the runtime/memory_index/ directory for the memory recall vector index."""
+    MEMORY_INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    return MEMORY_INDEX_DIR
+
+def get_wake_word_dir():
+    """Get the runtime/wake_word/ directory for enrolled wake word samples."""
+    WAKE_WORD_DIR.mkdir(parents=True, exist_ok=True)
+    return WAKE_WORD_DIR
+
 def cleanup_old_files(max_age_days=7):
     """
     Clean up old runtime files older than max_age_days.
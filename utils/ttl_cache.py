@@ -0,0 +1,89 @@
+"""
+Small thread-safe TTL cache for tool results.
+Entries are keyed by (namespace, key) - typically (tool name, normalized
+argument) - expire after a per-entry TTL, and the least recently used entries
+are evicted beyond `max_entries`. Hit/miss counters are kept per namespace.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a per-entry time to live.
+
+    Args:
+        max_entries: Maximum number of cached entries across all namespaces
+        clock: Time source in seconds (monotonic by default)
+    """
+
+    def __init__(self, max_entries: int = 512, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # (namespace, key) -> (expires_at, value)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _counters(self, namespace):
+        return self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "expired": 0})
+
+    def get(self, namespace: str, key):
+        """
+        Look up a cached value.
+
+        Returns:
+            The cached value, or None on a miss or expired entry
+        """
+        with self._lock:
+            counters = self._counters(namespace)
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                counters["misses"] += 1
+                return None
+            expires_at, value = entry
+            if self._clock() >= expires_at:
+                del self._entries[(namespace, key)]
+                counters["expired"] += 1
+                counters["misses"] += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            counters["hits"] += 1
+            return value
+
+    def put(self, namespace: str, key, value, ttl: float):
+        """Cache a value for `ttl` seconds."""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(namespace, key)] = (self._clock() + ttl, value)
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, namespace: str = None):
+        """Drop all entries, or only those of one namespace."""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k in self._entries if k[0] == namespace]:
+                    del self._entries[cache_key]
+
+    def stats(self) -> dict:
+        """
+        Per-namespace hit/miss counters and entry counts.
+
+        Returns:
+            dict: {namespace: {"hits", "misses", "expired", "entries", "hit_rate"}}
+        """
+        with self._lock:
+            entries = {}
+            for namespace, _ in self._entries:
+                entries[namespace] = entries.get(namespace, 0) + 1
+            result = {}
+            for namespace, counters in self._stats.items():
+                lookups = counters["hits"] + counters["misses"]
+                result[namespace] = dict(counters, entries=entries.get(namespace, 0),
+                                         hit_rate=counters["hits"] / lookups if lookups else 0.0)
+            return result
@@ -0,0 +1,259 @@
+"""
+Frame-level voice activity detection for recording commands.
+Each 10/20/30 ms frame is classified as speech or not by one of two engines:
+- "webrtc": webrtcvad (pip install webrtcvad), at 8/16/32/48 kHz
+- "energy": vectorized NumPy detector - frame level above an adaptive noise
+  floor, and a harmonic rather than flat spectrum in the voice band, so clicks
+  and hiss are ignored
+VAD_ENGINE=auto uses webrtcvad when it is installed.
+
+Frame decisions are smoothed: speech must last VAD_ONSET_MS before it counts
+(a single noise spike does not start or extend a recording), and short pauses
+up to VAD_HANGOVER_MS stay part of the speech. The detector remembers where
+speech started and ended, so leading and trailing silence can be trimmed off
+before the audio reaches Whisper.
+"""
+import os
+
+import numpy as np
+
+try:
+    import webrtcvad
+    WEBRTC_AVAILABLE = True
+except ImportError:
+    WEBRTC_AVAILABLE = False
+
+# Engine: "auto" (webrtc if installed, else energy), "webrtc" or "energy"
+VAD_ENGINE = os.getenv("VAD_ENGINE", "auto").lower()
+# Frame length in ms (webrtcvad accepts 10, 20 or 30)
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "20"))
+# webrtcvad aggressiveness: 0 (keeps most audio) to 3 (strictest)
+VAD_AGGRESSIVENESS = int(os.getenv("VAD_AGGRESSIVENESS", "2"))
+# Speech must last this long to count, and pauses this short do not end it
+VAD_ONSET_MS = int(os.getenv("VAD_ONSET_MS", "60"))
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "300"))
+# Energy engine: minimum voice-band RMS level (0-1) for speech, whatever the noise floor
+VAD_MIN_LEVEL = float(os.getenv("VAD_MIN_LEVEL", "0.005") or 0.005)
+if os.getenv("VAD_THRESHOLD"):
+    # The old setting was a peak-amplitude fraction, which has no voice-band RMS equivalent
+    print("⚠️ Warning: VAD_THRESHOLD is no longer used; set VAD_MIN_LEVEL (voice-band RMS, default 0.005) instead")
+# Cut leading/trailing silence from recordings, keeping this much audio before the speech
+VAD_TRIM = os.getenv("VAD_TRIM", "true").lower() in ("true", "1", "yes")
+VAD_TRIM_PADDING_MS = int(os.getenv("VAD_TRIM_PADDING_MS", "300"))
+
+WEBRTC_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+ENERGY_RATIO = 3.0  # Speech is at least ~10 dB above the noise floor
+VOICE_BAND = (100.0, 4000.0)  # Pitch harmonics and the first formants
+MAX_FLATNESS = 0.3  # Spectral flatness in VOICE_BAND (white noise ~0.55, voiced speech ~0.05)
+MIN_BAND_SHARE = 0.3  # Share of the frame's energy in VOICE_BAND (knocks and rumble sit below it)
+
+
+class EnergyEngine:
+    """
+    Energy-plus-spectrum frame classifier with an adaptive noise floor.
+
+    Args:
+        sample_rate: Audio sample rate
+        frame_length: Samples per frame
+        min_level: Minimum RMS level (0-1) of the voice band for speech
+    """
+
+    def __init__(self, sample_rate: int, frame_length: int, min_level: float = VAD_MIN_LEVEL):
+        self.min_level = min_level
+        self.noise_floor = None
+        self.n_fft = 1 << (frame_length - 1).bit_length()
+        self.window = np.hanning(frame_length).astype(np.float32)
+        bins = np.fft.rfftfreq(self.n_fft, 1.0 / sample_rate)
+        self.band = (bins >= VOICE_BAND[0]) & (bins <= VOICE_BAND[1])
+        self.band_scale = 2.0 / (self.n_fft * float(np.sum(self.window ** 2)))
+
+    def classify(self, frames):
+        """
+        Classify frames.
+
+        Args:
+            frames: float32 array of shape (n, frame_length), samples in [-1, 1]
+
+        Returns:
+            np.ndarray: bool array of shape (n,)
+        """
+        power = np.abs(np.fft.rfft(frames * self.window, self.n_fft, axis=1)) ** 2 + 1e-12
+        band = power[:, self.band]
+        # RMS level of the voice band only (Parseval), so rumble and knocks do not count as loud
+        levels = np.sqrt(band.sum(axis=1) * self.band_scale)
+        # Voiced speech has a harmonic (peaky) spectrum; clicks, hiss and fan noise are flat
+        flatness = np.exp(np.mean(np.log(band), axis=1)) / np.mean(band, axis=1)
+        band_share = band.sum(axis=1) / power.sum(axis=1)
+        voiced = (flatness <= MAX_FLATNESS) & (band_share >= MIN_BAND_SHARE)
+
+        speech = np.empty(len(frames), dtype=bool)
+        floor = levels[0] if self.noise_floor is None else self.noise_floor
+        for i, level in enumerate(levels):
+            speech[i] = voiced[i] and level > max(self.min_level, floor * ENERGY_RATIO)
+            # The floor follows drops quickly and rises slowly, so speech does not raise it
+            floor += (0.1 if level < floor else 0.003) * (level - floor)
+        self.noise_floor = float(floor)
+        return speech
+
+
+class WebRTCEngine:
+    """
+    webrtcvad frame classifier.
+
+    Args:
+        sample_rate: One of WEBRTC_SAMPLE_RATES
+        aggressiveness: 0-3
+    """
+
+    def __init__(self, sample_rate: int, aggressiveness: int = VAD_AGGRESSIVENESS):
+        self.sample_rate = sample_rate
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def classify(self, frames):
+        """Classify int16 frames of shape (n, frame_length); returns a bool array."""
+        return np.fromiter((self.vad.is_speech(frame.tobytes(), self.sample_rate) for frame in frames),
+                           dtype=bool, count=len(frames))
+
+
+class VoiceActivityDetector:
+    """
+    Streaming VAD with onset/hangover smoothing and speech range tracking.
+
+    Feed audio with process(); chunks may be any length (partial frames are kept
+    until complete). Sample positions count from the first sample fed.
+
+    Args:
+        sample_rate: Audio sample rate
+        engine: "auto", "webrtc" or "energy" (default: VAD_ENGINE)
+        frame_ms: Frame length in ms
+        onset_ms: Speech needed before it counts
+        hangover_ms: Pause length that still counts as speech
+    """
+
+    def __init__(self, sample_rate: int, engine: str = None, frame_ms: int = VAD_FRAME_MS,
+                 onset_ms: int = VAD_ONSET_MS, hangover_ms: int = VAD_HANGOVER_MS):
+        engine = engine or VAD_ENGINE
+        if frame_ms not in (10, 20, 30):
+            print(f"⚠️ Warning: VAD_FRAME_MS must be 10, 20 or 30, using 20 (got {frame_ms})")
+            frame_ms = 20
+        self.sample_rate = sample_rate
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.onset_frames = max(1, round(onset_ms / frame_ms))
+        self.hangover_frames = max(0, round(hangover_ms / frame_ms))
+
+        use_webrtc = engine in ("auto", "webrtc") and WEBRTC_AVAILABLE and sample_rate in WEBRTC_SAMPLE_RATES
+        if engine == "webrtc" and not use_webrtc:
+            print("⚠️ Warning: webrtcvad not usable here (not installed or unsupported sample rate), "
+                  "using the energy VAD")
+        self.engine_name = "webrtc" if use_webrtc else "energy"
+        self.engine = (WebRTCEngine(sample_rate) if use_webrtc
+                       else EnergyEngine(sample_rate, self.frame_length))
+        self.reset()
+
+    def reset(self):
+        """Forget all state (start of a new recording)."""
+        self.position = 0  # Samples classified so far
+        self.in_speech = False
+        self.speech_start = None  # First sample of the first speech run
+        self.speech_end = None  # Sample after the last speech run (hangover included)
+        self.last_voiced = None  # Sample after the last voiced frame within speech
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._run = 0  # Consecutive voiced frames
+        self._gap = 0  # Unvoiced frames since the last voiced one
+
+    @property
+    def speech_detected(self) -> bool:
+        return self.speech_start is not None
+
+    def silence_after_speech(self) -> float:
+        """Seconds since the last voiced frame (0 while speaking or before any speech)."""
+        if self.in_speech or self.last_voiced is None:
+            return 0.0
+        return (self.position - self.last_voiced) / self.sample_rate
+
+    def process(self, chunk) -> bool:
+        """
+        Classify the next chunk of audio.
+
+        Args:
+            chunk: int16 samples (any shape with one channel)
+
+        Returns:
+            bool: True while the user is speaking (after smoothing)
+        """
+        samples = np.asarray(chunk).reshape(-1)
+        if len(self._pending):
+            samples = np.concatenate([self._pending, samples])
+        usable = len(samples) // self.frame_length * self.frame_length
+        self._pending = samples[usable:].copy()
+        if not usable:
+            return self.in_speech
+
+        frames = samples[:usable].reshape(-1, self.frame_length)
+        if isinstance(self.engine, EnergyEngine):
+            voiced = self.engine.classify(frames.astype(np.float32) * np.float32(1.0 / 32768.0))
+        else:
+            voiced = self.engine.classify(frames.astype(np.int16, copy=False))
+        for is_voiced in voiced:
+            self._step(bool(is_voiced))
+        return self.in_speech
+
+    def _step(self, voiced: bool):
+        frame_end = self.position + self.frame_length
+        if voiced:
+            self._run += 1
+            self._gap = 0
+            if not self.in_speech and self._run >= self.onset_frames:
+                self.in_speech = True
+                if self.speech_start is None:
+                    self.speech_start = frame_end - self._run * self.frame_length
+            if self.in_speech:
+                self.last_voiced = frame_end
+        else:
+            self._run = 0
+            self._gap += 1
+            if self.in_speech and self._gap > self.hangover_frames:
+                self.in_speech = False
+                self.speech_end = frame_end
+        if self.in_speech:
+            self.speech_end = frame_end
+        self.position = frame_end
+
+    def speech_range(self, padding: float = VAD_TRIM_PADDING_MS / 1000):
+        """
+        Sample range to keep when trimming silence.
+
+        Args:
+            padding: Seconds kept before the speech (the hangover is kept after it)
+
+        Returns:
+            tuple | None: (start, end) sample positions, or None if there was no speech
+        """
+        if self.speech_start is None:
+            return None
+        start = max(0, self.speech_start - int(padding * self.sample_rate))
+        end = self.speech_end if not self.in_speech else self.position + len(self._pending)
+        return start, end
+
+
+def trim_silence(audio, sample_rate: int, engine: str = None):
+    """
+    Cut leading and trailing silence from a recording.
+
+    Args:
+        audio: int16 or float32 samples (float in [-1, 1])
+        sample_rate: Audio sample rate
+        engine: VAD engine (default: VAD_ENGINE)
+
+    Returns:
+        np.ndarray: The speech part of `audio` (a view), or `audio` unchanged if no speech was found
+    """
+    samples = np.asarray(audio).reshape(-1)
+    if samples.dtype.kind == "f":
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    detector = VoiceActivityDetector(sample_rate, engine=engine)
+    detector.process(samples)
+    span = detector.speech_range()
+    if span is None:
+        return audio
+    return audio[span[0]:span[1]]
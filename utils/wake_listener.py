@@ -7,6 +7,7 @@ import sounddevice as sd
 import numpy as np
 from pathlib import Path
 from modules.wake_word import WakeWordDetector, detect_wake_word_keyword
+from utils.audio_capture import open_input_stream
 import os
 
 # Load .env if available
@@ -21,26 +22,27 @@ except ImportError:
 def listen_for_wake_word(detector: WakeWordDetector, sample_rate: int = 16000, 
                         timeout: float = None) -> bool:
     """
-    Continuously listen for wake word using Porcupine (if available).
+    Continuously listen for wake word using Porcupine or the keyword spotter.
     
     Args:
         detector: WakeWordDetector instance
-        sample_rate: Audio sample rate (Porcupine uses 16000)
+        sample_rate: Audio sample rate (both engines use 16000)
         timeout: Maximum time to listen in seconds (None = infinite)
         
     Returns:
         bool: True if wake word detected
     """
-    if not detector.use_porcupine:
+    if not detector.listens_to_audio:
         return False  # Use text-based detection instead
     
-    frame_length = detector.porcupine.frame_length
+    frame_length = detector.frame_length
+    detector.reset()
     
     print("👂 Listening for wake word... (say 'Hey Mira')")
     
     try:
-        with sd.InputStream(samplerate=sample_rate, channels=1, 
-                           dtype='int16', blocksize=frame_length) as stream:
+        # Reads the shared capture (no device reopen between wake and command)
+        with open_input_stream(sample_rate, frame_length) as stream:
             frames_collected = 0
             max_frames = int(timeout * sample_rate / frame_length) if timeout else None
             
@@ -50,8 +52,8 @@ def listen_for_wake_word(detector: WakeWordDetector, sample_rate: int = 16000,
                 if overflowed:
                     print("[WARNING] Audio buffer overflow")
                 
-                # Convert to numpy array
-                audio_data = np.frombuffer(audio_chunk, dtype=np.int16).flatten()
+                # Flat int16 view of the frame (no copy)
+                audio_data = audio_chunk.reshape(-1)
                 
                 # Check for wake word
                 if detector.detect_from_audio(audio_data):